@@ -22,3 +22,75 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'd8b8c3f6f7418f0a72c0a19b2f3fb947f8dc3b1c4cce0f7ea9249e7a6372fa21'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    # Embute `tipo_usuario` no token de acesso para checagens de papel sem consultar o banco
+    JWT_TIPO_USUARIO_CLAIM = (os.environ.get('JWT_TIPO_USUARIO_CLAIM') or 'false').lower() == 'true'
+
+    # Cache de respostas das rotas públicas de leitura: 'redis' ou 'nenhum' (padrão, cache desligado).
+    # Precisa de Redis: as invalidações saem dos workers da API e do worker.py e todos leem as mesmas versões
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND') or 'nenhum'
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0'
+    CACHE_TTL_PADRAO = int(os.environ.get('CACHE_TTL_PADRAO') or 60)
+
+    # Segundos que um total de listagem com contagem='cache' fica guardado
+    PAGINACAO_CONTAGEM_TTL = int(os.environ.get('PAGINACAO_CONTAGEM_TTL') or 60)
+
+    # Serialização JSON com orjson (se instalado); 'false' força o json da biblioteca padrão
+    JSON_ACELERADO = (os.environ.get('JSON_ACELERADO') or 'true').lower() == 'true'
+
+    # Contagem/tempo de SQL por requisição (cabeçalhos X-DB-Queries e Server-Timing + log)
+    INSTRUMENTACAO_SQL = (os.environ.get('INSTRUMENTACAO_SQL') or 'true').lower() == 'true'
+    # Statements acima disso (ms) e formas repetidas mais que isso na mesma requisição geram log WARNING
+    SQL_LENTA_MS = float(os.environ.get('SQL_LENTA_MS') or 100)
+    SQL_N_MAIS_UM_LIMITE = int(os.environ.get('SQL_N_MAIS_UM_LIMITE') or 5)
+    # Statements mais lentos incluídos no log
+    SQL_MAIS_LENTAS = int(os.environ.get('SQL_MAIS_LENTAS') or 3)
+
+    # Endpoint /metrics (formato texto do Prometheus)
+    METRICAS = (os.environ.get('METRICAS') or 'true').lower() == 'true'
+    # Com vários workers (gunicorn), diretório compartilhado onde cada processo grava seu snapshot
+    METRICAS_DIR = os.environ.get('METRICAS_DIR') or os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    # Intervalo mínimo (s) entre gravações do snapshot de um worker
+    METRICAS_INTERVALO = float(os.environ.get('METRICAS_INTERVALO') or 1.0)
+    # Se definido, /metrics exige "Authorization: Bearer <token>"
+    METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN')
+
+    # Processador de imagens (/api/image)
+    N8N_WEBHOOK_URL = os.environ.get('N8N_WEBHOOK_URL') or 'https://xai.aurora5.com/test/baixar-binary'
+    N8N_TIMEOUT = float(os.environ.get('N8N_TIMEOUT') or 60)
+    IMAGEM_TIMEOUT_CONEXAO = float(os.environ.get('IMAGEM_TIMEOUT_CONEXAO') or 5)
+    IMAGEM_TIMEOUT_DOWNLOAD = float(os.environ.get('IMAGEM_TIMEOUT_DOWNLOAD') or 30)
+    # Bytes máximos por imagem baixada (o download é interrompido ao passar disso)
+    IMAGEM_TAMANHO_MAXIMO = int(os.environ.get('IMAGEM_TAMANHO_MAXIMO') or 10 * 1024 * 1024)
+    # Processamentos simultâneos por processo (cada um baixa as duas imagens em paralelo)
+    IMAGEM_WORKERS = int(os.environ.get('IMAGEM_WORKERS') or 4)
+    # Variantes (thumb/medio/original) dos uploads quando Pillow está instalado: 'webp' ou 'jpeg'
+    IMAGEM_FORMATO = os.environ.get('IMAGEM_FORMATO') or 'webp'
+    IMAGEM_QUALIDADE = int(os.environ.get('IMAGEM_QUALIDADE') or 80)
+
+    # Uploads endereçados por conteúdo ('local': ARMAZENAMENTO_DIR, padrão static/uploads, servido em ARMAZENAMENTO_URL)
+    ARMAZENAMENTO_BACKEND = os.environ.get('ARMAZENAMENTO_BACKEND') or 'local'
+    ARMAZENAMENTO_DIR = os.environ.get('ARMAZENAMENTO_DIR')
+    ARMAZENAMENTO_URL = os.environ.get('ARMAZENAMENTO_URL') or '/static/uploads'
+    # Arquivos sem referência e sem upload há mais que isso são removidos pela coleta
+    ARQUIVOS_CARENCIA_HORAS = float(os.environ.get('ARQUIVOS_CARENCIA_HORAS') or 24)
+
+    # Entrega de /static/uploads: 'flask', 'x-accel' (nginx) ou 'x-sendfile' (Apache/lighttpd)
+    UPLOADS_ENTREGA = os.environ.get('UPLOADS_ENTREGA') or 'flask'
+    # Location interna do nginx que aponta para o diretório de uploads (modo 'x-accel')
+    UPLOADS_X_ACCEL_PREFIXO = os.environ.get('UPLOADS_X_ACCEL_PREFIXO') or '/_uploads'
+    # Cache-Control dos uploads antigos (nome por data); os endereçados por conteúdo usam 1 ano + immutable
+    UPLOADS_MAX_AGE = int(os.environ.get('UPLOADS_MAX_AGE') or 3600)
+
+    # Fila de tarefas em segundo plano (worker.py); 'imediato' executa na própria requisição (desenvolvimento)
+    JOBS_MODO = os.environ.get('JOBS_MODO') or 'fila'
+    JOBS_MAX_TENTATIVAS = int(os.environ.get('JOBS_MAX_TENTATIVAS') or 5)
+    # Espera antes da nova tentativa: base * 2^(tentativa-1) segundos, limitada ao máximo
+    JOBS_BACKOFF_BASE = float(os.environ.get('JOBS_BACKOFF_BASE') or 5)
+    JOBS_BACKOFF_MAX = float(os.environ.get('JOBS_BACKOFF_MAX') or 600)
+    # Segundos até um job "executando" de um worker que caiu voltar para a fila
+    JOBS_TRAVA_EXPIRA = int(os.environ.get('JOBS_TRAVA_EXPIRA') or 600)
+    # Segundos entre consultas do worker quando a fila está vazia
+    JOBS_INTERVALO = float(os.environ.get('JOBS_INTERVALO') or 1.0)
+
+    # Linhas válidas gravadas por commit na importação em massa de jogadores
+    IMPORTACAO_TAMANHO_LOTE = int(os.environ.get('IMPORTACAO_TAMANHO_LOTE') or 500)
@@ -0,0 +1,197 @@
+"""Estrutura inicial
+
+Revision ID: a3f1c2d4e5b6
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f1c2d4e5b6'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Bancos criados antes desta pasta de migrations já têm as tabelas (ver migrations/README)
+    if sa.inspect(op.get_bind()).has_table('users'):
+        return
+
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=80), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('status', sa.String(length=255), nullable=True),
+        sa.Column('tipo_usuario', sa.String(length=50), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'peladas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('usuario_gerente_id', sa.Integer(), nullable=False),
+        sa.Column('nome', sa.String(length=100), nullable=False),
+        sa.Column('cidade', sa.String(length=100), nullable=False),
+        sa.Column('fuso_horario', sa.String(length=50), nullable=False),
+        sa.Column('logo_url', sa.String(length=255), nullable=True),
+        sa.Column('perfil_url', sa.String(length=255), nullable=True),
+        sa.Column('ativa', sa.Boolean(), nullable=True),
+        sa.Column('criado_em', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_gerente_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'jogadores',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('pelada_id', sa.Integer(), nullable=False),
+        sa.Column('nome_completo', sa.String(length=100), nullable=False),
+        sa.Column('apelido', sa.String(length=50), nullable=True),
+        sa.Column('telefone', sa.String(length=20), nullable=True),
+        sa.Column('foto_url', sa.String(length=255), nullable=True),
+        sa.Column('ativo', sa.Boolean(), nullable=True),
+        sa.Column('criado_em', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['pelada_id'], ['peladas.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'temporadas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('pelada_id', sa.Integer(), nullable=False),
+        sa.Column('inicio_mes', sa.Date(), nullable=False),
+        sa.Column('fim_mes', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('criado_em', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['pelada_id'], ['peladas.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'rodadas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('temporada_id', sa.Integer(), nullable=False),
+        sa.Column('data_rodada', sa.Date(), nullable=False),
+        sa.Column('quantidade_times', sa.Integer(), nullable=False),
+        sa.Column('jogadores_por_time', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('criado_em', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['temporada_id'], ['temporadas.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'times',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('temporada_id', sa.Integer(), nullable=False),
+        sa.Column('nome', sa.String(length=50), nullable=False),
+        sa.Column('cor', sa.String(length=30), nullable=True),
+        sa.Column('escudo_url', sa.String(length=255), nullable=True),
+        sa.Column('pontos', sa.Integer(), nullable=True),
+        sa.Column('vitorias', sa.Integer(), nullable=True),
+        sa.Column('empates', sa.Integer(), nullable=True),
+        sa.Column('derrotas', sa.Integer(), nullable=True),
+        sa.Column('gols_marcados', sa.Integer(), nullable=True),
+        sa.Column('gols_sofridos', sa.Integer(), nullable=True),
+        sa.Column('criado_em', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['temporada_id'], ['temporadas.id'], name='fk_times_temporada'),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'time_jogadores',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('time_id', sa.Integer(), nullable=False),
+        sa.Column('jogador_id', sa.Integer(), nullable=False),
+        sa.Column('capitao', sa.Boolean(), nullable=True),
+        sa.Column('posicao', sa.String(length=50), nullable=True),
+        sa.ForeignKeyConstraint(['time_id'], ['times.id']),
+        sa.ForeignKeyConstraint(['jogador_id'], ['jogadores.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'partidas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('rodada_id', sa.Integer(), nullable=False),
+        sa.Column('time_casa_id', sa.Integer(), nullable=False),
+        sa.Column('time_fora_id', sa.Integer(), nullable=False),
+        sa.Column('inicio', sa.DateTime(), nullable=True),
+        sa.Column('fim', sa.DateTime(), nullable=True),
+        sa.Column('gols_casa', sa.Integer(), nullable=True),
+        sa.Column('gols_fora', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.ForeignKeyConstraint(['rodada_id'], ['rodadas.id']),
+        sa.ForeignKeyConstraint(['time_casa_id'], ['times.id']),
+        sa.ForeignKeyConstraint(['time_fora_id'], ['times.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'gols',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('partida_id', sa.Integer(), nullable=False),
+        sa.Column('time_id', sa.Integer(), nullable=False),
+        sa.Column('jogador_id', sa.Integer(), nullable=False),
+        sa.Column('assistencia_id', sa.Integer(), nullable=True),
+        sa.Column('minuto', sa.Integer(), nullable=True),
+        sa.Column('gol_contra', sa.Boolean(), nullable=True),
+        sa.Column('criado_em', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['partida_id'], ['partidas.id']),
+        sa.ForeignKeyConstraint(['time_id'], ['times.id']),
+        sa.ForeignKeyConstraint(['jogador_id'], ['jogadores.id']),
+        sa.ForeignKeyConstraint(['assistencia_id'], ['jogadores.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'votacoes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('rodada_id', sa.Integer(), nullable=False),
+        sa.Column('abre_em', sa.DateTime(), nullable=False),
+        sa.Column('fecha_em', sa.DateTime(), nullable=False),
+        sa.Column('tipo', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.ForeignKeyConstraint(['rodada_id'], ['rodadas.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'votos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('votacao_id', sa.Integer(), nullable=False),
+        sa.Column('jogador_votante_id', sa.Integer(), nullable=False),
+        sa.Column('jogador_votado_id', sa.Integer(), nullable=False),
+        sa.Column('pontos', sa.SmallInteger(), nullable=False),
+        sa.Column('criado_em', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['votacao_id'], ['votacoes.id']),
+        sa.ForeignKeyConstraint(['jogador_votante_id'], ['jogadores.id']),
+        sa.ForeignKeyConstraint(['jogador_votado_id'], ['jogadores.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('votos')
+    op.drop_table('votacoes')
+    op.drop_table('gols')
+    op.drop_table('partidas')
+    op.drop_table('time_jogadores')
+    op.drop_table('times')
+    op.drop_table('rodadas')
+    op.drop_table('temporadas')
+    op.drop_table('jogadores')
+    op.drop_table('peladas')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_index('ix_users_username', table_name='users')
+    op.drop_table('users')
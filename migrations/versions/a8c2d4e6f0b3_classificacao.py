@@ -0,0 +1,77 @@
+"""Classificação materializada por (temporada, time)
+
+Revision ID: a8c2d4e6f0b3
+Revises: a3f1c2d4e5b6
+Create Date: 2026-10-18 09:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8c2d4e6f0b3'
+down_revision = 'a3f1c2d4e5b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'classificacoes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('temporada_id', sa.Integer(), nullable=False),
+        sa.Column('time_id', sa.Integer(), nullable=False),
+        sa.Column('pontos', sa.Integer(), nullable=False),
+        sa.Column('jogos', sa.Integer(), nullable=False),
+        sa.Column('vitorias', sa.Integer(), nullable=False),
+        sa.Column('empates', sa.Integer(), nullable=False),
+        sa.Column('derrotas', sa.Integer(), nullable=False),
+        sa.Column('gols_marcados', sa.Integer(), nullable=False),
+        sa.Column('gols_sofridos', sa.Integer(), nullable=False),
+        sa.Column('atualizado_em', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['temporada_id'], ['temporadas.id']),
+        sa.ForeignKeyConstraint(['time_id'], ['times.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('temporada_id', 'time_id', name='uq_classificacao_temporada_time')
+    )
+    op.create_index(
+        'ix_classificacao_ordem', 'classificacoes',
+        ['temporada_id', 'pontos', 'vitorias', 'gols_marcados'], unique=False
+    )
+
+    # Preenche a classificação dos times existentes a partir das partidas finalizadas
+    # (mesma agregação de ClassificacaoService._agregar); times novos ganham a linha na criação
+    op.execute("""
+        INSERT INTO classificacoes (
+            temporada_id, time_id, pontos, jogos, vitorias, empates, derrotas,
+            gols_marcados, gols_sofridos, atualizado_em
+        )
+        SELECT temporada_id, time_id, 3 * vitorias + empates, jogos, vitorias, empates, derrotas,
+               gols_marcados, gols_sofridos, CURRENT_TIMESTAMP
+        FROM (
+            SELECT temporada_id, time_id,
+                   COUNT(partida_id) AS jogos,
+                   SUM(CASE WHEN partida_id IS NOT NULL AND pro > contra THEN 1 ELSE 0 END) AS vitorias,
+                   SUM(CASE WHEN partida_id IS NOT NULL AND pro = contra THEN 1 ELSE 0 END) AS empates,
+                   SUM(CASE WHEN partida_id IS NOT NULL AND pro < contra THEN 1 ELSE 0 END) AS derrotas,
+                   SUM(pro) AS gols_marcados,
+                   SUM(contra) AS gols_sofridos
+            FROM (
+                SELECT t.temporada_id AS temporada_id, t.id AS time_id, p.id AS partida_id,
+                       CASE WHEN p.time_casa_id = t.id THEN COALESCE(p.gols_casa, 0)
+                            ELSE COALESCE(p.gols_fora, 0) END AS pro,
+                       CASE WHEN p.time_casa_id = t.id THEN COALESCE(p.gols_fora, 0)
+                            ELSE COALESCE(p.gols_casa, 0) END AS contra
+                FROM times t
+                LEFT JOIN partidas p
+                  ON (p.time_casa_id = t.id OR p.time_fora_id = t.id) AND p.status = 'finalizada'
+            ) jogos_time
+            GROUP BY temporada_id, time_id
+        ) agregado
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_classificacao_ordem', table_name='classificacoes')
+    op.drop_table('classificacoes')
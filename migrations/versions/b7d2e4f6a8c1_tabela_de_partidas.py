@@ -0,0 +1,48 @@
+"""Vagas dependentes de resultado nas partidas
+
+Revision ID: b7d2e4f6a8c1
+Revises: a8c2d4e6f0b3
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2e4f6a8c1'
+down_revision = 'a8c2d4e6f0b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('partidas') as batch_op:
+        batch_op.alter_column('time_casa_id', existing_type=sa.Integer(), nullable=True)
+        batch_op.alter_column('time_fora_id', existing_type=sa.Integer(), nullable=True)
+        batch_op.add_column(sa.Column('origem_casa_partida_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('origem_casa_resultado', sa.String(length=10), nullable=True))
+        batch_op.add_column(sa.Column('origem_fora_partida_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('origem_fora_resultado', sa.String(length=10), nullable=True))
+        batch_op.create_foreign_key('fk_partidas_origem_casa', 'partidas', ['origem_casa_partida_id'], ['id'])
+        batch_op.create_foreign_key('fk_partidas_origem_fora', 'partidas', ['origem_fora_partida_id'], ['id'])
+        batch_op.create_index('ix_partidas_origem_casa_partida_id', ['origem_casa_partida_id'], unique=False)
+        batch_op.create_index('ix_partidas_origem_fora_partida_id', ['origem_fora_partida_id'], unique=False)
+
+
+def downgrade():
+    # Partidas geradas ainda sem times não cabem nas colunas NOT NULL antigas
+    op.execute('UPDATE partidas SET origem_casa_partida_id = NULL, origem_fora_partida_id = NULL')
+    op.execute('DELETE FROM partidas WHERE time_casa_id IS NULL OR time_fora_id IS NULL')
+
+    with op.batch_alter_table('partidas') as batch_op:
+        batch_op.drop_index('ix_partidas_origem_fora_partida_id')
+        batch_op.drop_index('ix_partidas_origem_casa_partida_id')
+        batch_op.drop_constraint('fk_partidas_origem_fora', type_='foreignkey')
+        batch_op.drop_constraint('fk_partidas_origem_casa', type_='foreignkey')
+        batch_op.drop_column('origem_fora_resultado')
+        batch_op.drop_column('origem_fora_partida_id')
+        batch_op.drop_column('origem_casa_resultado')
+        batch_op.drop_column('origem_casa_partida_id')
+        batch_op.alter_column('time_fora_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('time_casa_id', existing_type=sa.Integer(), nullable=False)
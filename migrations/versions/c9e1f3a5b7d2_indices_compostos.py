@@ -0,0 +1,102 @@
+"""Índices compostos e únicos alinhados às consultas dos services
+
+Revision ID: c9e1f3a5b7d2
+Revises: b7d2e4f6a8c1
+Create Date: 2026-10-18 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9e1f3a5b7d2'
+down_revision = 'b7d2e4f6a8c1'
+branch_labels = None
+depends_on = None
+
+
+INDICES = [
+    # (nome, tabela, colunas)
+    ('ix_peladas_gerente_ativa', 'peladas', ['usuario_gerente_id', 'ativa']),
+    ('ix_jogadores_pelada_ativo', 'jogadores', ['pelada_id', 'ativo']),
+    ('ix_jogadores_pelada_nome', 'jogadores', ['pelada_id', 'nome_completo']),
+    ('ix_temporadas_pelada_status', 'temporadas', ['pelada_id', 'status']),
+    ('ix_temporadas_pelada_criado', 'temporadas', ['pelada_id', 'criado_em']),
+    ('ix_rodadas_temporada_data', 'rodadas', ['temporada_id', 'data_rodada']),
+    ('ix_times_temporada_criado', 'times', ['temporada_id', 'criado_em']),
+    ('ix_time_jogadores_jogador', 'time_jogadores', ['jogador_id', 'time_id']),
+    ('ix_partidas_rodada_status', 'partidas', ['rodada_id', 'status']),
+    ('ix_partidas_casa_status', 'partidas', ['time_casa_id', 'status']),
+    ('ix_partidas_fora_status', 'partidas', ['time_fora_id', 'status']),
+    ('ix_gols_partida_minuto', 'gols', ['partida_id', 'minuto']),
+    ('ix_gols_jogador_partida', 'gols', ['jogador_id', 'partida_id', 'gol_contra']),
+    ('ix_gols_assistencia_partida', 'gols', ['assistencia_id', 'partida_id']),
+    ('ix_votacoes_rodada_tipo', 'votacoes', ['rodada_id', 'tipo']),
+    ('ix_votos_votacao_votado', 'votos', ['votacao_id', 'jogador_votado_id', 'pontos']),
+    ('ix_votos_votado_votacao', 'votos', ['jogador_votado_id', 'votacao_id', 'pontos']),
+]
+
+UNICOS = [
+    ('uq_time_jogador', 'time_jogadores', ['time_id', 'jogador_id']),
+    ('uq_voto_votante_votado', 'votos', ['votacao_id', 'jogador_votante_id', 'jogador_votado_id']),
+]
+
+
+def _contar_duplicados(tabela, colunas):
+    """Linhas que sobram além da primeira em cada grupo que a restrição única vai proibir"""
+    grupo = ', '.join(colunas)
+    return op.get_bind().execute(sa.text(
+        f'SELECT COALESCE(SUM(n - 1), 0) FROM '
+        f'(SELECT COUNT(*) AS n FROM {tabela} GROUP BY {grupo} HAVING COUNT(*) > 1) AS repetidos'
+    )).scalar()
+
+
+def _conferir_duplicados():
+    # Nada é apagado aqui: votos ou escalações repetidos precisam ser revistos por quem opera o banco
+    conflitos = []
+    for nome, tabela, colunas in UNICOS:
+        total = _contar_duplicados(tabela, colunas)
+        if total:
+            conflitos.append(f"{tabela} ({', '.join(colunas)}): {total} linha(s) repetida(s) impedem {nome}")
+    if conflitos:
+        raise RuntimeError(
+            'Remova as linhas duplicadas antes de aplicar c9e1f3a5b7d2 (veja migrations/README):\n  '
+            + '\n  '.join(conflitos)
+        )
+
+
+def upgrade():
+    # Confere antes de qualquer DDL: no MySQL os índices já criados não voltariam com a falha
+    _conferir_duplicados()
+
+    for nome, tabela, colunas in INDICES:
+        op.create_index(nome, tabela, colunas, unique=False)
+
+    for nome, tabela, colunas in UNICOS:
+        with op.batch_alter_table(tabela) as batch_op:
+            batch_op.create_unique_constraint(nome, colunas)
+
+
+def downgrade():
+    bind = op.get_bind()
+    recriados = set()
+
+    def preservar_indice_da_fk(tabela, coluna):
+        # O MySQL descarta o índice implícito da FK quando um composto começa pela mesma coluna;
+        # antes de remover o composto, a FK precisa de um índice próprio de novo
+        if bind.dialect.name != 'mysql' or (tabela, coluna) in recriados:
+            return
+        fks = sa.inspect(bind).get_foreign_keys(tabela)
+        if any(fk['constrained_columns'][:1] == [coluna] for fk in fks):
+            op.create_index(f'ix_{tabela}_{coluna}', tabela, [coluna], unique=False)
+            recriados.add((tabela, coluna))
+
+    for nome, tabela, colunas in reversed(UNICOS):
+        preservar_indice_da_fk(tabela, colunas[0])
+        with op.batch_alter_table(tabela) as batch_op:
+            batch_op.drop_constraint(nome, type_='unique')
+
+    for nome, tabela, colunas in reversed(INDICES):
+        preservar_indice_da_fk(tabela, colunas[0])
+        op.drop_index(nome, table_name=tabela)
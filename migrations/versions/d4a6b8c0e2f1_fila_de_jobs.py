@@ -0,0 +1,44 @@
+"""Tabela jobs: fila de tarefas em segundo plano
+
+Revision ID: d4a6b8c0e2f1
+Revises: c9e1f3a5b7d2
+Create Date: 2026-10-18 14:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a6b8c0e2f1'
+down_revision = 'c9e1f3a5b7d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('tipo', sa.String(length=64), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('chave_idempotencia', sa.String(length=191), nullable=True),
+        sa.Column('tentativas', sa.Integer(), nullable=False),
+        sa.Column('max_tentativas', sa.Integer(), nullable=False),
+        sa.Column('executar_em', sa.DateTime(), nullable=False),
+        sa.Column('travado_por', sa.String(length=64), nullable=True),
+        sa.Column('travado_em', sa.DateTime(), nullable=True),
+        sa.Column('resultado', sa.Text(), nullable=True),
+        sa.Column('erro', sa.Text(), nullable=True),
+        sa.Column('criado_em', sa.DateTime(), nullable=True),
+        sa.Column('concluido_em', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('chave_idempotencia')
+    )
+    op.create_index('ix_jobs_status_executar_em', 'jobs', ['status', 'executar_em'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_jobs_status_executar_em', table_name='jobs')
+    op.drop_table('jobs')
@@ -0,0 +1,39 @@
+"""Tabela arquivos: uploads endereçados por conteúdo (SHA-256)
+
+Revision ID: e5b7c9d1f3a2
+Revises: d4a6b8c0e2f1
+Create Date: 2026-10-18 16:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b7c9d1f3a2'
+down_revision = 'd4a6b8c0e2f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'arquivos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('digest', sa.String(length=64), nullable=False),
+        sa.Column('url', sa.String(length=255), nullable=False),
+        sa.Column('chaves', sa.Text(), nullable=False),
+        sa.Column('tamanho', sa.BigInteger(), nullable=False),
+        sa.Column('criado_em', sa.DateTime(), nullable=True),
+        sa.Column('usado_em', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('digest')
+    )
+    op.create_index('ix_arquivos_url', 'arquivos', ['url'], unique=False)
+    op.create_index('ix_arquivos_usado_em', 'arquivos', ['usado_em'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_arquivos_usado_em', table_name='arquivos')
+    op.drop_index('ix_arquivos_url', table_name='arquivos')
+    op.drop_table('arquivos')
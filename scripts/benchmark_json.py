@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Compara a vazão de serialização JSON do provedor padrão do Flask com o
+`ProvedorJSON` do app (orjson e fallback na biblioteca padrão) sobre payloads
+reais: perfil da pelada e rankings da temporada mais recente.
+
+Uso (a partir da raiz do projeto):
+    python scripts/benchmark_json.py --pelada-id 12
+    python scripts/benchmark_json.py --pelada-id 12 --repeticoes 2000
+
+Cada payload é montado uma vez pelos services e codificado `--repeticoes` vezes
+como `jsonify` faria (chaves ordenadas, sem espaços). Só leituras; nada é gravado.
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask.json.provider import DefaultJSONProvider
+
+from source import create_app
+from source.domain.peladas.models import Temporada
+from source.domain.peladas.services import PeladaService, RankingService
+from source.utils import json_provider
+from source.utils.json_provider import ProvedorJSON
+
+
+def montar_payloads(pelada_id):
+    """(rótulo, documento) como as rotas os entregam a `jsonify`"""
+    perfil, erro = PeladaService.obter_perfil_pelada(pelada_id)
+    if erro:
+        raise SystemExit(f'Pelada {pelada_id}: {erro}')
+    payloads = [('obter_perfil_pelada', perfil)]
+
+    temporada = Temporada.query.filter_by(pelada_id=pelada_id).order_by(Temporada.criado_em.desc()).first()
+    if temporada:
+        for rotulo, funcao in (
+            ('ranking_times', lambda: RankingService.ranking_times_temporada(temporada.id)),
+            ('ranking_artilheiros', lambda: RankingService.ranking_artilheiros_temporada(temporada.id, None)),
+            ('ranking_assistencias', lambda: RankingService.ranking_assistencias_temporada(temporada.id, None)),
+            ('ranking_jogadores', lambda: RankingService.ranking_jogadores_temporada(temporada.id)),
+        ):
+            ranking, erro = funcao()
+            if not erro:
+                payloads.append((rotulo, {'ranking': ranking}))
+    return payloads
+
+
+def provedores(app):
+    """(rótulo, função que codifica para bytes) de cada provedor comparado"""
+    padrao = DefaultJSONProvider(app)
+    resultado = [('flask padrão', lambda obj: padrao.dumps(obj, separators=(',', ':')).encode())]
+
+    fallback = ProvedorJSON(app)
+    fallback.acelerado = False
+    resultado.append(('ProvedorJSON (json)', lambda obj: fallback.dumps(obj, separators=(',', ':')).encode()))
+
+    if json_provider.orjson is not None:
+        acelerado = ProvedorJSON(app)
+        acelerado.acelerado = True
+        resultado.append(('ProvedorJSON (orjson)', lambda obj: acelerado._bytes(obj)))
+    else:
+        print('orjson não instalado: comparando apenas a biblioteca padrão\n')
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vazão de serialização JSON sobre payloads reais')
+    parser.add_argument('--pelada-id', type=int, required=True, help='pelada usada como amostra (de preferência a maior)')
+    parser.add_argument('--repeticoes', type=int, default=500, help='codificações por payload e provedor')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        payloads = montar_payloads(args.pelada_id)
+        codificadores = provedores(app)
+
+        for rotulo, documento in payloads:
+            tamanho = len(codificadores[-1][1](documento))
+            print(f'{rotulo} ({tamanho / 1024:.1f} KB)')
+            base = None
+            for nome, codificar in codificadores:
+                segundos = min(timeit.repeat(lambda: codificar(documento), number=args.repeticoes, repeat=3))
+                por_segundo = args.repeticoes / segundos
+                base = base or por_segundo
+                print(f'    {nome:<24} {por_segundo:>10.0f} docs/s  {por_segundo * tamanho / 2**20:>8.1f} MB/s  x{por_segundo / base:.1f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Coleta de uploads órfãos: remove do armazenamento os arquivos que nenhuma
+pelada, jogador ou time referencia mais (logo, perfil, foto, escudo).
+
+Só entram arquivos sem upload há mais de ARQUIVOS_CARENCIA_HORAS, para não
+apagar uma imagem recém-enviada cuja entidade ainda não foi gravada.
+
+Uso (a partir da raiz do projeto; agende diariamente no cron):
+    python scripts/coletar_arquivos.py --simular          # só conta
+    python scripts/coletar_arquivos.py --limite 2000
+
+Também pode ir para a fila do worker como tarefa `arquivos.coletar`.
+Uploads anteriores ao armazenamento por conteúdo (static/uploads/peladas,
+jogadores e times) não são registrados e ficam de fora.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from source import create_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Remove uploads sem referência no banco')
+    parser.add_argument('--simular', action='store_true', help='só mostra quantos arquivos seriam removidos')
+    parser.add_argument('--limite', type=int, default=500, help='máximo de arquivos por execução')
+    parser.add_argument('--carencia-horas', type=float, default=None,
+                        help='idade mínima do último upload (padrão: ARQUIVOS_CARENCIA_HORAS)')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        from source.domain.arquivos.services import ArquivoService
+
+        resumo, erro = ArquivoService.coletar_orfaos(args.carencia_horas, args.limite, args.simular)
+    if erro:
+        print(f'Erro: {erro}')
+        return 1
+
+    acao = 'seriam removidos' if resumo['simulado'] else 'removidos'
+    print(f"{resumo['removidos']} arquivo(s) {acao}, {resumo['bytes_liberados'] / (1024 * 1024):.1f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
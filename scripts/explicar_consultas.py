@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Roda as consultas de leitura dos services contra o banco configurado, executa
+EXPLAIN em cada SELECT emitido e aponta leituras completas de tabela.
+
+Uso (a partir da raiz do projeto):
+    python scripts/explicar_consultas.py --pelada-id 12
+    python scripts/explicar_consultas.py --pelada-id 12 --min-linhas 500 --verbose
+
+Aponte para a maior pelada: é nela que um índice ausente vira table scan em
+`votos` e `gols`. Sai com código 1 se alguma consulta ler uma tabela inteira com
+mais de --min-linhas linhas estimadas (MySQL) ou fizer SCAN sem índice (SQLite).
+Apenas services de leitura são executados; nada é gravado.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import event
+
+from source import create_app
+from source.extensions.extensios import db
+from source.domain.peladas.models import Temporada, Rodada, Partida, Votacao
+from source.domain.peladas.services import (
+    PeladaService, JogadorService, TemporadaService, RodadaService, TimeService,
+    PartidaService, RankingService, VotacaoService
+)
+
+
+def chamadas_dos_services(pelada_id):
+    """(rótulo, função) de cada leitura exercitada, com IDs reais da pelada"""
+    temporada = Temporada.query.filter_by(pelada_id=pelada_id).order_by(Temporada.criado_em.desc()).first()
+    rodada = Rodada.query.filter_by(temporada_id=temporada.id).order_by(Rodada.data_rodada.desc()).first() if temporada else None
+    partida = Partida.query.filter_by(rodada_id=rodada.id).first() if rodada else None
+    votacao = Votacao.query.filter_by(rodada_id=rodada.id).first() if rodada else None
+
+    chamadas = [
+        ('PeladaService.obter_perfil_pelada', lambda: PeladaService.obter_perfil_pelada(pelada_id)),
+        ('JogadorService.listar_jogadores', lambda: JogadorService.listar_jogadores(pelada_id, 1, 20, True)),
+        ('TemporadaService.listar_temporadas', lambda: TemporadaService.listar_temporadas(pelada_id)),
+    ]
+    if temporada:
+        chamadas += [
+            ('RodadaService.listar_rodadas', lambda: RodadaService.listar_rodadas(temporada.id)),
+            ('TimeService.listar_times_da_temporada', lambda: TimeService.listar_times_da_temporada(temporada.id)),
+            ('RankingService.ranking_times_temporada', lambda: RankingService.ranking_times_temporada(temporada.id)),
+            ('RankingService.ranking_artilheiros_temporada', lambda: RankingService.ranking_artilheiros_temporada(temporada.id)),
+            ('RankingService.ranking_assistencias_temporada', lambda: RankingService.ranking_assistencias_temporada(temporada.id)),
+            ('RankingService.ranking_jogadores_temporada', lambda: RankingService.ranking_jogadores_temporada(temporada.id)),
+        ]
+    if rodada:
+        chamadas += [
+            ('RodadaService.obter_rodada_por_id', lambda: RodadaService.obter_rodada_por_id(rodada.id)),
+            ('RodadaService.listar_jogadores_da_rodada', lambda: RodadaService.listar_jogadores_da_rodada(rodada.id)),
+            ('PartidaService.listar_partidas', lambda: PartidaService.listar_partidas(rodada.id)),
+            ('VotacaoService.listar_votacoes_rodada', lambda: VotacaoService.listar_votacoes_rodada(rodada.id)),
+            ('VotacaoService.resultados_votacoes_da_rodada', lambda: VotacaoService.resultados_votacoes_da_rodada(rodada.id)),
+        ]
+    if partida:
+        chamadas.append(('PartidaService.obter_partida_por_id', lambda: PartidaService.obter_partida_por_id(partida.id)))
+    if votacao:
+        chamadas.append(('VotacaoService.resultado_votacao', lambda: VotacaoService.resultado_votacao(votacao.id)))
+    return chamadas
+
+
+def capturar_selects(engine, funcao):
+    """Executa `funcao` e devolve os SELECTs (sql, parâmetros) que ela enviou ao banco"""
+    capturados = []
+
+    def ouvir(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            capturados.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', ouvir)
+    try:
+        funcao()
+    finally:
+        event.remove(engine, 'before_cursor_execute', ouvir)
+        db.session.rollback()
+    return capturados
+
+
+def explicar(conexao, statement, parameters, min_linhas):
+    """Plano de execução da consulta + lista de leituras completas encontradas"""
+    if conexao.dialect.name == 'sqlite':
+        plano = conexao.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+        linhas = [row[-1] for row in plano]
+        # SCAN de subconsulta derivada (anon_N) não é leitura de tabela; a da tabela aparece em linha própria
+        problemas = [
+            detalhe for detalhe in linhas
+            if detalhe.startswith('SCAN') and 'USING' not in detalhe and 'CONSTANT ROW' not in detalhe
+            and not detalhe.split()[1].startswith(('anon_', '('))
+        ]
+        return linhas, problemas
+
+    resultado = conexao.exec_driver_sql('EXPLAIN ' + statement, parameters)
+    colunas = list(resultado.keys())
+    linhas, problemas = [], []
+    for row in resultado.fetchall():
+        dados = dict(zip(colunas, row))
+        descricao = (
+            f"{dados.get('table')}: type={dados.get('type')} key={dados.get('key')} "
+            f"rows={dados.get('rows')} extra={dados.get('Extra')}"
+        )
+        linhas.append(descricao)
+        if dados.get('type') == 'ALL' and int(dados.get('rows') or 0) >= min_linhas:
+            problemas.append(descricao)
+    return linhas, problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EXPLAIN das consultas de leitura dos services')
+    parser.add_argument('--pelada-id', type=int, required=True, help='pelada usada como amostra (de preferência a maior)')
+    parser.add_argument('--min-linhas', type=int, default=100,
+                        help='MySQL: ignora leituras completas de tabelas com menos linhas estimadas')
+    parser.add_argument('--verbose', action='store_true', help='mostra o plano de todas as consultas')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        engine = db.engine
+        total_problemas = 0
+        with engine.connect() as conexao:
+            for rotulo, funcao in chamadas_dos_services(args.pelada_id):
+                vistos = set()
+                for statement, parameters in capturar_selects(engine, funcao):
+                    if statement in vistos:
+                        continue
+                    vistos.add(statement)
+
+                    plano, problemas = explicar(conexao, statement, parameters, args.min_linhas)
+                    total_problemas += len(problemas)
+                    if problemas:
+                        print(f'[SCAN] {rotulo}')
+                        print('    ' + ' '.join(statement.split())[:300])
+                        for problema in problemas:
+                            print(f'    -> {problema}')
+                    elif args.verbose:
+                        print(f'[ok]   {rotulo}')
+                        for linha in plano:
+                            print(f'    {linha}')
+
+        print(f'\n{total_problemas} leitura(s) completa(s) de tabela encontrada(s)')
+        return 1 if total_problemas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
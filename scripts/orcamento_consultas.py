@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Orçamento de consultas SQL por endpoint: falha (código 1) se alguma rota emitir
+mais statements do que o limite registrado em ORCAMENTOS.
+
+Sobe o app num banco SQLite em memória, semeia uma pelada com vários times,
+jogadores, partidas, gols e votos, e chama cada rota pelo test client. Os
+volumes são grandes o bastante para que um N+1 (uma consulta por time, por
+jogador ou por gol) estoure o limite, então a regressão aparece aqui e não em
+produção. O cache de respostas fica desligado e os jobs rodam na hora
+(JOBS_MODO='imediato') para medir o caminho completo, inclusive o que o
+worker faria depois de uma escrita.
+
+As rotas de escrita vêm depois das leituras e rodam na ordem da lista, cada
+uma sobre o estado deixado pelas anteriores (os gols em lote entram na partida
+em andamento que a rota seguinte finaliza).
+
+Uso (a partir da raiz do projeto; roda também em tests/test_orcamento_consultas.py):
+    python scripts/orcamento_consultas.py
+    python scripts/orcamento_consultas.py --verbose     # SQL das rotas que estouraram
+
+Ao otimizar uma rota, reduza o limite dela aqui; ao aumentar, justifique no commit.
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from config import Config
+from source import create_app
+from source.extensions.extensios import db
+
+# (método, rota, máximo de statements[, corpo]); {chaves} vêm de semear() e corpo(ids)
+# devolve os argumentos extras do test client. Todas incluem as consultas de
+# autenticação/posse dos decoradores.
+ORCAMENTOS = [
+    ('GET', '/api/peladas/', 2),
+    ('GET', '/api/peladas/{pelada}', 2),
+    ('GET', '/api/peladas/{pelada}/perfil', 2),
+    ('GET', '/api/peladas/{pelada}/jogadores', 3),
+    ('GET', '/api/peladas/jogadores/{jogador}', 3),
+    ('GET', '/api/peladas/{pelada}/temporadas', 3),
+    ('GET', '/api/peladas/temporadas/{temporada}', 3),
+    ('GET', '/api/peladas/temporadas/{temporada}/rodadas', 3),
+    ('GET', '/api/peladas/rodadas/{rodada}', 4),
+    ('GET', '/api/peladas/rodadas/{rodada}/jogadores', 3),
+    ('GET', '/api/peladas/temporadas/{temporada}/times', 4),
+    ('GET', '/api/peladas/times/{time}', 4),
+    ('GET', '/api/peladas/rodadas/{rodada}/partidas', 2),
+    ('GET', '/api/peladas/partidas/{partida}', 4),
+    ('GET', '/api/peladas/temporadas/{temporada}/ranking/times', 2),
+    ('GET', '/api/peladas/temporadas/{temporada}/ranking/artilheiros', 2),
+    ('GET', '/api/peladas/temporadas/{temporada}/ranking/assistencias', 2),
+    ('GET', '/api/peladas/temporadas/{temporada}/ranking/jogadores', 2),
+    ('GET', '/api/peladas/rodadas/{rodada}/votacoes', 2),
+    ('GET', '/api/peladas/votacoes/{votacao}', 1),
+    ('GET', '/api/peladas/votacoes/{votacao}/resultado', 3),
+    ('GET', '/api/peladas/rodadas/{rodada}/votacoes/resultados', 4),
+    ('POST', '/api/peladas/partidas/{partida_aberta}/gols/lote', 9, lambda ids: {'json': {'gols': [
+        {'time_id': ids['time'], 'jogador_id': ids['jogadores_time'][i % 3], 'minuto': i,
+         'assistencia_id': ids['jogadores_time'][(i + 1) % 3]}
+        for i in range(12)
+    ]}}),
+    ('POST', '/api/peladas/partidas/{partida_aberta}/finalizar', 11),
+    ('POST', '/api/peladas/temporadas/{temporada}/classificacao/recalcular', 8),
+    # 200 linhas em lotes de 50: posse + (duplicados, INSERT) por lote
+    ('POST', '/api/peladas/{pelada}/jogadores/importar', 9, lambda ids: {
+        'data': 'nome_completo,apelido,telefone\n' + ''.join(
+            f'Importado {i},Imp{i},1188888{i:04d}\n' for i in range(200)
+        ),
+        'content_type': 'text/csv', 'query_string': {'lote': 50}
+    }),
+    ('POST', '/api/peladas/rodadas/{rodada_nova}/partidas/gerar', 9, lambda ids: {
+        'json': {'formato': 'todos_contra_todos'}
+    }),
+    ('POST', '/api/peladas/rodadas/{rodada_nova}/times/sortear', 8, lambda ids: {
+        'json': {'jogador_ids': ids['jogadores'], 'substituir': True}
+    }),
+]
+
+
+class ConfigOrcamento(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    CACHE_BACKEND = 'nenhum'
+    JOBS_MODO = 'imediato'
+    TESTING = True
+
+
+def semear(quantidade_times=6, jogadores_por_time=6, gols_por_partida=4):
+    """Dados de amostra; devolve os IDs usados nas rotas"""
+    from source.domain.users.models import User
+    from source.domain.peladas.models import (
+        Pelada, Jogador, Temporada, Rodada, Time, TimeJogador, Partida, Gol, Votacao, Voto, Classificacao
+    )
+
+    gerente = User('orcamento', 'orcamento@example.com', 'senha-orcamento')
+    db.session.add(gerente)
+    db.session.flush()
+
+    pelada = Pelada('Pelada do orçamento', 'São Paulo', gerente.id)
+    db.session.add(pelada)
+    db.session.flush()
+
+    jogadores = [
+        Jogador(pelada.id, f'Jogador {i}', telefone=f'1199999{i:04d}')
+        for i in range(quantidade_times * jogadores_por_time)
+    ]
+    db.session.add_all(jogadores)
+
+    hoje = date.today()
+    temporada = Temporada(pelada.id, hoje.replace(day=1), hoje.replace(day=1) + timedelta(days=27))
+    db.session.add(temporada)
+    db.session.flush()
+
+    times = [Time(temporada.id, f'Time {i}') for i in range(quantidade_times)]
+    db.session.add_all(times)
+    db.session.flush()
+    db.session.add_all(Classificacao(temporada_id=temporada.id, time_id=t.id) for t in times)
+    for i, jogador in enumerate(jogadores):
+        db.session.add(TimeJogador(times[i % quantidade_times].id, jogador.id))
+
+    rodada = Rodada(temporada.id, hoje, quantidade_times, jogadores_por_time)
+    db.session.add(rodada)
+    db.session.flush()
+
+    partidas = []
+    for i in range(0, quantidade_times - 1, 2):
+        partida = Partida(rodada.id, times[i].id, times[i + 1].id)
+        partida.status = 'finalizada'
+        partidas.append(partida)
+    aberta = Partida(rodada.id, times[0].id, times[3].id)
+    aberta.status = 'em_andamento'
+    db.session.add_all(partidas + [aberta])
+
+    # Rodada sem partidas nem sorteio, para as rotas de geração
+    rodada_nova = Rodada(temporada.id, hoje + timedelta(days=7), quantidade_times, jogadores_por_time)
+    db.session.add(rodada_nova)
+    db.session.flush()
+
+    for partida in partidas:
+        casa = [j for k, j in enumerate(jogadores) if times[k % quantidade_times].id == partida.time_casa_id]
+        for minuto in range(gols_por_partida):
+            gol = Gol(partida.id, partida.time_casa_id, casa[minuto % len(casa)].id, minuto * 10)
+            gol.assistencia_id = casa[(minuto + 1) % len(casa)].id
+            db.session.add(gol)
+        partida.gols_casa = gols_por_partida
+
+    agora = datetime.now()
+    votacao = Votacao(rodada.id, agora - timedelta(hours=1), agora + timedelta(hours=1), 'melhor')
+    db.session.add(votacao)
+    db.session.flush()
+    for votante, votado in zip(jogadores, reversed(jogadores)):
+        if votante.id != votado.id:
+            db.session.add(Voto(votacao.id, votante.id, votado.id, 5))
+
+    db.session.commit()
+    return {
+        'usuario': gerente.id, 'pelada': pelada.id, 'jogador': jogadores[0].id, 'temporada': temporada.id,
+        'rodada': rodada.id, 'time': times[0].id, 'partida': partidas[0].id, 'votacao': votacao.id,
+        'partida_aberta': aberta.id, 'rodada_nova': rodada_nova.id,
+        'jogadores': [j.id for j in jogadores],
+        'jogadores_time': [j.id for k, j in enumerate(jogadores) if k % quantidade_times == 0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verifica o número máximo de consultas SQL por endpoint')
+    parser.add_argument('--verbose', action='store_true', help='mostra o SQL das rotas acima do orçamento')
+    args = parser.parse_args()
+
+    app = create_app(ConfigOrcamento)
+    with app.app_context():
+        db.create_all()
+        ids = semear()
+        cabecalhos = {'Authorization': 'Bearer ' + create_access_token(identity=str(ids['usuario']))}
+
+        statements = []
+
+        def contar(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', contar)
+
+    cliente = app.test_client()
+    estouros = 0
+    for metodo, rota, maximo, *corpo in ORCAMENTOS:
+        url = rota.format(**ids)
+        extras = corpo[0](ids) if corpo else {}
+        statements.clear()
+        resposta = cliente.open(url, method=metodo, headers=cabecalhos, **extras)
+        resposta.get_data()  # respostas transmitidas (importação) só consultam ao serem lidas
+        total = len(statements)
+
+        if resposta.status_code >= 400:
+            situacao = f'ERRO {resposta.status_code}'
+            estouros += 1
+        elif total > maximo:
+            situacao = 'ESTOUROU'
+            estouros += 1
+        else:
+            situacao = 'ok'
+        print(f'{situacao:<9} {total:>3}/{maximo:<3} {metodo} {rota}')
+
+        if situacao != 'ok' and args.verbose:
+            for statement in statements:
+                print('            ' + ' '.join(statement.split())[:200])
+
+    print(f'\n{estouros} rota(s) fora do orçamento')
+    return 1 if estouros else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,14 @@
 from flask import Flask
 from flask_cors import CORS
 from config import Config
-from source.extensions.extensios import db, migrate, jwt
+from source.extensions.extensios import db, migrate, jwt, cache, instrumentacao, metricas, armazenamento
+from source.utils.json_provider import ProvedorJSON
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    # JSON de respostas: orjson quando instalado, datas em ISO 8601
+    app.json = ProvedorJSON(app)
 
     # Configurar CORS
     # Em desenvolvimento: aceita todas as origens (inclui rede local)
@@ -19,8 +22,8 @@ def create_app(config_class=Config):
             r"/api/*": {
                 "origins": "*",  # Aceita qualquer origem em desenvolvimento
                 "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-                "allow_headers": ["Content-Type", "Authorization"],
-                "expose_headers": ["Content-Type", "Authorization"],
+                "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key"],
+                "expose_headers": ["Content-Type", "Authorization", "X-DB-Queries", "Server-Timing"],
                 "supports_credentials": True,
                 "max_age": 3600
             },
@@ -29,6 +32,7 @@ def create_app(config_class=Config):
                 "methods": ["GET", "OPTIONS"],
                 "allow_headers": ["Content-Type"],
                 "expose_headers": ["Content-Type"],
+                "send_wildcard": True,  # "*" literal: sem Vary: Origin, uma cópia só no cache/CDN
                 "supports_credentials": False,
                 "max_age": 3600
             }
@@ -39,16 +43,18 @@ def create_app(config_class=Config):
             r"/api/*": {
                 "origins": ["http://localhost:3000", "http://localhost:3001"],
                 "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-                "allow_headers": ["Content-Type", "Authorization"],
-                "expose_headers": ["Content-Type", "Authorization"],
+                "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key"],
+                "expose_headers": ["Content-Type", "Authorization", "X-DB-Queries", "Server-Timing"],
                 "supports_credentials": True,
                 "max_age": 3600
             },
             r"/static/*": {
-                "origins": ["http://localhost:3000", "http://localhost:3001"],
+                # Uploads são públicos (escudos e fotos usados em fetch/canvas de qualquer front-end)
+                "origins": "*",
                 "methods": ["GET", "OPTIONS"],
                 "allow_headers": ["Content-Type"],
                 "expose_headers": ["Content-Type"],
+                "send_wildcard": True,  # "*" literal: sem Vary: Origin, uma cópia só no cache/CDN
                 "supports_credentials": False,
                 "max_age": 3600
             }
@@ -58,37 +64,46 @@ def create_app(config_class=Config):
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    cache.init_app(app)
+    instrumentacao.init_app(app)
+    metricas.init_app(app, db)
+    armazenamento.init_app(app)
+
+    from source.utils.images import Image
+    if Image is None:
+        app.logger.warning(
+            'Pillow não instalado: uploads de imagens serão guardados sem redimensionar '
+            'nem remover EXIF (pip install -r requirements.txt)'
+        )
 
     # Importação dos modelos
     with app.app_context():
         from source.domain.users.models import User
         from source.domain.peladas.models import (
             Pelada, Jogador, Temporada, Rodada, Time, TimeJogador,
-            Partida, Gol, Votacao, Voto
+            Partida, Gol, Votacao, Voto, Classificacao
         )
+        from source.domain.jobs.models import Job
+        from source.domain.arquivos.models import Arquivo
         
     # Registrar blueprints
     from source.api.user import user_bp
     from source.api.pelada import pelada_bp
     from source.api.image_processor import image_processor_bp
+    from source.api.jobs import jobs_bp
 
     app.register_blueprint(user_bp, url_prefix='/api/usuarios')
     app.register_blueprint(pelada_bp, url_prefix='/api/peladas')
     app.register_blueprint(image_processor_bp, url_prefix='/api/image')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+
+    # Servir arquivos estáticos de uploads (cache HTTP, 304/206 e entrega opcional pelo proxy)
+    from source.utils.static_files import servir_upload
 
-    # Servir arquivos estáticos de uploads
-    import os
-    from flask import send_from_directory, Response
-    
     @app.route('/static/uploads/<path:filename>')
     def uploaded_file(filename):
-        upload_dir = os.path.join(app.root_path, '..', 'static', 'uploads')
-        response = send_from_directory(upload_dir, filename)
-        # Adicionar headers CORS explicitamente
-        response.headers.add('Access-Control-Allow-Origin', '*')
-        response.headers.add('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
-        return response
+        # Mesmo diretório do armazenamento local (ARMAZENAMENTO_DIR, padrão static/uploads)
+        return servir_upload(armazenamento.backend.raiz, filename)
 
     @app.route('/')
     def index():
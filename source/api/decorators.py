@@ -1,14 +1,39 @@
 # -*- coding: utf-8 -*-
+import time
 from functools import wraps
 from flask import jsonify
-from flask_jwt_extended import get_jwt_identity
-from source.domain.users.models import User
-from source.extensions.extensios import db
+from flask_jwt_extended import get_jwt_identity, get_jwt
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.base import NO_VALUE
+from source.domain.users.services import UserService
+from source.extensions.extensios import db, cache
+from source.utils.cache import BackendLRU
 from source.domain.peladas.models import (
     Pelada, Temporada, Rodada, Time, Jogador, Partida, Gol, Votacao
 )
 
 
+def _tipo_required(tipos_permitidos, mensagem):
+    """Fábrica dos decoradores de tipo de usuário (usuário carregado uma vez por requisição)"""
+    def decorador_real(f):
+        @wraps(f)
+        def decorador(*args, **kwargs):
+            tipo_usuario = UserService.obter_tipo_usuario_atual()
+
+            if not tipo_usuario:
+                return jsonify({'erro': 'Usuário não encontrado'}), 404
+
+            if tipo_usuario not in tipos_permitidos:
+                return jsonify({'erro': mensagem}), 403
+
+            return f(*args, **kwargs)
+
+        return decorador
+
+    return decorador_real
+
+
 def afiliado_required(f):
     """
     Decorador para verificar se o usuário é AFILIADO
@@ -18,21 +43,7 @@ def afiliado_required(f):
         def minha_rota():
             ...
     """
-    @wraps(f)
-    def decorador(*args, **kwargs):
-      
-        id_usuario = get_jwt_identity()
-        usuario = User.query.get(int(id_usuario))
-
-        if not usuario:
-            return jsonify({'erro': 'Usuário não encontrado'}), 404
-
-        if usuario.tipo_usuario != 'afiliado':
-            return jsonify({'erro': 'Acesso negado. Apenas afiliados podem acessar'}), 403
-
-        return f(*args, **kwargs)
-
-    return decorador
+    return _tipo_required(('afiliado',), 'Acesso negado. Apenas afiliados podem acessar')(f)
 
 
 def admin_required(f):
@@ -44,21 +55,7 @@ def admin_required(f):
         def minha_rota():
             ...
     """
-    @wraps(f)
-    def decorador(*args, **kwargs):
-
-        id_usuario = get_jwt_identity()
-        usuario = User.query.get(int(id_usuario))
-
-        if not usuario:
-            return jsonify({'erro': 'Usuário não encontrado'}), 404
-
-        if usuario.tipo_usuario != 'admin':
-            return jsonify({'erro': 'Acesso negado. Apenas administradores podem acessar'}), 403
-
-        return f(*args, **kwargs)
-
-    return decorador
+    return _tipo_required(('admin',), 'Acesso negado. Apenas administradores podem acessar')(f)
 
 
 def produtor_required(f):
@@ -70,20 +67,7 @@ def produtor_required(f):
         def minha_rota():
             ...
     """
-    @wraps(f)
-    def decorador(*args, **kwargs):
-        id_usuario = get_jwt_identity()
-        usuario = User.query.get(int(id_usuario))
-
-        if not usuario:
-            return jsonify({'erro': 'Usuário não encontrado'}), 404
-
-        if usuario.tipo_usuario != 'produtor':
-            return jsonify({'erro': 'Acesso negado. Apenas produtores podem acessar'}), 403
-
-        return f(*args, **kwargs)
-
-    return decorador
+    return _tipo_required(('produtor',), 'Acesso negado. Apenas produtores podem acessar')(f)
 
 
 def tipo_usuario_required(*tipos_permitidos):
@@ -95,30 +79,137 @@ def tipo_usuario_required(*tipos_permitidos):
         def minha_rota():
             ...
     """
-    def decorador_real(f):
-        @wraps(f)
-        def decorador(*args, **kwargs):
-            # Pegar o ID do usuário do token JWT
-            id_usuario = get_jwt_identity()
-            usuario = User.query.get(int(id_usuario))
-            if not usuario:
-                return jsonify({'erro': 'Usuário não encontrado'}), 404
-
-            if usuario.tipo_usuario not in tipos_permitidos:
-                tipos_str = ', '.join(tipos_permitidos)
-                return jsonify({
-                    'erro': f'Acesso negado. Apenas {tipos_str} podem acessar'
-                }), 403
-
-            return f(*args, **kwargs)
-
-        return decorador
-
-    return decorador_real
+    tipos_str = ', '.join(tipos_permitidos)
+    return _tipo_required(tipos_permitidos, f'Acesso negado. Apenas {tipos_str} podem acessar')
 
 
 # ==================== ESCOPO DE ACESSO (PELADAS) ====================
 # Regra: o usuário só pode acessar/alterar recursos dentro de peladas onde ele é o gerente (criador).
+#
+# A verificação é feita em duas etapas, ambas em cache:
+#   1. (tipo, id) -> pelada_id: as FKs até a pelada nunca mudam depois de criadas,
+#      então o mapeamento fica num LRU local sem TTL.
+#   2. usuario_id -> ids das peladas que ele gerencia: guardado no backend do cache
+#      de respostas (redis, compartilhado entre os processos) pela vida do JWT
+#      (jti/exp) e invalidado quando uma pelada troca de gerente. Com
+#      CACHE_BACKEND='nenhum' a consulta vai ao banco a cada verificação.
+
+ESCOPO_CACHE_MAX_ITENS = 10000
+
+_pelada_por_entidade = BackendLRU(ESCOPO_CACHE_MAX_ITENS)
+
+# Consulta que leva cada tipo de entidade até o id da pelada
+_CAMINHOS_ATE_PELADA = {
+    'jogador': lambda entidade_id: (
+        db.session.query(Jogador.pelada_id)
+        .filter(Jogador.id == entidade_id)
+    ),
+    'temporada': lambda entidade_id: (
+        db.session.query(Temporada.pelada_id)
+        .filter(Temporada.id == entidade_id)
+    ),
+    'rodada': lambda entidade_id: (
+        db.session.query(Temporada.pelada_id)
+        .join(Rodada, Rodada.temporada_id == Temporada.id)
+        .filter(Rodada.id == entidade_id)
+    ),
+    'time': lambda entidade_id: (
+        db.session.query(Temporada.pelada_id)
+        .join(Time, Time.temporada_id == Temporada.id)
+        .filter(Time.id == entidade_id)
+    ),
+    'partida': lambda entidade_id: (
+        db.session.query(Temporada.pelada_id)
+        .join(Rodada, Rodada.temporada_id == Temporada.id)
+        .join(Partida, Partida.rodada_id == Rodada.id)
+        .filter(Partida.id == entidade_id)
+    ),
+    'gol': lambda entidade_id: (
+        db.session.query(Temporada.pelada_id)
+        .join(Rodada, Rodada.temporada_id == Temporada.id)
+        .join(Partida, Partida.rodada_id == Rodada.id)
+        .join(Gol, Gol.partida_id == Partida.id)
+        .filter(Gol.id == entidade_id)
+    ),
+    'votacao': lambda entidade_id: (
+        db.session.query(Temporada.pelada_id)
+        .join(Rodada, Rodada.temporada_id == Temporada.id)
+        .join(Votacao, Votacao.rodada_id == Rodada.id)
+        .filter(Votacao.id == entidade_id)
+    ),
+}
+
+
+def resolver_pelada_id(tipo, entidade_id):
+    """Retorna o id da pelada dona da entidade (ou None se a entidade não existir)"""
+    if tipo == 'pelada':
+        return entidade_id
+
+    chave = f'{tipo}:{entidade_id}'
+    pelada_id = _pelada_por_entidade.get(chave)
+    if pelada_id is None:
+        linha = _CAMINHOS_ATE_PELADA[tipo](entidade_id).first()
+        if not linha:
+            return None
+        pelada_id = linha[0]
+        _pelada_por_entidade.set(chave, pelada_id)
+    return pelada_id
+
+
+def _carregar_peladas_do_usuario(usuario_id):
+    return frozenset(
+        pelada_id for (pelada_id,) in
+        db.session.query(Pelada.id).filter(Pelada.usuario_gerente_id == usuario_id)
+    )
+
+
+def _chave_peladas_do_usuario(usuario_id):
+    dados_jwt = get_jwt()
+    return f"gerente:{usuario_id}:{cache.versao('gerente', usuario_id)}:{dados_jwt.get('jti')}"
+
+
+def _guardar_peladas_do_usuario(chave, peladas):
+    expira_em = get_jwt().get('exp')
+    ttl = int(expira_em - time.time()) if expira_em else 3600
+    cache.backend.set(chave, peladas, max(ttl, 1))
+
+
+def usuario_gerencia_pelada(usuario_id, pelada_id):
+    """Verifica se o usuário é gerente da pelada, usando o conjunto de peladas em cache"""
+    if cache.backend is None:
+        return pelada_id in _carregar_peladas_do_usuario(usuario_id)
+
+    chave = _chave_peladas_do_usuario(usuario_id)
+    peladas = cache.backend.get(chave)
+    if peladas is not None and pelada_id in peladas:
+        return True
+
+    # Cache ausente ou pelada criada depois dele: recarrega uma vez do banco
+    peladas = _carregar_peladas_do_usuario(usuario_id)
+    _guardar_peladas_do_usuario(chave, peladas)
+    return pelada_id in peladas
+
+
+@event.listens_for(Pelada.usuario_gerente_id, 'set')
+def _registrar_troca_de_gerente(pelada, novo_gerente, gerente_anterior, iniciador):
+    """Anota na sessão os gerentes afetados; a invalidação só acontece após o commit"""
+    if gerente_anterior in (NO_VALUE, None) or gerente_anterior == novo_gerente:
+        return
+    sessao = object_session(pelada)
+    if sessao is not None:
+        sessao.info.setdefault('gerentes_alterados', set()).update({gerente_anterior, novo_gerente})
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_gerentes_alterados(sessao):
+    for usuario_id in sessao.info.pop('gerentes_alterados', ()):
+        cache.invalidar(('gerente', usuario_id))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_gerentes_alterados(sessao):
+    sessao.info.pop('gerentes_alterados', None)
+
 
 def _usuario_logado_id():
     id_usuario = get_jwt_identity()
@@ -132,178 +223,60 @@ def _acesso_negado():
     return jsonify({'erro': 'Acesso negado. Recurso fora do seu escopo.'}), 403
 
 
-def pelada_owner_required(f):
-    """Garante que `pelada_id` do path pertence ao usuário logado."""
-    @wraps(f)
-    def decorador(*args, **kwargs):
-        usuario_id = _usuario_logado_id()
-        pelada_id = kwargs.get('pelada_id')
-        if not usuario_id or pelada_id is None:
-            return _acesso_negado()
+def _escopo_required(tipo, parametro):
+    """Fábrica dos decoradores *_owner_required: `parametro` da rota deve pertencer a uma pelada do usuário"""
+    def decorador_real(f):
+        @wraps(f)
+        def decorador(*args, **kwargs):
+            usuario_id = _usuario_logado_id()
+            entidade_id = kwargs.get(parametro)
+            if not usuario_id or entidade_id is None:
+                return _acesso_negado()
 
-        existe = db.session.query(Pelada.id).filter(
-            Pelada.id == int(pelada_id),
-            Pelada.usuario_gerente_id == int(usuario_id)
-        ).first()
+            pelada_id = resolver_pelada_id(tipo, int(entidade_id))
+            if pelada_id is None or not usuario_gerencia_pelada(usuario_id, pelada_id):
+                return _acesso_negado()
 
-        if not existe:
-            return _acesso_negado()
+            return f(*args, **kwargs)
+        return decorador
+    return decorador_real
 
-        return f(*args, **kwargs)
-    return decorador
+
+def pelada_owner_required(f):
+    """Garante que `pelada_id` do path pertence ao usuário logado."""
+    return _escopo_required('pelada', 'pelada_id')(f)
 
 
 def jogador_owner_required(f):
     """Garante que `jogador_id` pertence a uma pelada do usuário logado."""
-    @wraps(f)
-    def decorador(*args, **kwargs):
-        usuario_id = _usuario_logado_id()
-        jogador_id = kwargs.get('jogador_id')
-        if not usuario_id or jogador_id is None:
-            return _acesso_negado()
-
-        existe = (
-            db.session.query(Jogador.id)
-            .join(Pelada, Jogador.pelada_id == Pelada.id)
-            .filter(Jogador.id == int(jogador_id), Pelada.usuario_gerente_id == int(usuario_id))
-            .first()
-        )
-        if not existe:
-            return _acesso_negado()
-        return f(*args, **kwargs)
-    return decorador
+    return _escopo_required('jogador', 'jogador_id')(f)
 
 
 def temporada_owner_required(f):
     """Garante que `temporada_id` pertence a uma pelada do usuário logado."""
-    @wraps(f)
-    def decorador(*args, **kwargs):
-        usuario_id = _usuario_logado_id()
-        temporada_id = kwargs.get('temporada_id')
-        if not usuario_id or temporada_id is None:
-            return _acesso_negado()
-
-        existe = (
-            db.session.query(Temporada.id)
-            .join(Pelada, Temporada.pelada_id == Pelada.id)
-            .filter(Temporada.id == int(temporada_id), Pelada.usuario_gerente_id == int(usuario_id))
-            .first()
-        )
-        if not existe:
-            return _acesso_negado()
-        return f(*args, **kwargs)
-    return decorador
+    return _escopo_required('temporada', 'temporada_id')(f)
 
 
 def rodada_owner_required(f):
     """Garante que `rodada_id` pertence a uma pelada do usuário logado."""
-    @wraps(f)
-    def decorador(*args, **kwargs):
-        usuario_id = _usuario_logado_id()
-        rodada_id = kwargs.get('rodada_id')
-        if not usuario_id or rodada_id is None:
-            return _acesso_negado()
-
-        existe = (
-            db.session.query(Rodada.id)
-            .join(Temporada, Rodada.temporada_id == Temporada.id)
-            .join(Pelada, Temporada.pelada_id == Pelada.id)
-            .filter(Rodada.id == int(rodada_id), Pelada.usuario_gerente_id == int(usuario_id))
-            .first()
-        )
-        if not existe:
-            return _acesso_negado()
-        return f(*args, **kwargs)
-    return decorador
+    return _escopo_required('rodada', 'rodada_id')(f)
 
 
 def time_owner_required(f):
     """Garante que `time_id` pertence a uma pelada do usuário logado."""
-    @wraps(f)
-    def decorador(*args, **kwargs):
-        usuario_id = _usuario_logado_id()
-        time_id = kwargs.get('time_id')
-        if not usuario_id or time_id is None:
-            return _acesso_negado()
-
-        existe = (
-            db.session.query(Time.id)
-            .join(Temporada, Time.temporada_id == Temporada.id)
-            .join(Pelada, Temporada.pelada_id == Pelada.id)
-            .filter(Time.id == int(time_id), Pelada.usuario_gerente_id == int(usuario_id))
-            .first()
-        )
-        if not existe:
-            return _acesso_negado()
-        return f(*args, **kwargs)
-    return decorador
+    return _escopo_required('time', 'time_id')(f)
 
 
 def partida_owner_required(f):
     """Garante que `partida_id` pertence a uma pelada do usuário logado."""
-    @wraps(f)
-    def decorador(*args, **kwargs):
-        usuario_id = _usuario_logado_id()
-        partida_id = kwargs.get('partida_id')
-        if not usuario_id or partida_id is None:
-            return _acesso_negado()
-
-        existe = (
-            db.session.query(Partida.id)
-            .join(Rodada, Partida.rodada_id == Rodada.id)
-            .join(Temporada, Rodada.temporada_id == Temporada.id)
-            .join(Pelada, Temporada.pelada_id == Pelada.id)
-            .filter(Partida.id == int(partida_id), Pelada.usuario_gerente_id == int(usuario_id))
-            .first()
-        )
-        if not existe:
-            return _acesso_negado()
-        return f(*args, **kwargs)
-    return decorador
+    return _escopo_required('partida', 'partida_id')(f)
 
 
 def gol_owner_required(f):
     """Garante que `gol_id` pertence a uma pelada do usuário logado."""
-    @wraps(f)
-    def decorador(*args, **kwargs):
-        usuario_id = _usuario_logado_id()
-        gol_id = kwargs.get('gol_id')
-        if not usuario_id or gol_id is None:
-            return _acesso_negado()
-
-        existe = (
-            db.session.query(Gol.id)
-            .join(Partida, Gol.partida_id == Partida.id)
-            .join(Rodada, Partida.rodada_id == Rodada.id)
-            .join(Temporada, Rodada.temporada_id == Temporada.id)
-            .join(Pelada, Temporada.pelada_id == Pelada.id)
-            .filter(Gol.id == int(gol_id), Pelada.usuario_gerente_id == int(usuario_id))
-            .first()
-        )
-        if not existe:
-            return _acesso_negado()
-        return f(*args, **kwargs)
-    return decorador
+    return _escopo_required('gol', 'gol_id')(f)
 
 
 def votacao_owner_required(f):
     """Garante que `votacao_id` pertence a uma pelada do usuário logado."""
-    @wraps(f)
-    def decorador(*args, **kwargs):
-        usuario_id = _usuario_logado_id()
-        votacao_id = kwargs.get('votacao_id')
-        if not usuario_id or votacao_id is None:
-            return _acesso_negado()
-
-        existe = (
-            db.session.query(Votacao.id)
-            .join(Rodada, Votacao.rodada_id == Rodada.id)
-            .join(Temporada, Rodada.temporada_id == Temporada.id)
-            .join(Pelada, Temporada.pelada_id == Pelada.id)
-            .filter(Votacao.id == int(votacao_id), Pelada.usuario_gerente_id == int(usuario_id))
-            .first()
-        )
-        if not existe:
-            return _acesso_negado()
-        return f(*args, **kwargs)
-    return decorador
+    return _escopo_required('votacao', 'votacao_id')(f)
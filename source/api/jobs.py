@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import hashlib
+
+from flask import Blueprint, request, jsonify, url_for
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from source.domain.jobs.services import JobService
+
+jobs_bp = Blueprint('jobs', __name__)
+
+
+def assincrono_solicitado(dados=None):
+    """`?assincrono=true` ou `"assincrono": true` no body JSON"""
+    if request.args.get('assincrono', '').lower() == 'true':
+        return True
+    return bool(dados) and dados.get('assincrono') is True
+
+
+def _identidade_cliente():
+    """Usuário do JWT (se houver) ou, nas rotas sem login, o IP de origem"""
+    verify_jwt_in_request(optional=True)
+    usuario_id = get_jwt_identity()
+    return f'usuario:{usuario_id}' if usuario_id else f'ip:{request.remote_addr}'
+
+
+def resposta_enfileirada(tipo, payload):
+    """
+    Enfileira a tarefa e responde 202 com o job e a URL de acompanhamento
+
+    O cabeçalho `Idempotency-Key` (opcional) evita jobs duplicados quando o
+    cliente repete a requisição. A chave vale por tarefa e por cliente (usuário
+    do JWT ou IP); reusá-la com outro payload responde 422.
+    """
+    chave = request.headers.get('Idempotency-Key')
+    if chave:
+        escopo = f'{tipo}|{_identidade_cliente()}|{chave.strip()[:120]}'
+        chave = hashlib.sha256(escopo.encode('utf-8')).hexdigest()
+    job, erro = JobService.enfileirar(tipo, payload, chave_idempotencia=chave)
+    if erro:
+        codigo_status = 422 if 'Idempotency-Key' in erro else 400
+        return jsonify({'erro': erro}), codigo_status
+    return jsonify({
+        'job': job,
+        'status_url': url_for('jobs.obter_job', job_id=job['id'])
+    }), 202
+
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+def obter_job(job_id):
+    """
+    Situação de uma tarefa em segundo plano
+
+    `status`: pendente, executando, concluido ou falhou. `resultado` traz o
+    retorno da tarefa quando concluída; `erro`, a última falha.
+    """
+    try:
+        job, erro = JobService.obter_job(job_id)
+        if erro:
+            return jsonify({'erro': erro}), 404
+        return jsonify(job), 200
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
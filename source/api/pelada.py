@@ -1,120 +1,26 @@
 # -*- coding: utf-8 -*-
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, stream_with_context
 from source.domain.peladas.services import (
     PeladaService, JogadorService, TemporadaService, RodadaService,
-    TimeService, PartidaService, GolService, RankingService, VotacaoService
+    TimeService, PartidaService, GolService, RankingService, VotacaoService,
+    ClassificacaoService, TabelaService, BalanceamentoService
 )
+from source.domain.arquivos.services import ArquivoService
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from source.extensions.extensios import cache
+from source.utils.pagination import opcoes_paginacao
+from source.utils.serializers import opcoes_selecao
+from source.utils.streaming import fluxo_solicitado, resposta_json_em_fluxo
 from flask import Response
+from source.api.jobs import assincrono_solicitado, resposta_enfileirada
 from source.api.decorators import (
     pelada_owner_required, jogador_owner_required, temporada_owner_required, rodada_owner_required,
     time_owner_required, partida_owner_required, gol_owner_required, votacao_owner_required
 )
-import os
-from werkzeug.utils import secure_filename
-from datetime import datetime
+import csv
 
 pelada_bp = Blueprint('pelada', __name__)
 
-# Extensões permitidas para upload
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
-
-def allowed_file(filename):
-    """Verifica se o arquivo tem extensão permitida"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-
-def salvar_imagem_pelada(arquivo, tipo='logo'):
-    """
-    Salva uma imagem de pelada no servidor
-    
-    Args:
-        arquivo: objeto FileStorage do Flask
-        tipo: 'logo' ou 'perfil'
-    
-    Returns:
-        str: caminho relativo da imagem salva ou None se houver erro
-    """
-    if not arquivo or not allowed_file(arquivo.filename):
-        return None
-    
-    # Criar estrutura de pastas: static/uploads/peladas/
-    upload_dir = os.path.join(current_app.root_path, '..', 'static', 'uploads', 'peladas')
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    # Gerar nome único: timestamp_nome_seguro.extensao
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
-    filename = secure_filename(arquivo.filename)
-    nome_base, extensao = os.path.splitext(filename)
-    novo_nome = f"{tipo}_{timestamp}{extensao}"
-    
-    caminho_completo = os.path.join(upload_dir, novo_nome)
-    arquivo.save(caminho_completo)
-    
-    # Retornar caminho relativo para acessar via URL: /static/uploads/peladas/nome.jpg
-    return f"/static/uploads/peladas/{novo_nome}"
-
-
-def salvar_imagem_jogador(arquivo):
-    """
-    Salva uma foto de jogador no servidor
-    
-    Args:
-        arquivo: objeto FileStorage do Flask
-    
-    Returns:
-        str: caminho relativo da imagem salva ou None se houver erro
-    """
-    if not arquivo or not allowed_file(arquivo.filename):
-        return None
-    
-    # Criar estrutura de pastas: static/uploads/jogadores/
-    upload_dir = os.path.join(current_app.root_path, '..', 'static', 'uploads', 'jogadores')
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    # Gerar nome único: timestamp_nome_seguro.extensao
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
-    filename = secure_filename(arquivo.filename)
-    nome_base, extensao = os.path.splitext(filename)
-    novo_nome = f"foto_{timestamp}{extensao}"
-    
-    caminho_completo = os.path.join(upload_dir, novo_nome)
-    arquivo.save(caminho_completo)
-    
-    # Retornar caminho relativo para acessar via URL: /static/uploads/jogadores/nome.jpg
-    return f"/static/uploads/jogadores/{novo_nome}"
-
-
-def salvar_imagem_time(arquivo):
-    """
-    Salva um escudo de time no servidor
-    
-    Args:
-        arquivo: objeto FileStorage do Flask
-    
-    Returns:
-        str: caminho relativo da imagem salva ou None se houver erro
-    """
-    if not arquivo or not allowed_file(arquivo.filename):
-        return None
-    
-    # Criar estrutura de pastas: static/uploads/times/
-    upload_dir = os.path.join(current_app.root_path, '..', 'static', 'uploads', 'times')
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    # Gerar nome único: timestamp_nome_seguro.extensao
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
-    filename = secure_filename(arquivo.filename)
-    nome_base, extensao = os.path.splitext(filename)
-    novo_nome = f"escudo_{timestamp}{extensao}"
-    
-    caminho_completo = os.path.join(upload_dir, novo_nome)
-    arquivo.save(caminho_completo)
-    
-    # Retornar caminho relativo para acessar via URL: /static/uploads/times/nome.jpg
-    return f"/static/uploads/times/{novo_nome}"
-
-
-
 @pelada_bp.route('/', methods=['POST'])
 @jwt_required()
 def criar_pelada():
@@ -153,12 +59,12 @@ def criar_pelada():
             if 'logo' in request.files:
                 arquivo_logo = request.files['logo']
                 if arquivo_logo and arquivo_logo.filename:
-                    logo_url = salvar_imagem_pelada(arquivo_logo, tipo='logo')
+                    logo_url = ArquivoService.salvar_imagem(arquivo_logo)
             
             if 'perfil' in request.files:
                 arquivo_perfil = request.files['perfil']
                 if arquivo_perfil and arquivo_perfil.filename:
-                    perfil_url = salvar_imagem_pelada(arquivo_perfil, tipo='perfil')
+                    perfil_url = ArquivoService.salvar_imagem(arquivo_perfil)
         else:
             # Fallback para JSON (sem imagens)
             dados = request.get_json(silent=True)  # silent=True evita erro 415
@@ -196,13 +102,20 @@ def criar_pelada():
 def listar_peladas():
     """Listar peladas com filtros opcionais (público)"""
     try:
+        selecao, erro = opcoes_selecao(request.args, 'pelada')
+        if erro:
+            return jsonify({'erro': erro}), 400
+
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         # Permite filtrar por usuario_id opcionalmente via query parameter
         usuario_id = request.args.get('usuario_id', type=int)
         ativa = request.args.get('ativa', type=lambda x: x.lower() == 'true')
+        cursor, include_total = opcoes_paginacao(request.args)
 
-        resultado, erro = PeladaService.listar_peladas(page, per_page, usuario_id, ativa)
+        resultado, erro = PeladaService.listar_peladas(
+            page, per_page, usuario_id, ativa, cursor, include_total, selecao=selecao
+        )
 
         if erro:
             return jsonify({'erro': erro}), 400
@@ -219,7 +132,11 @@ def listar_peladas():
 def obter_pelada(pelada_id):
     """Obter pelada por ID"""
     try:
-        pelada, erro = PeladaService.obter_pelada_por_id(pelada_id)
+        selecao, erro = opcoes_selecao(request.args, 'pelada')
+        if erro:
+            return jsonify({'erro': erro}), 400
+
+        pelada, erro = PeladaService.obter_pelada_por_id(pelada_id, selecao=selecao)
 
         if erro:
             codigo_status = 404 if 'não encontrada' in erro else 400
@@ -283,14 +200,14 @@ def atualizar_pelada(pelada_id):
             if 'logo' in request.files:
                 arquivo_logo = request.files['logo']
                 if arquivo_logo and arquivo_logo.filename:
-                    logo_url = salvar_imagem_pelada(arquivo_logo, tipo='logo')
+                    logo_url = ArquivoService.salvar_imagem(arquivo_logo)
                     if logo_url:
                         dados['logo_url'] = logo_url
             
             if 'perfil' in request.files:
                 arquivo_perfil = request.files['perfil']
                 if arquivo_perfil and arquivo_perfil.filename:
-                    perfil_url = salvar_imagem_pelada(arquivo_perfil, tipo='perfil')
+                    perfil_url = ArquivoService.salvar_imagem(arquivo_perfil)
                     if perfil_url:
                         dados['perfil_url'] = perfil_url
         else:
@@ -348,7 +265,7 @@ def criar_jogador(pelada_id):
             if 'foto' in request.files:
                 arquivo_foto = request.files['foto']
                 if arquivo_foto and arquivo_foto.filename:
-                    foto_url = salvar_imagem_jogador(arquivo_foto)
+                    foto_url = ArquivoService.salvar_imagem(arquivo_foto)
         else:
             dados = request.get_json(silent=True)
             if not dados:
@@ -382,11 +299,18 @@ def criar_jogador(pelada_id):
 def listar_jogadores(pelada_id):
     """Listar jogadores de uma pelada"""
     try:
+        selecao, erro = opcoes_selecao(request.args, 'jogador')
+        if erro:
+            return jsonify({'erro': erro}), 400
+
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
         ativo = request.args.get('ativo', type=lambda x: x.lower() == 'true' if x else None)
+        cursor, include_total = opcoes_paginacao(request.args)
 
-        resultado, erro = JogadorService.listar_jogadores(pelada_id, page, per_page, ativo)
+        resultado, erro = JogadorService.listar_jogadores(
+            pelada_id, page, per_page, ativo, cursor, include_total, selecao=selecao
+        )
 
         if erro:
             return jsonify({'erro': erro}), 400
@@ -397,13 +321,90 @@ def listar_jogadores(pelada_id):
         return jsonify({'erro': str(e)}), 500
 
 
+def ler_linhas_importacao(stream, formato):
+    """
+    Lê o arquivo de importação linha a linha, sem carregar o corpo inteiro em memória
+
+    Yields:
+        (numero_linha, dados, erro_de_leitura)
+    """
+    linhas_texto = (linha.decode('utf-8-sig') for linha in stream)
+
+    if formato == 'csv':
+        leitor = csv.DictReader(linhas_texto)
+        for dados in leitor:
+            if None in dados:
+                yield leitor.line_num, None, 'Linha com mais colunas que o cabeçalho'
+            else:
+                yield leitor.line_num, dados, None
+        return
+
+    for numero_linha, linha in enumerate(linhas_texto, start=1):
+        if not linha.strip():
+            continue
+        try:
+            yield numero_linha, current_app.json.loads(linha), None
+        except ValueError:
+            yield numero_linha, None, 'JSON inválido'
+
+
+@pelada_bp.route('/<int:pelada_id>/jogadores/importar', methods=['POST'])
+@jwt_required()
+@pelada_owner_required
+def importar_jogadores(pelada_id):
+    """
+    Importar jogadores em massa a partir de CSV ou NDJSON
+
+    Aceita o arquivo no corpo (Content-Type text/csv ou application/x-ndjson)
+    ou em multipart/form-data no campo 'arquivo' (.csv, .ndjson, .jsonl).
+    Colunas/chaves: nome_completo (obrigatório), apelido, telefone.
+
+    A resposta é NDJSON transmitida durante o processamento: um objeto por linha
+    rejeitada ou duplicada, um por lote gravado e um 'resumo' ao final.
+    Query params: lote (linhas por commit, padrão IMPORTACAO_TAMANHO_LOTE)
+    """
+    content_type = request.content_type or ''
+
+    if 'multipart/form-data' in content_type:
+        arquivo = request.files.get('arquivo')
+        if not arquivo or not arquivo.filename:
+            return jsonify({'erro': 'Arquivo é obrigatório'}), 400
+        extensao = arquivo.filename.rsplit('.', 1)[-1].lower()
+        if extensao not in ('csv', 'ndjson', 'jsonl'):
+            return jsonify({'erro': 'Formato não suportado. Use .csv, .ndjson ou .jsonl'}), 400
+        formato = 'csv' if extensao == 'csv' else 'ndjson'
+        stream = arquivo.stream
+    elif 'text/csv' in content_type:
+        formato, stream = 'csv', request.stream
+    elif 'ndjson' in content_type or 'jsonl' in content_type:
+        formato, stream = 'ndjson', request.stream
+    else:
+        return jsonify({'erro': 'Content-Type deve ser text/csv, application/x-ndjson ou multipart/form-data'}), 415
+
+    tamanho_lote = request.args.get('lote', current_app.config.get('IMPORTACAO_TAMANHO_LOTE', 500), type=int)
+    tamanho_lote = min(max(tamanho_lote, 1), 5000)
+
+    def gerar():
+        eventos = JogadorService.importar_jogadores(
+            pelada_id, ler_linhas_importacao(stream, formato), tamanho_lote
+        )
+        for evento in eventos:
+            yield current_app.json.dumps(evento) + '\n'
+
+    return Response(stream_with_context(gerar()), mimetype='application/x-ndjson')
+
+
 @pelada_bp.route('/jogadores/<int:jogador_id>', methods=['GET'])
 @jwt_required()
 @jogador_owner_required
 def obter_jogador(jogador_id):
     """Obter jogador por ID"""
     try:
-        jogador, erro = JogadorService.obter_jogador_por_id(jogador_id)
+        selecao, erro = opcoes_selecao(request.args, 'jogador')
+        if erro:
+            return jsonify({'erro': erro}), 400
+
+        jogador, erro = JogadorService.obter_jogador_por_id(jogador_id, selecao=selecao)
 
         if erro:
             codigo_status = 404 if 'não encontrado' in erro else 400
@@ -448,7 +449,7 @@ def atualizar_jogador(jogador_id):
             if 'foto' in request.files:
                 arquivo_foto = request.files['foto']
                 if arquivo_foto and arquivo_foto.filename:
-                    foto_url = salvar_imagem_jogador(arquivo_foto)
+                    foto_url = ArquivoService.salvar_imagem(arquivo_foto)
                     if foto_url:
                         dados['foto_url'] = foto_url
         else:
@@ -512,10 +513,17 @@ def criar_temporada(pelada_id):
 def listar_temporadas(pelada_id):
     """Listar temporadas de uma pelada"""
     try:
+        selecao, erro = opcoes_selecao(request.args, 'temporada')
+        if erro:
+            return jsonify({'erro': erro}), 400
+
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
+        cursor, include_total = opcoes_paginacao(request.args)
 
-        resultado, erro = TemporadaService.listar_temporadas(pelada_id, page, per_page)
+        resultado, erro = TemporadaService.listar_temporadas(
+            pelada_id, page, per_page, cursor, include_total, selecao=selecao
+        )
 
         if erro:
             return jsonify({'erro': erro}), 400
@@ -532,7 +540,11 @@ def listar_temporadas(pelada_id):
 def obter_temporada(temporada_id):
     """Obter temporada por ID"""
     try:
-        temporada, erro = TemporadaService.obter_temporada_por_id(temporada_id)
+        selecao, erro = opcoes_selecao(request.args, 'temporada')
+        if erro:
+            return jsonify({'erro': erro}), 400
+
+        temporada, erro = TemporadaService.obter_temporada_por_id(temporada_id, selecao=selecao)
 
         if erro:
             codigo_status = 404 if 'não encontrada' in erro else 400
@@ -604,10 +616,17 @@ def criar_rodada(temporada_id):
 def listar_rodadas(temporada_id):
     """Listar rodadas de uma temporada"""
     try:
+        selecao, erro = opcoes_selecao(request.args, 'rodada')
+        if erro:
+            return jsonify({'erro': erro}), 400
+
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
+        cursor, include_total = opcoes_paginacao(request.args)
 
-        resultado, erro = RodadaService.listar_rodadas(temporada_id, page, per_page)
+        resultado, erro = RodadaService.listar_rodadas(
+            temporada_id, page, per_page, cursor, include_total, selecao=selecao
+        )
 
         if erro:
             return jsonify({'erro': erro}), 400
@@ -624,7 +643,11 @@ def listar_rodadas(temporada_id):
 def obter_rodada(rodada_id):
     """Obter rodada por ID com times e jogadores"""
     try:
-        rodada, erro = RodadaService.obter_rodada_por_id(rodada_id)
+        selecao, erro = opcoes_selecao(request.args, 'rodada')
+        if erro:
+            return jsonify({'erro': erro}), 400
+
+        rodada, erro = RodadaService.obter_rodada_por_id(rodada_id, selecao=selecao)
 
         if erro:
             codigo_status = 404 if 'não encontrada' in erro else 400
@@ -638,23 +661,75 @@ def obter_rodada(rodada_id):
 
 # ==================== ROTAS DE JOGADORES DA RODADA ====================
 
+@pelada_bp.route('/rodadas/<int:rodada_id>/times/sortear', methods=['POST'])
+@jwt_required()
+@rodada_owner_required
+def sortear_times(rodada_id):
+    """
+    Sortear times equilibrados com os jogadores presentes na rodada
+
+    Body JSON:
+    - jogador_ids: jogadores presentes (obrigatório)
+    - time_ids: times que receberão os jogadores (opcional, padrão: os primeiros da temporada)
+    - substituir: refaz os elencos atuais desses times (opcional, padrão false)
+    """
+    try:
+        dados = request.get_json(silent=True) or {}
+
+        jogador_ids = dados.get('jogador_ids')
+        if not jogador_ids or not isinstance(jogador_ids, list):
+            return jsonify({'erro': 'Lista de jogadores presentes é obrigatória'}), 400
+
+        time_ids = dados.get('time_ids')
+        if time_ids is not None and not isinstance(time_ids, list):
+            return jsonify({'erro': 'time_ids deve ser uma lista'}), 400
+
+        sorteio, erro = BalanceamentoService.sortear_times(
+            rodada_id,
+            jogador_ids,
+            time_ids=time_ids,
+            substituir=bool(dados.get('substituir', False))
+        )
+
+        if erro:
+            codigo_status = 404 if 'não encontrada' in erro else 400
+            return jsonify({'erro': erro}), codigo_status
+
+        return jsonify({
+            'mensagem': 'Times sorteados com sucesso',
+            **sorteio
+        }), 201
+
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+
 @pelada_bp.route('/rodadas/<int:rodada_id>/jogadores', methods=['GET'])
 def listar_jogadores_rodada(rodada_id):
-    """Listar jogadores que participaram da rodada (via times das partidas)"""
+    """Listar jogadores que participaram da rodada (via times das partidas); `?stream=true` transmite em blocos"""
     try:
+        selecao, erro = opcoes_selecao(request.args, 'jogador_rodada', linhas=True)
+        if erro:
+            return jsonify({'erro': erro}), 400
+
         posicao = request.args.get('posicao')
         apenas_ativos = request.args.get('apenas_ativos', 'true').lower() != 'false'
+        em_fluxo = fluxo_solicitado()
 
         jogadores, erro = RodadaService.listar_jogadores_da_rodada(
             rodada_id=rodada_id,
             posicao=posicao,
-            apenas_ativos=apenas_ativos
+            apenas_ativos=apenas_ativos,
+            em_fluxo=em_fluxo,
+            selecao=selecao
         )
 
         if erro:
             codigo_status = 404 if 'não encontrada' in erro else 400
             return jsonify({'erro': erro}), codigo_status
 
+        if em_fluxo:
+            return resposta_json_em_fluxo('jogadores', jogadores)
         return jsonify({'jogadores': jogadores}), 200
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
@@ -689,7 +764,7 @@ def criar_time(temporada_id):
             if 'escudo' in request.files:
                 arquivo_escudo = request.files['escudo']
                 if arquivo_escudo and arquivo_escudo.filename:
-                    escudo_url = salvar_imagem_time(arquivo_escudo)
+                    escudo_url = ArquivoService.salvar_imagem(arquivo_escudo)
         else:
             dados = request.get_json(silent=True)
             if not dados:
@@ -722,10 +797,17 @@ def criar_time(temporada_id):
 def listar_times_temporada(temporada_id):
     """Listar todos os times de uma temporada"""
     try:
+        selecao, erro = opcoes_selecao(request.args, 'time')
+        if erro:
+            return jsonify({'erro': erro}), 400
+
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
+        cursor, include_total = opcoes_paginacao(request.args)
 
-        resultado, erro = TimeService.listar_times_da_temporada(temporada_id, page, per_page)
+        resultado, erro = TimeService.listar_times_da_temporada(
+            temporada_id, page, per_page, cursor, include_total, selecao=selecao
+        )
 
         if erro:
             return jsonify({'erro': erro}), 400
@@ -742,7 +824,11 @@ def listar_times_temporada(temporada_id):
 def obter_time(time_id):
     """Obter time por ID com jogadores"""
     try:
-        time, erro = TimeService.obter_time_por_id(time_id)
+        selecao, erro = opcoes_selecao(request.args, 'time')
+        if erro:
+            return jsonify({'erro': erro}), 400
+
+        time, erro = TimeService.obter_time_por_id(time_id, selecao=selecao)
 
         if erro:
             codigo_status = 404 if 'não encontrado' in erro else 400
@@ -783,7 +869,7 @@ def atualizar_time(time_id):
             if 'escudo' in request.files:
                 arquivo_escudo = request.files['escudo']
                 if arquivo_escudo and arquivo_escudo.filename:
-                    escudo_url = salvar_imagem_time(arquivo_escudo)
+                    escudo_url = ArquivoService.salvar_imagem(arquivo_escudo)
                     if escudo_url:
                         dados['escudo_url'] = escudo_url
         else:
@@ -886,17 +972,70 @@ def criar_partida(rodada_id):
         return jsonify({'erro': str(e)}), 500
 
 
+@pelada_bp.route('/rodadas/<int:rodada_id>/partidas/gerar', methods=['POST'])
+@jwt_required()
+@rodada_owner_required
+def gerar_partidas(rodada_id):
+    """
+    Gerar automaticamente todas as partidas da rodada
+
+    Body JSON:
+    - formato: 'todos_contra_todos', 'rei_da_quadra' ou 'mata_mata' (obrigatório)
+    - time_ids: lista de times na ordem de mando/chaveamento (opcional, padrão: todos da temporada)
+    - turnos: número de turnos do todos contra todos (opcional, padrão 1)
+    - quantidade_partidas: total de partidas do rei da quadra (opcional, padrão: número de times)
+    """
+    try:
+        dados = request.get_json(silent=True) or {}
+
+        formato = dados.get('formato')
+        if not formato:
+            return jsonify({'erro': 'Formato é obrigatório'}), 400
+
+        time_ids = dados.get('time_ids')
+        if time_ids is not None and not isinstance(time_ids, list):
+            return jsonify({'erro': 'time_ids deve ser uma lista'}), 400
+
+        tabela, erro = TabelaService.gerar_tabela(
+            rodada_id,
+            formato,
+            time_ids=time_ids,
+            turnos=dados.get('turnos', 1),
+            quantidade_partidas=dados.get('quantidade_partidas')
+        )
+
+        if erro:
+            codigo_status = 404 if 'não encontrada' in erro else 400
+            return jsonify({'erro': erro}), codigo_status
+
+        return jsonify({
+            'mensagem': f'{len(tabela["partidas"])} partidas geradas com sucesso',
+            **tabela
+        }), 201
+
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+
 @pelada_bp.route('/rodadas/<int:rodada_id>/partidas', methods=['GET'])
 @jwt_required()
 @rodada_owner_required
+@cache.em_cache(('rodada', 'rodada_id'))
 def listar_partidas(rodada_id):
-    """Listar todas as partidas de uma rodada"""
+    """Listar todas as partidas de uma rodada; `?stream=true` transmite em blocos"""
     try:
-        partidas, erro = PartidaService.listar_partidas(rodada_id)
+        selecao, erro = opcoes_selecao(request.args, 'partida', linhas=True)
+        if erro:
+            return jsonify({'erro': erro}), 400
+
+        em_fluxo = fluxo_solicitado()
+        partidas, erro = PartidaService.listar_partidas(rodada_id, em_fluxo=em_fluxo, selecao=selecao)
 
         if erro:
             return jsonify({'erro': erro}), 400
 
+        if em_fluxo:
+            return resposta_json_em_fluxo('partidas', partidas)
         return jsonify({'partidas': partidas}), 200
 
     except Exception as e:
@@ -909,7 +1048,11 @@ def listar_partidas(rodada_id):
 def obter_partida(partida_id):
     """Obter partida por ID"""
     try:
-        partida, erro = PartidaService.obter_partida_por_id(partida_id)
+        selecao, erro = opcoes_selecao(request.args, 'partida')
+        if erro:
+            return jsonify({'erro': erro}), 400
+
+        partida, erro = PartidaService.obter_partida_por_id(partida_id, selecao=selecao)
 
         if erro:
             codigo_status = 404 if 'não encontrada' in erro else 400
@@ -982,7 +1125,10 @@ def registrar_gol(partida_id):
         if not time_id or not jogador_id:
             return jsonify({'erro': 'ID do time e do jogador são obrigatórios'}), 400
 
-        gol, erro = GolService.registrar_gol(partida_id, time_id, jogador_id, minuto, gol_contra, assistencia_id)
+        gol, erro = GolService.registrar_gol(
+            partida_id, time_id, jogador_id, minuto, gol_contra, assistencia_id,
+            correcao=dados.get('correcao') is True
+        )
 
         if erro:
             return jsonify({'erro': erro}), 400
@@ -996,6 +1142,39 @@ def registrar_gol(partida_id):
         return jsonify({'erro': str(e)}), 500
 
 
+@pelada_bp.route('/partidas/<int:partida_id>/gols/lote', methods=['POST'])
+@jwt_required()
+@partida_owner_required
+def registrar_gols_em_lote(partida_id):
+    """
+    Registrar vários gols de uma vez (ex: súmula lançada após o apito final, com "correcao": true)
+
+    Body JSON:
+        {"gols": [{"time_id": 1, "jogador_id": 7, "minuto": 12, "gol_contra": false, "assistencia_id": 9}, ...],
+         "correcao": false}
+    """
+    try:
+        dados = request.get_json()
+        if not dados:
+            return jsonify({'erro': 'Nenhum dado fornecido'}), 400
+
+        resultado, erro = GolService.registrar_gols_em_lote(
+            partida_id, dados.get('gols'), correcao=dados.get('correcao') is True
+        )
+
+        if erro:
+            codigo_status = 404 if 'não encontrada' in erro else 400
+            return jsonify({'erro': erro}), codigo_status
+
+        return jsonify({
+            'mensagem': 'Gols registrados com sucesso',
+            **resultado
+        }), 201
+
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+
 @pelada_bp.route('/gols/<int:gol_id>', methods=['DELETE'])
 @jwt_required()
 @gol_owner_required
@@ -1016,30 +1195,66 @@ def remover_gol(gol_id):
 # ==================== ROTAS DE RANKINGS ====================
 
 @pelada_bp.route('/temporadas/<int:temporada_id>/ranking/times', methods=['GET'])
+@cache.em_cache(('temporada', 'temporada_id'))
 def ranking_times(temporada_id):
     """Ranking de times por pontos na temporada"""
     try:
-        ranking, erro = RankingService.ranking_times_temporada(temporada_id)
+        em_fluxo = fluxo_solicitado()
+        ranking, erro = RankingService.ranking_times_temporada(temporada_id, em_fluxo=em_fluxo)
 
         if erro:
             return jsonify({'erro': erro}), 400
 
+        if em_fluxo:
+            return resposta_json_em_fluxo('ranking', ranking)
         return jsonify({'ranking': ranking}), 200
 
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
 
+@pelada_bp.route('/temporadas/<int:temporada_id>/classificacao/recalcular', methods=['POST'])
+@jwt_required()
+@temporada_owner_required
+def recalcular_classificacao(temporada_id):
+    """
+    Reconstruir a classificação materializada da temporada a partir das partidas
+
+    Com `?assincrono=true` vai para a fila do worker (202 + job).
+    """
+    try:
+        if assincrono_solicitado():
+            return resposta_enfileirada('classificacao.recalcular', {'temporada_id': temporada_id})
+
+        ranking, erro = ClassificacaoService.recalcular_classificacao(temporada_id)
+
+        if erro:
+            codigo_status = 404 if 'não encontrada' in erro else 400
+            return jsonify({'erro': erro}), codigo_status
+
+        return jsonify({
+            'mensagem': 'Classificação recalculada com sucesso',
+            'ranking': ranking
+        }), 200
+
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+
 @pelada_bp.route('/temporadas/<int:temporada_id>/ranking/artilheiros', methods=['GET'])
+@cache.em_cache(('temporada', 'temporada_id'))
 def ranking_artilheiros(temporada_id):
     """Ranking de artilheiros na temporada"""
     try:
         limit = request.args.get('limit', 10, type=int)
-        ranking, erro = RankingService.ranking_artilheiros_temporada(temporada_id, limit)
+        em_fluxo = fluxo_solicitado()
+        ranking, erro = RankingService.ranking_artilheiros_temporada(temporada_id, limit, em_fluxo=em_fluxo)
 
         if erro:
             return jsonify({'erro': erro}), 400
 
+        if em_fluxo:
+            return resposta_json_em_fluxo('ranking', ranking)
         return jsonify({'ranking': ranking}), 200
 
     except Exception as e:
@@ -1047,15 +1262,39 @@ def ranking_artilheiros(temporada_id):
 
 
 @pelada_bp.route('/temporadas/<int:temporada_id>/ranking/assistencias', methods=['GET'])
+@cache.em_cache(('temporada', 'temporada_id'))
 def ranking_assistencias(temporada_id):
     """Ranking de assistências na temporada"""
     try:
         limit = request.args.get('limit', 10, type=int)
-        ranking, erro = RankingService.ranking_assistencias_temporada(temporada_id, limit)
+        em_fluxo = fluxo_solicitado()
+        ranking, erro = RankingService.ranking_assistencias_temporada(temporada_id, limit, em_fluxo=em_fluxo)
+
+        if erro:
+            return jsonify({'erro': erro}), 400
+
+        if em_fluxo:
+            return resposta_json_em_fluxo('ranking', ranking)
+        return jsonify({'ranking': ranking}), 200
+
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+
+@pelada_bp.route('/temporadas/<int:temporada_id>/ranking/jogadores', methods=['GET'])
+@cache.em_cache(('temporada', 'temporada_id'))
+def ranking_jogadores(temporada_id):
+    """Gols, assistências e gols contra por jogador na temporada"""
+    try:
+        limit = request.args.get('limit', type=int)
+        em_fluxo = fluxo_solicitado()
+        ranking, erro = RankingService.ranking_jogadores_temporada(temporada_id, limit, em_fluxo=em_fluxo)
 
         if erro:
             return jsonify({'erro': erro}), 400
 
+        if em_fluxo:
+            return resposta_json_em_fluxo('ranking', ranking)
         return jsonify({'ranking': ranking}), 200
 
     except Exception as e:
@@ -1068,8 +1307,12 @@ def ranking_assistencias(temporada_id):
 def listar_votacoes_rodada(rodada_id):
     """Listar votações de uma rodada"""
     try:
+        selecao, erro = opcoes_selecao(request.args, 'votacao')
+        if erro:
+            return jsonify({'erro': erro}), 400
+
         tipo = request.args.get('tipo')
-        resultado, erro = VotacaoService.listar_votacoes_rodada(rodada_id, tipo=tipo)
+        resultado, erro = VotacaoService.listar_votacoes_rodada(rodada_id, tipo=tipo, selecao=selecao)
 
         if erro:
             codigo_status = 404 if 'não encontrada' in erro else 400
@@ -1115,7 +1358,11 @@ def criar_votacao(rodada_id):
 def obter_votacao(votacao_id):
     """Obter uma votação por ID"""
     try:
-        votacao, erro = VotacaoService.obter_votacao(votacao_id)
+        selecao, erro = opcoes_selecao(request.args, 'votacao')
+        if erro:
+            return jsonify({'erro': erro}), 400
+
+        votacao, erro = VotacaoService.obter_votacao(votacao_id, selecao=selecao)
 
         if erro:
             codigo_status = 404 if 'não encontrada' in erro else 400
@@ -1157,6 +1404,7 @@ def registrar_voto(votacao_id):
 
 
 @pelada_bp.route('/votacoes/<int:votacao_id>/resultado', methods=['GET'])
+@cache.em_cache(('votacao', 'votacao_id'))
 def obter_resultado_votacao(votacao_id):
     """Obter resultado agregado de uma votação"""
     try:
@@ -1197,8 +1445,11 @@ def obter_resultados_votacoes_rodada(rodada_id):
 @jwt_required()
 @votacao_owner_required
 def encerrar_votacao(votacao_id):
-    """Encerrar uma votação"""
+    """Encerrar uma votação (com `?assincrono=true` vai para a fila do worker: 202 + job)"""
     try:
+        if assincrono_solicitado():
+            return resposta_enfileirada('votacao.encerrar', {'votacao_id': votacao_id})
+
         votacao, erro = VotacaoService.encerrar_votacao(votacao_id)
 
         if erro:
@@ -3,6 +3,7 @@ from flask import Blueprint, request, jsonify
 from source.domain.users.services import UserService
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from source.api.decorators import admin_required, produtor_required, afiliado_required, tipo_usuario_required
+from source.utils.pagination import opcoes_paginacao
 
 user_bp = Blueprint('user', __name__)
 
@@ -152,8 +153,9 @@ def listar_usuarios():
        
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
+        cursor, include_total = opcoes_paginacao(request.args)
 
-        resultado, erro = UserService.listar_todos_usuarios(page, per_page)
+        resultado, erro = UserService.listar_todos_usuarios(page, per_page, cursor, include_total)
 
         if erro:
             return jsonify({'erro': erro}), 400
@@ -0,0 +1,29 @@
+from source.extensions.extensios import db
+from datetime import datetime
+import pytz
+
+def get_brazil_time():
+    """Retorna o horário atual do Brasil (Brasília - UTC-3)"""
+    brazil_tz = pytz.timezone('America/Sao_Paulo')
+    return datetime.now(brazil_tz)
+
+class Arquivo(db.Model):
+    """Upload guardado no armazenamento endereçado por conteúdo (um registro por conteúdo distinto)"""
+    __tablename__ = 'arquivos'
+
+    id = db.Column(db.Integer, primary_key=True)
+    digest = db.Column(db.String(64), nullable=False, unique=True)  # SHA-256 dos bytes enviados
+    url = db.Column(db.String(255), nullable=False, index=True)  # URL gravada nas entidades (variante original)
+    chaves = db.Column(db.Text, nullable=False)  # chaves no armazenamento, separadas por vírgula
+    tamanho = db.Column(db.BigInteger, nullable=False, default=0)  # bytes ocupados por todas as chaves
+    criado_em = db.Column(db.DateTime, default=get_brazil_time)
+    usado_em = db.Column(db.DateTime, default=get_brazil_time, index=True)  # último upload com este conteúdo
+
+    def __init__(self, digest, url, chaves, tamanho):
+        self.digest = digest
+        self.url = url
+        self.chaves = ','.join(chaves)
+        self.tamanho = tamanho
+
+    def lista_chaves(self):
+        return [chave for chave in self.chaves.split(',') if chave]
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Uploads de imagens no armazenamento endereçado por conteúdo.
+
+Fluxo de `salvar_imagem`:
+    1. o upload é copiado para um temporário calculando o SHA-256 no caminho
+    2. se o digest já existe na tabela `arquivos`, devolve a URL existente
+       (sem decodificar nem gravar nada)
+    3. senão gera as variantes (Pillow) ou guarda os bytes como vieram,
+       grava no armazenamento e registra o digest
+
+Referências: quem aponta para um arquivo são as colunas em REFERENCIAS.
+`coletar_orfaos` remove arquivos que nenhuma delas usa e que não foram
+enviados nas últimas ARQUIVOS_CARENCIA_HORAS (a carência cobre o intervalo
+entre o upload e o commit da entidade que vai usá-lo).
+"""
+
+import os
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import delete, exists, or_
+from sqlalchemy.exc import IntegrityError
+
+from source.extensions.extensios import db, armazenamento
+from source.domain.arquivos.models import Arquivo, get_brazil_time
+from source.domain.peladas.models import Pelada, Jogador, Time
+from source.utils.images import Image, extensao_permitida, gerar_variantes
+from source.utils.storage import chave_conteudo, receber
+
+# Colunas que guardam URLs de uploads
+REFERENCIAS = (Pelada.logo_url, Pelada.perfil_url, Jogador.foto_url, Time.escudo_url)
+
+
+class ArquivoService:
+    """Camada de serviço dos arquivos enviados"""
+
+    @staticmethod
+    def _gravar(digest, caminho, nome_original):
+        """Grava o conteúdo novo; devolve (url, chaves, tamanho) ou None se a imagem for inválida"""
+        if Image is not None:
+            geradas = gerar_variantes(
+                caminho,
+                current_app.config.get('IMAGEM_FORMATO') or 'webp',
+                int(current_app.config.get('IMAGEM_QUALIDADE', 80))
+            )
+            if geradas is None:
+                return None
+            extensao, variantes = geradas
+            chaves = []
+            for nome, dados in variantes:
+                chave = chave_conteudo(digest, f'_{nome}', extensao)
+                armazenamento.gravar_bytes(chave, dados)
+                chaves.append(chave)
+            tamanho = sum(len(dados) for _, dados in variantes)
+            return armazenamento.url(chave_conteudo(digest, '_original', extensao)), chaves, tamanho
+
+        extensao = nome_original.rsplit('.', 1)[1].lower().replace('jpeg', 'jpg')
+        chave = chave_conteudo(digest, '', extensao)
+        tamanho = os.path.getsize(caminho)
+        armazenamento.gravar_arquivo(chave, caminho)
+        return armazenamento.url(chave), [chave], tamanho
+
+    @staticmethod
+    def salvar_imagem(arquivo):
+        """
+        Guarda uma imagem enviada, sem duplicar conteúdo já existente
+
+        Args:
+            arquivo: objeto FileStorage do Flask
+
+        Returns:
+            str: URL da imagem (variante original) ou None se o arquivo for inválido
+        """
+        if not arquivo or not arquivo.filename or not extensao_permitida(arquivo.filename):
+            return None
+
+        digest, caminho, _ = receber(arquivo.stream, armazenamento.temporarios)
+        try:
+            existente = Arquivo.query.filter_by(digest=digest).first()
+            if existente:
+                # Renova a carência do coletor: a entidade que vai usar a URL ainda não foi gravada
+                existente.usado_em = get_brazil_time()
+                if not all(armazenamento.existe(chave) for chave in existente.lista_chaves()):
+                    # Bytes sumiram (coleta interrompida, disco restaurado): regrava a partir deste upload
+                    gravado = ArquivoService._gravar(digest, caminho, arquivo.filename)
+                    if gravado is None:
+                        db.session.rollback()
+                        return None
+                    existente.url, chaves, existente.tamanho = gravado
+                    existente.chaves = ','.join(chaves)
+                db.session.commit()
+                return existente.url
+
+            gravado = ArquivoService._gravar(digest, caminho, arquivo.filename)
+            if gravado is None:
+                return None
+            url, chaves, tamanho = gravado
+
+            try:
+                db.session.add(Arquivo(digest, url, chaves, tamanho))
+                db.session.commit()
+            except IntegrityError:
+                # Mesmo conteúdo enviado ao mesmo tempo por outra requisição: as chaves são idênticas
+                db.session.rollback()
+            return url
+        finally:
+            if os.path.exists(caminho):
+                os.remove(caminho)
+
+    @staticmethod
+    def coletar_orfaos(carencia_horas=None, limite=500, simular=False):
+        """
+        Remove do armazenamento (e da tabela) os arquivos sem nenhuma referência
+
+        Args:
+            carencia_horas: idade mínima do arquivo (padrão ARQUIVOS_CARENCIA_HORAS)
+            limite: máximo de arquivos por execução
+            simular: só conta, não remove
+
+        Returns:
+            tuple: (resumo, mensagem_erro)
+        """
+        try:
+            if carencia_horas is None:
+                carencia_horas = float(current_app.config.get('ARQUIVOS_CARENCIA_HORAS', 24))
+            corte = get_brazil_time().replace(tzinfo=None) - timedelta(hours=carencia_horas)
+
+            referenciado = or_(*(exists().where(coluna == Arquivo.url) for coluna in REFERENCIAS))
+            orfao = (Arquivo.usado_em < corte, ~referenciado)
+            orfaos = (
+                Arquivo.query
+                .filter(*orfao)
+                .order_by(Arquivo.id)
+                .limit(limite)
+                .all()
+            )
+
+            removidos, liberados = 0, 0
+            for arquivo_id, chaves, tamanho in [(a.id, a.lista_chaves(), a.tamanho or 0) for a in orfaos]:
+                if not simular:
+                    # Confere de novo no próprio DELETE: um reenvio do mesmo conteúdo (usado_em renovado) ou
+                    # uma entidade gravada com a URL desde o SELECT mantém o arquivo
+                    apagado = db.session.execute(
+                        delete(Arquivo).where(Arquivo.id == arquivo_id, *orfao)
+                    ).rowcount == 1
+                    db.session.commit()
+                    if not apagado:
+                        continue
+                    # Linha primeiro: se a remoção dos bytes falhar no meio, sobra lixo no disco, nunca uma URL quebrada
+                    for chave in chaves:
+                        armazenamento.remover(chave)
+                removidos += 1
+                liberados += tamanho
+
+            return {'removidos': removidos, 'bytes_liberados': liberados, 'simulado': simular}, None
+        except Exception as e:
+            db.session.rollback()
+            return None, str(e)
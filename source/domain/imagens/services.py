@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline do processador de imagens: baixa `modal_url` e `pessoa_url` em
+paralelo, codifica em base64 à medida que os bytes chegam e encaminha o
+payload ao webhook do n8n.
+
+- Um único `requests.Session` com pool de conexões (reaproveita TCP/TLS)
+- Downloads em streaming com limite de tamanho (IMAGEM_TAMANHO_MAXIMO): um
+  arquivo grande é abortado no primeiro bloco acima do limite
+- Modo assíncrono: a rota enfileira a tarefa `imagens.processar` (ver
+  source/domain/jobs) e o worker chama `processar`
+
+As threads não têm contexto do Flask: a configuração é lida antes e passada
+adiante em `ConfigImagens`.
+"""
+
+import base64
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BLOCO_DOWNLOAD = 64 * 1024
+
+
+class ConfigImagens(NamedTuple):
+    webhook_url: str
+    tamanho_maximo: int
+    timeout_download: tuple
+    timeout_webhook: tuple
+
+    @classmethod
+    def do_app(cls, app):
+        conexao = float(app.config.get('IMAGEM_TIMEOUT_CONEXAO', 5))
+        return cls(
+            webhook_url=app.config['N8N_WEBHOOK_URL'],
+            tamanho_maximo=int(app.config.get('IMAGEM_TAMANHO_MAXIMO', 10 * 1024 * 1024)),
+            timeout_download=(conexao, float(app.config.get('IMAGEM_TIMEOUT_DOWNLOAD', 30))),
+            timeout_webhook=(conexao, float(app.config.get('N8N_TIMEOUT', 60))),
+        )
+
+
+class Base64Incremental:
+    """Codifica blocos de tamanho qualquer; só os múltiplos de 3 bytes saem a cada passo"""
+
+    __slots__ = ('_resto', 'partes', 'tamanho')
+
+    def __init__(self):
+        self._resto = b''
+        self.partes = []
+        self.tamanho = 0
+
+    def atualizar(self, bloco: bytes):
+        self.tamanho += len(bloco)
+        dados = self._resto + bloco
+        corte = len(dados) - len(dados) % 3
+        self._resto = dados[corte:]
+        if corte:
+            self.partes.append(base64.b64encode(dados[:corte]))
+
+    def finalizar(self) -> bytes:
+        if self._resto:
+            self.partes.append(base64.b64encode(self._resto))
+            self._resto = b''
+        return b''.join(self.partes)
+
+
+class ImagemService:
+    """Camada de serviço do processador de imagens"""
+
+    _trava = threading.Lock()
+    _sessao = None
+    _downloads = None
+
+    @classmethod
+    def _recursos(cls, app):
+        """Sessão HTTP e pool de threads dos downloads, criados uma vez por processo"""
+        if cls._sessao is None:
+            with cls._trava:
+                if cls._sessao is None:
+                    workers = int(app.config.get('IMAGEM_WORKERS', 4))
+                    sessao = requests.Session()
+                    adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=workers * 2)
+                    sessao.mount('http://', adaptador)
+                    sessao.mount('https://', adaptador)
+                    cls._downloads = ThreadPoolExecutor(workers * 2, thread_name_prefix='imagem-download')
+                    cls._sessao = sessao
+        return cls._sessao
+
+    @staticmethod
+    def baixar_base64(sessao, url, config):
+        """
+        Baixa uma imagem em streaming e devolve o base64
+
+        Returns:
+            tuple: (base64_em_bytes, mensagem_erro)
+        """
+        try:
+            with sessao.get(url, stream=True, timeout=config.timeout_download) as response:
+                response.raise_for_status()
+
+                content_type = response.headers.get('Content-Type', '')
+                if not content_type.startswith('image/'):
+                    return None, f'URL não retorna uma imagem. Content-Type: {content_type}'
+
+                limite_mb = config.tamanho_maximo / (1024 * 1024)
+                declarado = response.headers.get('Content-Length')
+                if declarado and declarado.isdigit() and int(declarado) > config.tamanho_maximo:
+                    return None, f'Imagem de {url} excede o limite de {limite_mb:.0f} MB'
+
+                codificador = Base64Incremental()
+                for bloco in response.iter_content(BLOCO_DOWNLOAD):
+                    codificador.atualizar(bloco)
+                    if codificador.tamanho > config.tamanho_maximo:
+                        return None, f'Imagem de {url} excede o limite de {limite_mb:.0f} MB'
+                return codificador.finalizar(), None
+        except requests.exceptions.RequestException as e:
+            return None, f'Erro ao baixar imagem de {url}: {str(e)}'
+        except Exception as e:
+            return None, f'Erro ao processar imagem: {str(e)}'
+
+    @staticmethod
+    def _corpo_webhook(modal_url, pessoa_url, modal_base64, pessoa_base64):
+        """JSON montado direto em bytes: o base64 não precisa de escape e não é copiado para um dict/str"""
+        return b''.join((
+            b'{"modal_url":', json.dumps(modal_url).encode('utf-8'),
+            b',"pessoa_url":', json.dumps(pessoa_url).encode('utf-8'),
+            b',"modal_base64":"', modal_base64,
+            b'","pessoa_base64":"', pessoa_base64, b'"}'
+        ))
+
+    @classmethod
+    def processar(cls, app, modal_url, pessoa_url, config=None):
+        """
+        Baixa as duas imagens em paralelo e encaminha ao n8n
+
+        Returns:
+            tuple: (corpo_resposta, status_http)
+        """
+        config = config or ConfigImagens.do_app(app)
+        sessao = cls._recursos(app)
+
+        modal = cls._downloads.submit(cls.baixar_base64, sessao, modal_url, config)
+        pessoa = cls._downloads.submit(cls.baixar_base64, sessao, pessoa_url, config)
+        modal_base64, erro_modal = modal.result()
+        pessoa_base64, erro_pessoa = pessoa.result()
+        if erro_modal or erro_pessoa:
+            return {'erro': erro_modal or erro_pessoa}, 400
+
+        corpo = cls._corpo_webhook(modal_url, pessoa_url, modal_base64, pessoa_base64)
+        del modal_base64, pessoa_base64
+        try:
+            response_n8n = sessao.post(
+                config.webhook_url,
+                data=corpo,
+                timeout=config.timeout_webhook,
+                headers={'Content-Type': 'application/json'}
+            )
+            response_n8n.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            return {'erro': f'Erro ao enviar para n8n: {str(e)}', 'imagens_processadas': True}, 502
+
+        try:
+            resposta = response_n8n.json() if response_n8n.content else None
+        except ValueError:
+            resposta = response_n8n.text
+        return {
+            'mensagem': 'Imagens processadas e enviadas com sucesso',
+            'n8n_response': resposta,
+            'status_code': response_n8n.status_code
+        }, 200
@@ -0,0 +1,41 @@
+from source.extensions.extensios import db
+from datetime import datetime
+import pytz
+import uuid
+
+def agora_brasil():
+    """Horário de Brasília sem tzinfo (mesma referência das colunas DATETIME do projeto)"""
+    return datetime.now(pytz.timezone('America/Sao_Paulo')).replace(tzinfo=None)
+
+class Job(db.Model):
+    """Tarefa em segundo plano executada pelo worker (worker.py)"""
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        # Busca do worker: pendentes vencidos, mais antigos primeiro
+        db.Index('ix_jobs_status_executar_em', 'status', 'executar_em'),
+    )
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex: não dá para adivinhar ids de outros jobs
+    tipo = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON com os argumentos da tarefa
+    status = db.Column(db.String(20), nullable=False, default='pendente')  # pendente, executando, concluido, falhou
+    chave_idempotencia = db.Column(db.String(191), nullable=True, unique=True)
+    tentativas = db.Column(db.Integer, nullable=False, default=0)
+    max_tentativas = db.Column(db.Integer, nullable=False, default=5)
+    executar_em = db.Column(db.DateTime, nullable=False, default=agora_brasil)
+    travado_por = db.Column(db.String(64), nullable=True)  # worker que está executando
+    travado_em = db.Column(db.DateTime, nullable=True)
+    resultado = db.Column(db.Text, nullable=True)  # JSON devolvido pela tarefa
+    erro = db.Column(db.Text, nullable=True)  # última falha
+    criado_em = db.Column(db.DateTime, default=agora_brasil)
+    concluido_em = db.Column(db.DateTime, nullable=True)
+
+    def __init__(self, tipo, payload, chave_idempotencia=None, max_tentativas=5, executar_em=None):
+        self.id = uuid.uuid4().hex
+        self.tipo = tipo
+        self.payload = payload
+        self.chave_idempotencia = chave_idempotencia
+        self.max_tentativas = max_tentativas
+        self.executar_em = executar_em or agora_brasil()
+        self.status = 'pendente'
+        self.tentativas = 0
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Fila de tarefas em segundo plano guardada no próprio banco (tabela `jobs`).
+
+Quem enfileira:
+    job, erro = JobService.enfileirar('classificacao.recalcular', {'temporada_id': 3})
+
+Quem executa: `python worker.py` (um ou mais processos). Cada worker reserva um
+job com um UPDATE condicional (status + tentativas como versão), então dois
+processos nunca pegam o mesmo job, no MySQL ou no SQLite. Falhas voltam para a
+fila com backoff exponencial (JOBS_BACKOFF_BASE * 2^(tentativa-1), até
+JOBS_BACKOFF_MAX) até `max_tentativas`; `ErroPermanente` encerra na hora.
+Um job "executando" cujo worker sumiu volta a ser elegível após JOBS_TRAVA_EXPIRA.
+
+A `chave_idempotencia` é única: enfileirar de novo com a mesma chave devolve o
+job existente em vez de criar outro.
+
+Com JOBS_MODO='imediato' (desenvolvimento/testes) a tarefa roda na hora,
+dentro da própria requisição, com o mesmo registro na tabela.
+
+As tarefas ficam em `source/domain/jobs/tarefas.py` (decorador `tarefa`).
+"""
+
+import json
+import os
+import random
+import socket
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import and_, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from source.extensions.extensios import db
+from source.domain.jobs.models import Job, agora_brasil
+
+TAREFAS = {}
+
+
+class ErroPermanente(Exception):
+    """Falha que não adianta repetir (dados inválidos, recurso inexistente)"""
+
+
+def tarefa(nome):
+    """Registra a função como tarefa `nome`; ela recebe o payload como kwargs e devolve algo serializável em JSON"""
+    def decorador(funcao):
+        TAREFAS[nome] = funcao
+        return funcao
+    return decorador
+
+
+def _carregar_tarefas():
+    import source.domain.jobs.tarefas  # noqa: F401  (registra as tarefas)
+
+
+class JobService:
+    """Camada de serviço da fila de tarefas"""
+
+    @staticmethod
+    def _serializar_job(job):
+        return {
+            'id': job.id,
+            'tipo': job.tipo,
+            'status': job.status,
+            'tentativas': job.tentativas,
+            'max_tentativas': job.max_tentativas,
+            'executar_em': job.executar_em,
+            'resultado': json.loads(job.resultado) if job.resultado else None,
+            'erro': job.erro,
+            'criado_em': job.criado_em,
+            'concluido_em': job.concluido_em
+        }
+
+    @staticmethod
+    def enfileirar(tipo, payload, chave_idempotencia=None, atraso=None, executar_em=None, max_tentativas=None):
+        """
+        Criar um job (ou devolver o existente com a mesma chave de idempotência)
+
+        Args:
+            tipo: nome registrado com `tarefa`
+            payload: dict serializável em JSON, passado à tarefa como kwargs
+            chave_idempotencia: opcional; a mesma chave sempre resolve para o mesmo job
+                (com outro payload é erro: a chave foi reaproveitada para outra coisa)
+            atraso: segundos até poder executar (ou `executar_em` absoluto)
+
+        Returns:
+            tuple: (dicionario_job, mensagem_erro)
+        """
+        _carregar_tarefas()
+        if tipo not in TAREFAS:
+            return None, f'Tarefa desconhecida: {tipo}'
+
+        corpo = json.dumps(payload, sort_keys=True)
+        if chave_idempotencia:
+            existente = Job.query.filter_by(chave_idempotencia=chave_idempotencia).first()
+            if existente:
+                return JobService._job_da_chave(existente, corpo)
+
+        if executar_em is None and atraso:
+            executar_em = agora_brasil() + timedelta(seconds=atraso)
+
+        job = Job(
+            tipo=tipo,
+            payload=corpo,
+            chave_idempotencia=chave_idempotencia,
+            max_tentativas=max_tentativas or int(current_app.config.get('JOBS_MAX_TENTATIVAS', 5)),
+            executar_em=executar_em
+        )
+        try:
+            db.session.add(job)
+            db.session.commit()
+        except IntegrityError:
+            # Outra requisição criou a mesma chave entre a consulta e o INSERT
+            db.session.rollback()
+            existente = Job.query.filter_by(chave_idempotencia=chave_idempotencia).first()
+            if existente is None:
+                raise
+            return JobService._job_da_chave(existente, corpo)
+
+        if current_app.config.get('JOBS_MODO', 'fila') == 'imediato' and job.executar_em <= agora_brasil():
+            JobService.executar(job.id, 'imediato')
+            db.session.refresh(job)
+        return JobService._serializar_job(job), None
+
+    @staticmethod
+    def _job_da_chave(existente, corpo):
+        """Job já criado com a chave de idempotência, se o payload for o mesmo"""
+        if json.dumps(json.loads(existente.payload), sort_keys=True) != corpo:
+            return None, 'Idempotency-Key já usada com outro payload'
+        return JobService._serializar_job(existente), None
+
+    @staticmethod
+    def obter_job(job_id):
+        """Situação de um job"""
+        job = Job.query.get(str(job_id))
+        if not job:
+            return None, 'Job não encontrado'
+        return JobService._serializar_job(job), None
+
+    # ==================== WORKER ====================
+
+    @staticmethod
+    def identificador_worker():
+        return f'{socket.gethostname()}:{os.getpid()}'
+
+    @staticmethod
+    def reservar(worker_id, candidatos=10):
+        """Reserva o próximo job vencido para este worker; devolve o id ou None"""
+        agora = agora_brasil()
+        expira = agora - timedelta(seconds=int(current_app.config.get('JOBS_TRAVA_EXPIRA', 600)))
+        travado = and_(Job.status == 'executando', Job.travado_em < expira)
+
+        # Worker morreu no meio (OOM, segfault) sem passar pelo except: a trava expirada conta
+        # como tentativa falha, e sem tentativas restantes o job não volta mais para a fila
+        db.session.execute(
+            update(Job)
+            .where(travado, Job.tentativas >= Job.max_tentativas)
+            .values(
+                status='falhou',
+                erro='Worker interrompido durante a execução (tentativas esgotadas)',
+                travado_por=None,
+                travado_em=None,
+                concluido_em=agora
+            )
+        )
+        db.session.commit()
+
+        elegivel = or_(
+            and_(Job.status == 'pendente', Job.executar_em <= agora),
+            and_(travado, Job.tentativas < Job.max_tentativas)
+        )
+        linhas = (
+            db.session.query(Job.id, Job.status, Job.tentativas)
+            .filter(elegivel)
+            .order_by(Job.executar_em)
+            .limit(candidatos)
+            .all()
+        )
+        db.session.rollback()  # não segura a transação de leitura
+
+        for job_id, status, tentativas in linhas:
+            # UPDATE condicional: só um worker vê rowcount 1 para a mesma (status, tentativas)
+            resultado = db.session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == status, Job.tentativas == tentativas)
+                .values(status='executando', tentativas=tentativas + 1, travado_por=worker_id, travado_em=agora)
+            )
+            db.session.commit()
+            if resultado.rowcount == 1:
+                return job_id
+        return None
+
+    @staticmethod
+    def _backoff(tentativa):
+        base = float(current_app.config.get('JOBS_BACKOFF_BASE', 5))
+        maximo = float(current_app.config.get('JOBS_BACKOFF_MAX', 600))
+        espera = min(maximo, base * (2 ** max(tentativa - 1, 0)))
+        return espera * random.uniform(0.8, 1.2)  # jitter: falhas simultâneas não voltam juntas
+
+    @staticmethod
+    def executar(job_id, worker_id):
+        """Executa um job reservado e grava o desfecho; devolve o status final"""
+        _carregar_tarefas()
+        job = Job.query.get(job_id)
+        if job is None:
+            return None
+        if job.status != 'executando':
+            job.status = 'executando'
+            job.tentativas += 1
+            job.travado_por = worker_id
+            job.travado_em = agora_brasil()
+            db.session.commit()
+        if job.tentativas > job.max_tentativas:
+            job.status = 'falhou'
+            job.erro = job.erro or 'Tentativas esgotadas'
+            job.travado_por = None
+            job.travado_em = None
+            job.concluido_em = agora_brasil()
+            db.session.commit()
+            return job.status
+
+        funcao = TAREFAS.get(job.tipo)
+        try:
+            if funcao is None:
+                raise ErroPermanente(f'Tarefa desconhecida: {job.tipo}')
+            resultado = funcao(**json.loads(job.payload))
+        except Exception as e:
+            db.session.rollback()
+            job = Job.query.get(job_id)
+            job.erro = f'{type(e).__name__}: {e}'
+            job.travado_por = None
+            job.travado_em = None
+            if isinstance(e, ErroPermanente) or job.tentativas >= job.max_tentativas:
+                job.status = 'falhou'
+                job.concluido_em = agora_brasil()
+            else:
+                job.status = 'pendente'
+                job.executar_em = agora_brasil() + timedelta(seconds=JobService._backoff(job.tentativas))
+            db.session.commit()
+            current_app.logger.warning('job %s (%s) tentativa %s: %s', job.id, job.tipo, job.tentativas, job.erro)
+            return job.status
+
+        job = Job.query.get(job_id)
+        job.status = 'concluido'
+        job.resultado = current_app.json.dumps(resultado)
+        job.erro = None
+        job.travado_por = None
+        job.travado_em = None
+        job.concluido_em = agora_brasil()
+        db.session.commit()
+        return job.status
+
+    @staticmethod
+    def executar_proximo(worker_id):
+        """Reserva e executa um job; False se a fila está vazia"""
+        job_id = JobService.reservar(worker_id)
+        if job_id is None:
+            return False
+        JobService.executar(job_id, worker_id)
+        return True
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Tarefas executadas pelo worker. Cada uma recebe o payload do job como kwargs.
+
+Erros de dados (recurso inexistente, imagem inválida) levantam `ErroPermanente`;
+qualquer outra exceção volta para a fila com backoff.
+"""
+
+from flask import current_app
+
+from source.domain.jobs.services import ErroPermanente, tarefa
+
+
+def _resultado(resultado, erro):
+    """Converte o (resultado, erro) dos services em retorno ou exceção da tarefa"""
+    if erro:
+        if 'não encontrad' in erro or 'inválido' in erro:
+            raise ErroPermanente(erro)
+        raise RuntimeError(erro)
+    return resultado
+
+
+@tarefa('imagens.processar')
+def processar_imagens(modal_url, pessoa_url):
+    from source.domain.imagens.services import ImagemService
+
+    corpo, status = ImagemService.processar(current_app._get_current_object(), modal_url, pessoa_url)
+    if status < 400:
+        return corpo
+    if status < 500:
+        raise ErroPermanente(corpo['erro'])
+    raise RuntimeError(corpo['erro'])
+
+
+@tarefa('classificacao.recalcular')
+def recalcular_classificacao(temporada_id):
+    from source.domain.peladas.services import ClassificacaoService
+
+    return _resultado(*ClassificacaoService.recalcular_classificacao(temporada_id))
+
+
+@tarefa('votacao.encerrar')
+def encerrar_votacao(votacao_id):
+    from source.domain.peladas.services import VotacaoService
+
+    return _resultado(*VotacaoService.encerrar_votacao(votacao_id))
+
+
+@tarefa('votacao.fechar')
+def fechar_votacao(votacao_id):
+    from source.domain.peladas.services import VotacaoService
+
+    return _resultado(*VotacaoService.fechar_votacao_expirada(votacao_id))
+
+
+@tarefa('arquivos.coletar')
+def coletar_arquivos(carencia_horas=None, limite=500):
+    from source.domain.arquivos.services import ArquivoService
+
+    return _resultado(*ArquivoService.coletar_orfaos(carencia_horas, limite))
@@ -9,6 +9,9 @@ def get_brazil_time():
 
 class Pelada(db.Model):
     __tablename__ = 'peladas'
+    __table_args__ = (
+        db.Index('ix_peladas_gerente_ativa', 'usuario_gerente_id', 'ativa'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     usuario_gerente_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -36,6 +39,10 @@ class Pelada(db.Model):
 
 class Jogador(db.Model):
     __tablename__ = 'jogadores'
+    __table_args__ = (
+        db.Index('ix_jogadores_pelada_ativo', 'pelada_id', 'ativo'),
+        db.Index('ix_jogadores_pelada_nome', 'pelada_id', 'nome_completo'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     pelada_id = db.Column(db.Integer, db.ForeignKey('peladas.id'), nullable=False)
@@ -62,6 +69,10 @@ class Jogador(db.Model):
 
 class Temporada(db.Model):
     __tablename__ = 'temporadas'
+    __table_args__ = (
+        db.Index('ix_temporadas_pelada_status', 'pelada_id', 'status'),
+        db.Index('ix_temporadas_pelada_criado', 'pelada_id', 'criado_em'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     pelada_id = db.Column(db.Integer, db.ForeignKey('peladas.id'), nullable=False)
@@ -82,6 +93,9 @@ class Temporada(db.Model):
 
 class Rodada(db.Model):
     __tablename__ = 'rodadas'
+    __table_args__ = (
+        db.Index('ix_rodadas_temporada_data', 'temporada_id', 'data_rodada'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     temporada_id = db.Column(db.Integer, db.ForeignKey('temporadas.id'), nullable=False)
@@ -105,6 +119,9 @@ class Rodada(db.Model):
 
 class Time(db.Model):
     __tablename__ = 'times'
+    __table_args__ = (
+        db.Index('ix_times_temporada_criado', 'temporada_id', 'criado_em'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     temporada_id = db.Column(db.Integer, db.ForeignKey('temporadas.id'), nullable=False)
@@ -134,6 +151,10 @@ class Time(db.Model):
 
 class TimeJogador(db.Model):
     __tablename__ = 'time_jogadores'
+    __table_args__ = (
+        db.UniqueConstraint('time_id', 'jogador_id', name='uq_time_jogador'),
+        db.Index('ix_time_jogadores_jogador', 'jogador_id', 'time_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     time_id = db.Column(db.Integer, db.ForeignKey('times.id'), nullable=False)
@@ -154,22 +175,34 @@ class TimeJogador(db.Model):
 
 class Partida(db.Model):
     __tablename__ = 'partidas'
+    __table_args__ = (
+        db.Index('ix_partidas_rodada_status', 'rodada_id', 'status'),
+        db.Index('ix_partidas_casa_status', 'time_casa_id', 'status'),
+        db.Index('ix_partidas_fora_status', 'time_fora_id', 'status'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     rodada_id = db.Column(db.Integer, db.ForeignKey('rodadas.id'), nullable=False)
-    time_casa_id = db.Column(db.Integer, db.ForeignKey('times.id'), nullable=False)
-    time_fora_id = db.Column(db.Integer, db.ForeignKey('times.id'), nullable=False)
+    # Times podem ficar vazios em partidas geradas por tabela (mata-mata, rei da quadra)
+    # até que a partida de origem termine e defina quem ocupa a vaga
+    time_casa_id = db.Column(db.Integer, db.ForeignKey('times.id'), nullable=True)
+    time_fora_id = db.Column(db.Integer, db.ForeignKey('times.id'), nullable=True)
     inicio = db.Column(db.DateTime, nullable=True)
     fim = db.Column(db.DateTime, nullable=True)
     gols_casa = db.Column(db.Integer, default=0)
     gols_fora = db.Column(db.Integer, default=0)
     status = db.Column(db.String(20), default='agendada')
+    # Origem de cada vaga: partida anterior + 'vencedor' ou 'perdedor'
+    origem_casa_partida_id = db.Column(db.Integer, db.ForeignKey('partidas.id'), nullable=True, index=True)
+    origem_casa_resultado = db.Column(db.String(10), nullable=True)
+    origem_fora_partida_id = db.Column(db.Integer, db.ForeignKey('partidas.id'), nullable=True, index=True)
+    origem_fora_resultado = db.Column(db.String(10), nullable=True)
 
     #relacionamentos
     rodada = db.relationship('Rodada', back_populates='partidas', lazy=True)
     time_casa = db.relationship('Time', foreign_keys=[time_casa_id], back_populates='partidas_casa', lazy=True)
     time_fora = db.relationship('Time', foreign_keys=[time_fora_id], back_populates='partidas_fora', lazy=True)
-    gols = db.relationship('Gol', back_populates='partida', lazy=True)
+    gols = db.relationship('Gol', back_populates='partida', lazy=True, order_by='Gol.minuto')
 
     def __init__(self, rodada_id, time_casa_id, time_fora_id):
         self.rodada_id = rodada_id
@@ -179,6 +212,11 @@ class Partida(db.Model):
 
 class Gol(db.Model):
     __tablename__ = 'gols'
+    __table_args__ = (
+        db.Index('ix_gols_partida_minuto', 'partida_id', 'minuto'),
+        db.Index('ix_gols_jogador_partida', 'jogador_id', 'partida_id', 'gol_contra'),
+        db.Index('ix_gols_assistencia_partida', 'assistencia_id', 'partida_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     partida_id = db.Column(db.Integer, db.ForeignKey('partidas.id'), nullable=False)
@@ -206,6 +244,9 @@ class Gol(db.Model):
 
 class Votacao(db.Model):
     __tablename__ = 'votacoes'
+    __table_args__ = (
+        db.Index('ix_votacoes_rodada_tipo', 'rodada_id', 'tipo'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     rodada_id = db.Column(db.Integer, db.ForeignKey('rodadas.id'), nullable=False)
@@ -227,6 +268,11 @@ class Votacao(db.Model):
 
 class Voto(db.Model):
     __tablename__ = 'votos'
+    __table_args__ = (
+        db.UniqueConstraint('votacao_id', 'jogador_votante_id', 'jogador_votado_id', name='uq_voto_votante_votado'),
+        db.Index('ix_votos_votacao_votado', 'votacao_id', 'jogador_votado_id', 'pontos'),
+        db.Index('ix_votos_votado_votacao', 'jogador_votado_id', 'votacao_id', 'pontos'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     votacao_id = db.Column(db.Integer, db.ForeignKey('votacoes.id'), nullable=False)
@@ -244,4 +290,37 @@ class Voto(db.Model):
         self.votacao_id = votacao_id
         self.jogador_votante_id = jogador_votante_id
         self.jogador_votado_id = jogador_votado_id
-        self.pontos = pontos
\ No newline at end of file
+        self.pontos = pontos
+
+class Classificacao(db.Model):
+    __tablename__ = 'classificacoes'
+    __table_args__ = (
+        db.UniqueConstraint('temporada_id', 'time_id', name='uq_classificacao_temporada_time'),
+        db.Index('ix_classificacao_ordem', 'temporada_id', 'pontos', 'vitorias', 'gols_marcados'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    temporada_id = db.Column(db.Integer, db.ForeignKey('temporadas.id'), nullable=False)
+    time_id = db.Column(db.Integer, db.ForeignKey('times.id'), nullable=False)
+    pontos = db.Column(db.Integer, nullable=False, default=0)
+    jogos = db.Column(db.Integer, nullable=False, default=0)
+    vitorias = db.Column(db.Integer, nullable=False, default=0)
+    empates = db.Column(db.Integer, nullable=False, default=0)
+    derrotas = db.Column(db.Integer, nullable=False, default=0)
+    gols_marcados = db.Column(db.Integer, nullable=False, default=0)
+    gols_sofridos = db.Column(db.Integer, nullable=False, default=0)
+    atualizado_em = db.Column(db.DateTime, default=get_brazil_time, onupdate=get_brazil_time)
+
+    #relacionamentos
+    time = db.relationship('Time', lazy=True)
+
+    def __init__(self, temporada_id, time_id):
+        self.temporada_id = temporada_id
+        self.time_id = time_id
+        self.pontos = 0
+        self.jogos = 0
+        self.vitorias = 0
+        self.empates = 0
+        self.derrotas = 0
+        self.gols_marcados = 0
+        self.gols_sofridos = 0
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Esquemas de serialização dos modelos de peladas.
+
+Os `_serializar_*` dos services delegam para as funções compiladas aqui; as
+rotas podem pedir outras seleções com `serializador(nome, fields=..., include=...)`.
+"""
+
+from source.utils.images import variantes
+from source.utils.serializers import Aninhado, Calculado, Lista, registrar
+
+
+def _origem(partida_id, resultado):
+    """Vaga de partida preenchida pelo vencedor/perdedor de outra (mata-mata, rei da quadra)"""
+    return {'partida_id': partida_id, 'resultado': resultado} if partida_id else None
+
+
+serializar_pelada = registrar(
+    'pelada',
+    'id', 'nome', 'cidade', 'fuso_horario', 'ativa', 'usuario_gerente_id',
+    'logo_url', 'perfil_url', 'criado_em',
+    logo_variantes=Calculado(variantes, 'logo_url'),
+    perfil_variantes=Calculado(variantes, 'perfil_url')
+)
+
+serializar_jogador = registrar(
+    'jogador',
+    'id', 'pelada_id', 'nome_completo', 'apelido', 'telefone', 'foto_url', 'ativo', 'criado_em',
+    foto_variantes=Calculado(variantes, 'foto_url')
+)
+
+# Sub-dict de jogador repetido em gols, escalações e listagens da rodada
+serializar_jogador_resumo = registrar(
+    'jogador_resumo',
+    'id', 'nome_completo', 'apelido', 'foto_url',
+    foto_variantes=Calculado(variantes, 'foto_url')
+)
+
+serializar_temporada = registrar(
+    'temporada',
+    'id', 'pelada_id', 'inicio_mes', 'fim_mes', 'status', 'criado_em'
+)
+
+
+# Jogador escalado num time (lido a partir de TimeJogador)
+serializar_time_jogador = registrar(
+    'time_jogador',
+    'capitao', 'posicao',
+    id='jogador.id',
+    nome_completo='jogador.nome_completo',
+    apelido='jogador.apelido',
+    telefone='jogador.telefone',
+    foto_url='jogador.foto_url',
+    foto_variantes=Calculado(variantes, 'jogador.foto_url')
+)
+
+serializar_time = registrar(
+    'time',
+    'id', 'temporada_id', 'nome', 'cor', 'escudo_url', 'pontos', 'vitorias', 'empates', 'derrotas',
+    'gols_marcados', 'gols_sofridos', 'criado_em',
+    escudo_variantes=Calculado(variantes, 'escudo_url'),
+    saldo_gols=Calculado(lambda marcados, sofridos: (marcados or 0) - (sofridos or 0), 'gols_marcados', 'gols_sofridos'),
+    jogadores=Lista('time_jogador', 'time_jogadores', padrao=False)
+)
+
+# Jogador de um time que jogou a rodada (Row de TimeJogador + Jogador + Time)
+serializar_jogador_rodada = registrar(
+    'jogador_rodada',
+    'posicao',
+    id='jogador.id',
+    nome_completo='jogador.nome_completo',
+    apelido='jogador.apelido',
+    foto_url='jogador.foto_url',
+    foto_variantes=Calculado(variantes, 'jogador.foto_url'),
+    time_id='time.id',
+    time_nome='time.nome',
+    time_escudo_url='time.escudo_url'
+)
+
+serializar_gol = registrar(
+    'gol',
+    'id', 'partida_id', 'time_id', 'minuto', 'gol_contra', 'criado_em',
+    jogador=Aninhado('jogador_resumo'),
+    assistente=Aninhado('jogador_resumo', se='assistencia_id')
+)
+
+serializar_partida = registrar(
+    'partida',
+    'id', 'rodada_id', 'time_casa_id', 'time_fora_id', 'gols_casa', 'gols_fora', 'status', 'inicio', 'fim',
+    origem_casa=Calculado(_origem, 'origem_casa_partida_id', 'origem_casa_resultado'),
+    origem_fora=Calculado(_origem, 'origem_fora_partida_id', 'origem_fora_resultado'),
+    time_casa=Aninhado('time', padrao=False),
+    time_fora=Aninhado('time', padrao=False),
+    gols=Lista('gol', padrao=False)
+)
+
+serializar_rodada = registrar(
+    'rodada',
+    'id', 'temporada_id', 'data_rodada', 'quantidade_times', 'jogadores_por_time', 'status', 'criado_em',
+    partidas=Lista('partida', padrao=False)
+)
+
+serializar_votacao = registrar(
+    'votacao',
+    'id', 'rodada_id', 'abre_em', 'fecha_em', 'tipo', 'status'
+)
+
+serializar_voto = registrar(
+    'voto',
+    'id', 'votacao_id', 'jogador_votante_id', 'jogador_votado_id', 'pontos', 'criado_em'
+)
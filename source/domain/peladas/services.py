@@ -1,13 +1,24 @@
 # -*- coding: utf-8 -*-
-from source.extensions.extensios import db
+from source.extensions.extensios import db, cache
 from source.domain.peladas.models import (
     Pelada, Jogador, Temporada, Rodada, Time, TimeJogador,
-    Partida, Gol, Votacao, Voto, get_brazil_time
+    Partida, Gol, Votacao, Voto, Classificacao, get_brazil_time
 )
+from source.domain.peladas.serializers import (
+    serializar_pelada, serializar_jogador, serializar_temporada, serializar_rodada,
+    serializar_time, serializar_partida, serializar_gol, serializar_votacao, serializar_voto
+)
+from source.utils.images import variantes
+from source.utils.metrics import GOLS_REGISTRADOS, PARTIDAS_FINALIZADAS, VOTOS_REGISTRADOS
 from source.utils.pagination import paginate
+from source.utils.serializers import SELECAO_PADRAO, opcoes_carga, serializador
+from source.utils.streaming import LOTE_BANCO
 from datetime import datetime, date
-from sqlalchemy import func, desc, case
+from sqlalchemy import func, desc, case, select, and_, or_, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased, joinedload
 import pytz
+from types import SimpleNamespace
 
 # Posição agora é armazenada como string (nome) diretamente no banco
 
@@ -38,40 +49,101 @@ class PeladaService:
             return None, str(e)
 
     @staticmethod
-    def obter_pelada_por_id(pelada_id):
-        """Obter pelada por ID"""
+    def obter_pelada_por_id(pelada_id, selecao=SELECAO_PADRAO):
+        """Obter pelada por ID (`selecao`: campos pedidos pelo cliente)"""
         try:
-            pelada = Pelada.query.get(int(pelada_id))
+            pelada = Pelada.query.options(*selecao.opcoes(Pelada, 'pelada')).get(int(pelada_id))
             if not pelada:
                 return None, 'Pelada não encontrada'
-            return PeladaService._serializar_pelada(pelada), None
+            return selecao.serializador('pelada')(pelada), None
         except (ValueError, TypeError):
             return None, 'ID de pelada inválido'
 
     @staticmethod
     def obter_perfil_pelada(pelada_id):
-        """Obter perfil completo da pelada com gerente, jogadores, temporadas e estatísticas"""
+        """Obter perfil completo da pelada com gerente, jogadores, temporadas e estatísticas
+
+        Monta o perfil com duas consultas: a primeira traz a pelada, o gerente
+        (joinedload), as últimas 5 temporadas, a temporada ativa e os contadores
+        (subconsultas escalares); a segunda traz apenas as colunas dos jogadores ativos.
+        """
         try:
-            pelada = Pelada.query.get(int(pelada_id))
-            if not pelada:
-                return None, 'Pelada não encontrada'
+            pelada_id = int(pelada_id)
+
+            # Apenas as 5 temporadas mais recentes são serializadas no perfil
+            ultimas_temporadas = (
+                db.session.query(Temporada)
+                .filter(Temporada.pelada_id == pelada_id)
+                .order_by(Temporada.criado_em.desc())
+                .limit(5)
+                .subquery()
+            )
+            temporada_recente = aliased(Temporada, ultimas_temporadas)
+            temporada_ativa = aliased(Temporada)
 
-            jogadores = Jogador.query.filter_by(pelada_id=pelada_id, ativo=True).all()
-            temporadas = Temporada.query.filter_by(pelada_id=pelada_id).order_by(Temporada.criado_em.desc()).all()
+            total_temporadas = (
+                select(func.count(Temporada.id))
+                .where(Temporada.pelada_id == Pelada.id)
+                .scalar_subquery()
+            )
+            rodadas_realizadas = (
+                select(func.count(Rodada.id))
+                .where(Rodada.temporada_id == temporada_ativa.id)
+                .scalar_subquery()
+            )
+            partidas_realizadas = (
+                select(func.count(Partida.id))
+                .join(Rodada, Partida.rodada_id == Rodada.id)
+                .where(
+                    Rodada.temporada_id == temporada_ativa.id,
+                    Partida.status == 'finalizada'
+                )
+                .scalar_subquery()
+            )
 
-            total_jogadores = len(jogadores)
-            total_temporadas = len(temporadas)
+            linhas = (
+                db.session.query(
+                    Pelada,
+                    temporada_recente,
+                    temporada_ativa,
+                    total_temporadas.label('total_temporadas'),
+                    rodadas_realizadas.label('rodadas_realizadas'),
+                    partidas_realizadas.label('partidas_realizadas')
+                )
+                .options(joinedload(Pelada.gerente))
+                .outerjoin(temporada_ativa, and_(
+                    temporada_ativa.pelada_id == Pelada.id,
+                    temporada_ativa.status == 'ativa'
+                ))
+                .outerjoin(temporada_recente, temporada_recente.pelada_id == Pelada.id)
+                .filter(Pelada.id == pelada_id)
+                .order_by(temporada_recente.criado_em.desc(), temporada_recente.id.desc())
+                .all()
+            )
+            if not linhas:
+                return None, 'Pelada não encontrada'
 
-            temporada_ativa = Temporada.query.filter_by(pelada_id=pelada_id, status='ativa').first()
+            pelada, _, ativa, total_temporadas, rodadas_realizadas, partidas_realizadas = linhas[0]
 
-            rodadas_realizadas = 0
-            partidas_realizadas = 0
-            if temporada_ativa:
-                rodadas_realizadas = Rodada.query.filter_by(temporada_id=temporada_ativa.id).count()
-                partidas_realizadas = db.session.query(Partida).join(Rodada).filter(
-                    Rodada.temporada_id == temporada_ativa.id,
-                    Partida.status == 'finalizada'
-                ).count()
+            temporadas = []
+            vistas = set()
+            for _, temporada, _, _, _, _ in linhas:
+                if temporada is not None and temporada.id not in vistas:
+                    vistas.add(temporada.id)
+                    temporadas.append(temporada)
+
+            jogadores = (
+                db.session.query(
+                    Jogador.id,
+                    Jogador.nome_completo,
+                    Jogador.apelido,
+                    Jogador.telefone,
+                    Jogador.foto_url,
+                    Jogador.criado_em
+                )
+                .filter(Jogador.pelada_id == pelada_id, Jogador.ativo == True)  # noqa: E712
+                .all()
+            )
 
             perfil = {
                 'pelada': PeladaService._serializar_pelada(pelada),  # Usa serialização completa com logo_url e perfil_url
@@ -81,10 +153,10 @@ class PeladaService:
                     'email': pelada.gerente.email
                 } if pelada.gerente else None,
                 'estatisticas': {
-                    'total_jogadores': total_jogadores,
-                    'total_temporadas': total_temporadas,
-                    'rodadas_realizadas': rodadas_realizadas,
-                    'partidas_realizadas': partidas_realizadas
+                    'total_jogadores': len(jogadores),
+                    'total_temporadas': total_temporadas or 0,
+                    'rodadas_realizadas': (rodadas_realizadas or 0) if ativa else 0,
+                    'partidas_realizadas': (partidas_realizadas or 0) if ativa else 0
                 },
                 'jogadores': [
                     {
@@ -93,24 +165,25 @@ class PeladaService:
                         'apelido': j.apelido,
                         'telefone': j.telefone,
                         'foto_url': j.foto_url,
-                        'criado_em': j.criado_em.isoformat() if j.criado_em else None
+                        'foto_variantes': variantes(j.foto_url),
+                        'criado_em': j.criado_em
                     } for j in jogadores
                 ],
                 'temporadas': [
                     {
                         'id': t.id,
-                        'inicio_mes': t.inicio_mes.isoformat() if t.inicio_mes else None,
-                        'fim_mes': t.fim_mes.isoformat() if t.fim_mes else None,
+                        'inicio_mes': t.inicio_mes,
+                        'fim_mes': t.fim_mes,
                         'status': t.status,
-                        'criado_em': t.criado_em.isoformat() if t.criado_em else None
-                    } for t in temporadas[:5]
+                        'criado_em': t.criado_em
+                    } for t in temporadas
                 ],
                 'temporada_ativa': {
-                    'id': temporada_ativa.id,
-                    'inicio_mes': temporada_ativa.inicio_mes.isoformat() if temporada_ativa.inicio_mes else None,
-                    'fim_mes': temporada_ativa.fim_mes.isoformat() if temporada_ativa.fim_mes else None,
-                    'status': temporada_ativa.status
-                } if temporada_ativa else None
+                    'id': ativa.id,
+                    'inicio_mes': ativa.inicio_mes,
+                    'fim_mes': ativa.fim_mes,
+                    'status': ativa.status
+                } if ativa else None
             }
 
             return perfil, None
@@ -120,22 +193,22 @@ class PeladaService:
             return None, str(e)
 
     @staticmethod
-    def listar_peladas(page=1, per_page=10, usuario_id=None, ativa=None):
+    def listar_peladas(page=1, per_page=10, usuario_id=None, ativa=None, cursor=None, include_total=True,
+                       selecao=SELECAO_PADRAO):
         """Listar peladas com filtros opcionais"""
         try:
-            query = Pelada.query
+            query = Pelada.query.options(*selecao.opcoes(Pelada, 'pelada'))
 
             if usuario_id:
                 query = query.filter_by(usuario_gerente_id=usuario_id)
             if ativa is not None:
                 query = query.filter_by(ativa=ativa)
 
-            resultado_paginado = paginate(query, page, per_page)
+            # Sem filtros (visão de admin) o total vem das estatísticas da tabela; com filtros, do cache
+            resultado_paginado = paginate(query, page, per_page, cursor, include_total, contagem='estimada')
 
-            peladas_serializadas = [
-                PeladaService._serializar_pelada(pelada)
-                for pelada in resultado_paginado['data']
-            ]
+            serializar = selecao.serializador('pelada')
+            peladas_serializadas = [serializar(pelada) for pelada in resultado_paginado['data']]
 
             return {
                 'data': peladas_serializadas,
@@ -178,17 +251,7 @@ class PeladaService:
     @staticmethod
     def _serializar_pelada(pelada):
         """Serializa uma pelada para dicionário"""
-        return {
-            'id': pelada.id,
-            'nome': pelada.nome,
-            'cidade': pelada.cidade,
-            'fuso_horario': pelada.fuso_horario,
-            'ativa': pelada.ativa,
-            'usuario_gerente_id': pelada.usuario_gerente_id,
-            'logo_url': pelada.logo_url,
-            'perfil_url': pelada.perfil_url,
-            'criado_em': pelada.criado_em.isoformat() if pelada.criado_em else None
-        }
+        return serializar_pelada(pelada)
 
 
 class JogadorService:
@@ -214,31 +277,30 @@ class JogadorService:
             return None, str(e)
 
     @staticmethod
-    def obter_jogador_por_id(jogador_id):
+    def obter_jogador_por_id(jogador_id, selecao=SELECAO_PADRAO):
         """Obter jogador por ID"""
         try:
-            jogador = Jogador.query.get(int(jogador_id))
+            jogador = Jogador.query.options(*selecao.opcoes(Jogador, 'jogador')).get(int(jogador_id))
             if not jogador:
                 return None, 'Jogador não encontrado'
-            return JogadorService._serializar_jogador(jogador), None
+            return selecao.serializador('jogador')(jogador), None
         except (ValueError, TypeError):
             return None, 'ID de jogador inválido'
 
     @staticmethod
-    def listar_jogadores(pelada_id, page=1, per_page=20, ativo=None):
+    def listar_jogadores(pelada_id, page=1, per_page=20, ativo=None, cursor=None, include_total=True,
+                         selecao=SELECAO_PADRAO):
         """Listar jogadores de uma pelada"""
         try:
-            query = Jogador.query.filter_by(pelada_id=pelada_id)
+            query = Jogador.query.options(*selecao.opcoes(Jogador, 'jogador')).filter_by(pelada_id=pelada_id)
 
             if ativo is not None:
                 query = query.filter_by(ativo=ativo)
 
-            resultado_paginado = paginate(query, page, per_page)
+            resultado_paginado = paginate(query, page, per_page, cursor, include_total)
 
-            jogadores_serializados = [
-                JogadorService._serializar_jogador(jogador)
-                for jogador in resultado_paginado['data']
-            ]
+            serializar = selecao.serializador('jogador')
+            jogadores_serializados = [serializar(jogador) for jogador in resultado_paginado['data']]
 
             return {
                 'data': jogadores_serializados,
@@ -267,7 +329,9 @@ class JogadorService:
             if 'foto_url' in dados:
                 jogador.foto_url = dados['foto_url']
 
+            tags = JogadorService._tags_cache(jogador.id)
             db.session.commit()
+            cache.invalidar(*tags)
             return JogadorService._serializar_jogador(jogador), None
         except (ValueError, TypeError):
             db.session.rollback()
@@ -276,19 +340,139 @@ class JogadorService:
             db.session.rollback()
             return None, str(e)
 
+    @staticmethod
+    def _normalizar_importacao(dados):
+        """Valida uma linha de importação; retorna (registro, erro)"""
+        if not isinstance(dados, dict):
+            return None, 'Linha deve ser um objeto com nome_completo, apelido e telefone'
+
+        def texto(campo):
+            valor = dados.get(campo)
+            if valor is None:
+                return None
+            valor = str(valor).strip()
+            return valor or None
+
+        registro = {
+            'nome_completo': texto('nome_completo'),
+            'apelido': texto('apelido'),
+            'telefone': texto('telefone')
+        }
+        if not registro['nome_completo']:
+            return None, 'Nome completo é obrigatório'
+        for campo, limite in (('nome_completo', 100), ('apelido', 50), ('telefone', 20)):
+            if registro[campo] and len(registro[campo]) > limite:
+                return None, f'{campo} excede {limite} caracteres'
+        return registro, None
+
+    @staticmethod
+    def importar_jogadores(pelada_id, linhas, tamanho_lote=500):
+        """
+        Importa jogadores em lotes, produzindo eventos à medida que processa
+
+        Args:
+            linhas: iterável de (numero_linha, dados, erro_de_leitura)
+            tamanho_lote: quantidade de linhas válidas inseridas por commit
+
+        Yields:
+            dicts de erro/duplicidade por linha, um resumo por lote e o resumo final.
+            Duplicados são (pelada_id, nome_completo, telefone) já existentes no banco
+            ou repetidos no próprio arquivo.
+        """
+        resumo = {'linhas': 0, 'inseridos': 0, 'duplicados': 0, 'erros': 0}
+        lote = []
+        numero_lote = 0
+
+        def gravar_lote():
+            existentes = {
+                (nome, telefone) for nome, telefone in
+                db.session.query(Jogador.nome_completo, Jogador.telefone).filter(
+                    Jogador.pelada_id == pelada_id,
+                    Jogador.nome_completo.in_({r['nome_completo'] for _, r in lote})
+                )
+            }
+            novos, vistos, eventos = [], set(), []
+            for numero_linha, registro in lote:
+                chave = (registro['nome_completo'], registro['telefone'])
+                if chave in existentes or chave in vistos:
+                    eventos.append({'linha': numero_linha, 'status': 'duplicado'})
+                    continue
+                vistos.add(chave)
+                novos.append({'pelada_id': pelada_id, 'ativo': True, **registro})
+
+            if novos:
+                db.session.execute(Jogador.__table__.insert(), novos)
+            db.session.commit()
+            return novos, eventos
+
+        for numero_linha, dados, erro in linhas:
+            resumo['linhas'] += 1
+            registro = None
+            if not erro:
+                registro, erro = JogadorService._normalizar_importacao(dados)
+            if erro:
+                resumo['erros'] += 1
+                yield {'linha': numero_linha, 'status': 'erro', 'erro': erro}
+                continue
+
+            lote.append((numero_linha, registro))
+            if len(lote) < tamanho_lote:
+                continue
+
+            numero_lote += 1
+            yield from JogadorService._processar_lote_importacao(gravar_lote, numero_lote, lote, resumo)
+            lote = []
+
+        if lote:
+            numero_lote += 1
+            yield from JogadorService._processar_lote_importacao(gravar_lote, numero_lote, lote, resumo)
+
+        yield {'resumo': resumo}
+
+    @staticmethod
+    def _processar_lote_importacao(gravar_lote, numero_lote, lote, resumo):
+        try:
+            novos, eventos = gravar_lote()
+        except Exception as e:
+            db.session.rollback()
+            resumo['erros'] += len(lote)
+            yield {'lote': numero_lote, 'status': 'erro', 'erro': str(e), 'linhas': [n for n, _ in lote]}
+            return
+
+        resumo['inseridos'] += len(novos)
+        resumo['duplicados'] += len(eventos)
+        yield from eventos
+        yield {'lote': numero_lote, 'status': 'ok', 'inseridos': len(novos)}
+
+    @staticmethod
+    def _tags_cache(jogador_id):
+        """Leituras em cache que mostram o jogador: temporadas em que jogou (rankings, artilharia),
+        rodadas com gols/assistências dele e votações em que recebeu votos"""
+        gols = db.session.query(Gol.partida_id).filter(
+            or_(Gol.jogador_id == jogador_id, Gol.assistencia_id == jogador_id)
+        )
+        temporadas = (
+            db.session.query(Time.temporada_id)
+            .join(TimeJogador, TimeJogador.time_id == Time.id)
+            .filter(TimeJogador.jogador_id == jogador_id)
+            .union(
+                db.session.query(Time.temporada_id)
+                .join(Gol, Gol.time_id == Time.id)
+                .filter(Gol.partida_id.in_(gols))
+            )
+        )
+        rodadas = db.session.query(Partida.rodada_id).filter(Partida.id.in_(gols)).distinct()
+        votacoes = db.session.query(Voto.votacao_id).filter(Voto.jogador_votado_id == jogador_id).distinct()
+        return (
+            [('temporada', temporada_id) for (temporada_id,) in temporadas]
+            + [('rodada', rodada_id) for (rodada_id,) in rodadas]
+            + [('votacao', votacao_id) for (votacao_id,) in votacoes]
+        )
+
     @staticmethod
     def _serializar_jogador(jogador):
         """Serializa um jogador para dicionário"""
-        return {
-            'id': jogador.id,
-            'pelada_id': jogador.pelada_id,
-            'nome_completo': jogador.nome_completo,
-            'apelido': jogador.apelido,
-            'telefone': jogador.telefone,
-            'foto_url': jogador.foto_url,
-            'ativo': jogador.ativo,
-            'criado_em': jogador.criado_em.isoformat() if jogador.criado_em else None
-        }
+        return serializar_jogador(jogador)
 
 
 class TemporadaService:
@@ -315,28 +499,30 @@ class TemporadaService:
             return None, str(e)
 
     @staticmethod
-    def obter_temporada_por_id(temporada_id):
+    def obter_temporada_por_id(temporada_id, selecao=SELECAO_PADRAO):
         """Obter temporada por ID"""
         try:
-            temporada = Temporada.query.get(int(temporada_id))
+            temporada = Temporada.query.options(*selecao.opcoes(Temporada, 'temporada')).get(int(temporada_id))
             if not temporada:
                 return None, 'Temporada não encontrada'
-            return TemporadaService._serializar_temporada(temporada), None
+            return selecao.serializador('temporada')(temporada), None
         except (ValueError, TypeError):
             return None, 'ID de temporada inválido'
 
     @staticmethod
-    def listar_temporadas(pelada_id, page=1, per_page=10):
+    def listar_temporadas(pelada_id, page=1, per_page=10, cursor=None, include_total=True, selecao=SELECAO_PADRAO):
         """Listar temporadas de uma pelada"""
         try:
-            query = Temporada.query.filter_by(pelada_id=pelada_id).order_by(Temporada.criado_em.desc())
+            query = (
+                Temporada.query.options(*selecao.opcoes(Temporada, 'temporada'))
+                .filter_by(pelada_id=pelada_id)
+                .order_by(Temporada.criado_em.desc())
+            )
 
-            resultado_paginado = paginate(query, page, per_page)
+            resultado_paginado = paginate(query, page, per_page, cursor, include_total)
 
-            temporadas_serializadas = [
-                TemporadaService._serializar_temporada(temporada)
-                for temporada in resultado_paginado['data']
-            ]
+            serializar = selecao.serializador('temporada')
+            temporadas_serializadas = [serializar(temporada) for temporada in resultado_paginado['data']]
 
             return {
                 'data': temporadas_serializadas,
@@ -367,14 +553,7 @@ class TemporadaService:
     @staticmethod
     def _serializar_temporada(temporada):
         """Serializa uma temporada para dicionário"""
-        return {
-            'id': temporada.id,
-            'pelada_id': temporada.pelada_id,
-            'inicio_mes': temporada.inicio_mes.isoformat() if temporada.inicio_mes else None,
-            'fim_mes': temporada.fim_mes.isoformat() if temporada.fim_mes else None,
-            'status': temporada.status,
-            'criado_em': temporada.criado_em.isoformat() if temporada.criado_em else None
-        }
+        return serializar_temporada(temporada)
 
 
 class RodadaService:
@@ -405,35 +584,32 @@ class RodadaService:
             return None, str(e)
 
     @staticmethod
-    def obter_rodada_por_id(rodada_id):
+    def obter_rodada_por_id(rodada_id, selecao=SELECAO_PADRAO):
         """Obter rodada por ID com partidas"""
         try:
-            rodada = Rodada.query.get(int(rodada_id))
+            # Partidas da rodada (ao invés de times) carregadas junto, numa segunda consulta
+            rodada = Rodada.query.options(*selecao.opcoes(Rodada, 'rodada', ('partidas',))).get(int(rodada_id))
             if not rodada:
                 return None, 'Rodada não encontrada'
 
-            # Obter partidas da rodada ao invés de times
-            partidas = Partida.query.filter_by(rodada_id=rodada_id).all()
-
-            rodada_data = RodadaService._serializar_rodada(rodada)
-            rodada_data['partidas'] = [PartidaService._serializar_partida(partida) for partida in partidas]
-
-            return rodada_data, None
+            return selecao.serializador('rodada', ('partidas',))(rodada), None
         except (ValueError, TypeError):
             return None, 'ID de rodada inválido'
 
     @staticmethod
-    def listar_rodadas(temporada_id, page=1, per_page=10):
+    def listar_rodadas(temporada_id, page=1, per_page=10, cursor=None, include_total=True, selecao=SELECAO_PADRAO):
         """Listar rodadas de uma temporada"""
         try:
-            query = Rodada.query.filter_by(temporada_id=temporada_id).order_by(Rodada.data_rodada.desc())
+            query = (
+                Rodada.query.options(*selecao.opcoes(Rodada, 'rodada'))
+                .filter_by(temporada_id=temporada_id)
+                .order_by(Rodada.data_rodada.desc())
+            )
 
-            resultado_paginado = paginate(query, page, per_page)
+            resultado_paginado = paginate(query, page, per_page, cursor, include_total)
 
-            rodadas_serializadas = [
-                RodadaService._serializar_rodada(rodada)
-                for rodada in resultado_paginado['data']
-            ]
+            serializar = selecao.serializador('rodada')
+            rodadas_serializadas = [serializar(rodada) for rodada in resultado_paginado['data']]
 
             return {
                 'data': rodadas_serializadas,
@@ -444,11 +620,13 @@ class RodadaService:
             return None, str(e)
 
     @staticmethod
-    def listar_jogadores_da_rodada(rodada_id, posicao=None, apenas_ativos=True):
+    def listar_jogadores_da_rodada(rodada_id, posicao=None, apenas_ativos=True, em_fluxo=False,
+                                   selecao=SELECAO_PADRAO):
         """
         Lista jogadores associados aos times que participaram da rodada (via partidas).
 
         Retorno: lista de dicts com: id, nome_completo, apelido, posicao, time_id, time_nome
+        (com em_fluxo=True, um iterador que lê o banco em lotes)
         """
         try:
             rodada = Rodada.query.get(int(rodada_id))
@@ -476,8 +654,12 @@ class RodadaService:
                 if posicao_filtro == '':
                     posicao_filtro = None
 
+            # Só as colunas do esquema, rotuladas para o serializer: sem hidratar TimeJogador/Jogador/Time
             query = (
-                db.session.query(TimeJogador, Jogador, Time)
+                db.session.query(
+                    *selecao.colunas('jogador_rodada', {'': TimeJogador, 'jogador': Jogador, 'time': Time})
+                )
+                .select_from(TimeJogador)
                 .join(Jogador, TimeJogador.jogador_id == Jogador.id)
                 .join(Time, TimeJogador.time_id == Time.id)
                 .filter(TimeJogador.time_id.in_(list(time_ids)))
@@ -496,22 +678,12 @@ class RodadaService:
                 posicao_null_ultimo.asc(),
                 TimeJogador.posicao.asc(),
                 Jogador.nome_completo.asc()
-            ).all()
-
-            jogadores = []
-            for tj, j, t in rows:
-                jogadores.append({
-                    'id': j.id,
-                    'nome_completo': j.nome_completo,
-                    'apelido': j.apelido,
-                    'foto_url': j.foto_url,
-                    'posicao': tj.posicao,  # Retorna o nome que foi salvo
-                    'time_id': t.id,
-                    'time_nome': t.nome,
-                    'time_escudo_url': t.escudo_url
-                })
+            ).yield_per(LOTE_BANCO)
 
-            return jogadores, None
+            serializar = selecao.serializador('jogador_rodada', linhas=True)
+            jogadores = (serializar(row) for row in rows)
+
+            return (jogadores if em_fluxo else list(jogadores)), None
         except (ValueError, TypeError):
             return None, 'ID de rodada inválido'
         except Exception as e:
@@ -520,20 +692,18 @@ class RodadaService:
     @staticmethod
     def _serializar_rodada(rodada):
         """Serializa uma rodada para dicionário"""
-        return {
-            'id': rodada.id,
-            'temporada_id': rodada.temporada_id,
-            'data_rodada': rodada.data_rodada.isoformat() if rodada.data_rodada else None,
-            'quantidade_times': rodada.quantidade_times,
-            'jogadores_por_time': rodada.jogadores_por_time,
-            'status': rodada.status,
-            'criado_em': rodada.criado_em.isoformat() if rodada.criado_em else None
-        }
+        return serializar_rodada(rodada)
 
 
 class TimeService:
     """Camada de serviço para lógica de negócios relacionada a times"""
 
+    # Aninhados do "time completo" devolvido pelas leituras
+    INCLUIR_COMPLETO = ('jogadores',)
+
+    # Perfil de carga do time completo: escalação e jogadores em uma consulta extra, não uma por jogador
+    CARGA_COMPLETO = opcoes_carga(Time, 'time', include=INCLUIR_COMPLETO)
+
     @staticmethod
     def criar_time(temporada_id, nome, cor=None, escudo_url=None):
         """Criar um novo time fixo na temporada"""
@@ -553,7 +723,10 @@ class TimeService:
             if escudo_url:
                 novo_time.escudo_url = escudo_url
             db.session.add(novo_time)
+            db.session.flush()
+            db.session.add(Classificacao(temporada_id=novo_time.temporada_id, time_id=novo_time.id))
             db.session.commit()
+            cache.invalidar(('temporada', novo_time.temporada_id))
             return TimeService._serializar_time(novo_time), None
         except Exception as e:
             db.session.rollback()
@@ -590,6 +763,7 @@ class TimeService:
             )
             db.session.add(time_jogador)
             db.session.commit()
+            cache.invalidar(('temporada', time.temporada_id))
             return {'mensagem': 'Jogador adicionado ao time com sucesso'}, None
         except Exception as e:
             db.session.rollback()
@@ -603,21 +777,23 @@ class TimeService:
             if not time_jogador:
                 return None, 'Jogador não encontrado neste time'
 
+            temporada_id = time_jogador.time.temporada_id
             db.session.delete(time_jogador)
             db.session.commit()
+            cache.invalidar(('temporada', temporada_id))
             return {'mensagem': 'Jogador removido do time com sucesso'}, None
         except Exception as e:
             db.session.rollback()
             return None, str(e)
 
     @staticmethod
-    def obter_time_por_id(time_id):
+    def obter_time_por_id(time_id, selecao=SELECAO_PADRAO):
         """Obter time por ID com jogadores"""
         try:
-            time = Time.query.get(int(time_id))
+            time = Time.query.options(*selecao.opcoes(Time, 'time', TimeService.INCLUIR_COMPLETO)).get(int(time_id))
             if not time:
                 return None, 'Time não encontrado'
-            return TimeService._serializar_time_completo(time), None
+            return selecao.serializador('time', TimeService.INCLUIR_COMPLETO)(time), None
         except (ValueError, TypeError):
             return None, 'ID de time inválido'
 
@@ -636,7 +812,11 @@ class TimeService:
             if 'escudo_url' in dados:
                 time.escudo_url = dados['escudo_url']
 
+            temporada_id = time.temporada_id
             db.session.commit()
+            cache.invalidar(('temporada', temporada_id))
+
+            time = Time.query.options(*TimeService.CARGA_COMPLETO).filter_by(id=int(time_id)).one()
             return TimeService._serializar_time_completo(time), None
         except (ValueError, TypeError):
             db.session.rollback()
@@ -646,17 +826,21 @@ class TimeService:
             return None, str(e)
 
     @staticmethod
-    def listar_times_da_temporada(temporada_id, page=1, per_page=20):
+    def listar_times_da_temporada(temporada_id, page=1, per_page=20, cursor=None, include_total=True,
+                                  selecao=SELECAO_PADRAO):
         """Listar todos os times de uma temporada"""
         try:
-            query = Time.query.filter_by(temporada_id=temporada_id).order_by(Time.criado_em)
+            # Jogadores (e seus dados) de todos os times da página em duas consultas, não uma por time
+            query = (
+                Time.query.options(*selecao.opcoes(Time, 'time', TimeService.INCLUIR_COMPLETO))
+                .filter_by(temporada_id=temporada_id)
+                .order_by(Time.criado_em)
+            )
 
-            resultado_paginado = paginate(query, page, per_page)
+            resultado_paginado = paginate(query, page, per_page, cursor, include_total)
 
-            times_serializados = [
-                TimeService._serializar_time_completo(time)
-                for time in resultado_paginado['data']
-            ]
+            serializar = selecao.serializador('time', TimeService.INCLUIR_COMPLETO)
+            times_serializados = [serializar(time) for time in resultado_paginado['data']]
 
             return {
                 'data': times_serializados,
@@ -668,45 +852,23 @@ class TimeService:
     @staticmethod
     def _serializar_time(time):
         """Serializa um time básico para dicionário"""
-        return {
-            'id': time.id,
-            'temporada_id': time.temporada_id,
-            'nome': time.nome,
-            'cor': time.cor,
-            'escudo_url': time.escudo_url,
-            'pontos': time.pontos,
-            'vitorias': time.vitorias,
-            'empates': time.empates,
-            'derrotas': time.derrotas,
-            'gols_marcados': time.gols_marcados,
-            'gols_sofridos': time.gols_sofridos,
-            'saldo_gols': (time.gols_marcados or 0) - (time.gols_sofridos or 0),
-            'criado_em': time.criado_em.isoformat() if time.criado_em else None
-        }
+        return serializar_time(time)
 
     @staticmethod
     def _serializar_time_completo(time):
         """Serializa um time completo com jogadores"""
-        jogadores = []
-        for tj in time.time_jogadores:
-            jogadores.append({
-                'id': tj.jogador.id,
-                'nome_completo': tj.jogador.nome_completo,
-                'apelido': tj.jogador.apelido,
-                'telefone': tj.jogador.telefone,
-                'foto_url': tj.jogador.foto_url,
-                'capitao': tj.capitao,
-                'posicao': tj.posicao  # Retorna o nome que foi salvo
-            })
-
-        time_data = TimeService._serializar_time(time)
-        time_data['jogadores'] = jogadores
-        return time_data
+        return serializador('time', include=TimeService.INCLUIR_COMPLETO)(time)
 
 
 class PartidaService:
     """Camada de serviço para lógica de negócios relacionada a partidas"""
 
+    # Aninhados da "partida completa": os dois times e os gols (por minuto)
+    INCLUIR_COMPLETA = ('time_casa', 'time_fora', 'gols')
+
+    # Times por JOIN; gols, autores e assistentes numa segunda consulta
+    CARGA_COMPLETA = opcoes_carga(Partida, 'partida', include=INCLUIR_COMPLETA)
+
     @staticmethod
     def criar_partida(rodada_id, time_casa_id, time_fora_id):
         """Criar uma nova partida"""
@@ -732,6 +894,7 @@ class PartidaService:
             )
             db.session.add(nova_partida)
             db.session.commit()
+            cache.invalidar(('rodada', rodada.id))
             return PartidaService._serializar_partida(nova_partida), None
         except Exception as e:
             db.session.rollback()
@@ -748,9 +911,13 @@ class PartidaService:
             if partida.status != 'agendada':
                 return None, 'Partida já foi iniciada ou finalizada'
 
+            if not partida.time_casa_id or not partida.time_fora_id:
+                return None, 'Times da partida ainda não foram definidos'
+
             partida.inicio = datetime.now()
             partida.status = 'em_andamento'
             db.session.commit()
+            cache.invalidar(('rodada', partida.rodada_id))
             return PartidaService._serializar_partida(partida), None
         except Exception as e:
             db.session.rollback()
@@ -767,102 +934,298 @@ class PartidaService:
             if partida.status == 'finalizada':
                 return None, 'Partida já foi finalizada'
 
+            if not partida.time_casa_id or not partida.time_fora_id:
+                return None, 'Times da partida ainda não foram definidos'
+
+            ClassificacaoService.garantir_classificacao(partida)
+
             partida.fim = datetime.now()
             partida.status = 'finalizada'
 
-            gols_casa = partida.gols_casa or 0
-            gols_fora = partida.gols_fora or 0
-
-            time_casa = partida.time_casa
-            time_fora = partida.time_fora
-
-            # Garantir que valores None sejam tratados como 0
-            time_casa.gols_marcados = (time_casa.gols_marcados or 0) + gols_casa
-            time_casa.gols_sofridos = (time_casa.gols_sofridos or 0) + gols_fora
-            time_fora.gols_marcados = (time_fora.gols_marcados or 0) + gols_fora
-            time_fora.gols_sofridos = (time_fora.gols_sofridos or 0) + gols_casa
-
-            if gols_casa > gols_fora:
-                time_casa.pontos = (time_casa.pontos or 0) + 3
-                time_casa.vitorias = (time_casa.vitorias or 0) + 1
-                time_fora.derrotas = (time_fora.derrotas or 0) + 1
-            elif gols_fora > gols_casa:
-                time_fora.pontos = (time_fora.pontos or 0) + 3
-                time_fora.vitorias = (time_fora.vitorias or 0) + 1
-                time_casa.derrotas = (time_casa.derrotas or 0) + 1
-            else:
-                time_casa.pontos = (time_casa.pontos or 0) + 1
-                time_casa.empates = (time_casa.empates or 0) + 1
-                time_fora.pontos = (time_fora.pontos or 0) + 1
-                time_fora.empates = (time_fora.empates or 0) + 1
+            ClassificacaoService.aplicar_resultado(partida)
+            TabelaService.promover_classificados(partida)
 
+            tags = PartidaService._tags_cache(partida)
             db.session.commit()
+            cache.invalidar(*tags)
+            PARTIDAS_FINALIZADAS.inc()
             return PartidaService._serializar_partida(partida), None
         except Exception as e:
             db.session.rollback()
             return None, str(e)
 
     @staticmethod
-    def obter_partida_por_id(partida_id):
+    def obter_partida_por_id(partida_id, selecao=SELECAO_PADRAO):
         """Obter partida por ID"""
         try:
-            partida = Partida.query.get(int(partida_id))
+            incluir = PartidaService.INCLUIR_COMPLETA
+            partida = Partida.query.options(*selecao.opcoes(Partida, 'partida', incluir)).get(int(partida_id))
             if not partida:
                 return None, 'Partida não encontrada'
-            return PartidaService._serializar_partida_completa(partida), None
+            return selecao.serializador('partida', incluir)(partida), None
         except (ValueError, TypeError):
             return None, 'ID de partida inválido'
 
     @staticmethod
-    def listar_partidas(rodada_id):
-        """Listar todas as partidas de uma rodada"""
+    def listar_partidas(rodada_id, em_fluxo=False, selecao=SELECAO_PADRAO):
+        """Listar todas as partidas de uma rodada (com em_fluxo=True, iterador lido em lotes)"""
         try:
-            partidas = Partida.query.filter_by(rodada_id=rodada_id).all()
-            partidas_serializadas = [PartidaService._serializar_partida(p) for p in partidas]
-            return partidas_serializadas, None
+            partidas = (
+                db.session.query(*selecao.colunas('partida', {'': Partida}))
+                .filter(Partida.rodada_id == rodada_id)
+                .order_by(Partida.id)
+                .yield_per(LOTE_BANCO)
+            )
+            serializar = selecao.serializador('partida', linhas=True)
+            partidas_serializadas = (serializar(row) for row in partidas)
+            return (partidas_serializadas if em_fluxo else list(partidas_serializadas)), None
         except Exception as e:
             return None, str(e)
 
+    @staticmethod
+    def _tags_cache(partida):
+        """Entidades cujas leituras em cache mudam junto com a partida (listagem da rodada e rankings)"""
+        return (('rodada', partida.rodada_id), ('temporada', partida.time_casa.temporada_id))
+
     @staticmethod
     def _serializar_partida(partida):
         """Serializa uma partida básica para dicionário"""
-        return {
-            'id': partida.id,
-            'rodada_id': partida.rodada_id,
-            'time_casa_id': partida.time_casa_id,
-            'time_fora_id': partida.time_fora_id,
-            'gols_casa': partida.gols_casa,
-            'gols_fora': partida.gols_fora,
-            'status': partida.status,
-            'inicio': partida.inicio.isoformat() if partida.inicio else None,
-            'fim': partida.fim.isoformat() if partida.fim else None
-        }
+        return serializar_partida(partida)
 
     @staticmethod
     def _serializar_partida_completa(partida):
         """Serializa uma partida completa com times e gols"""
-        gols = Gol.query.filter_by(partida_id=partida.id).order_by(Gol.minuto).all()
+        return serializador('partida', include=PartidaService.INCLUIR_COMPLETA)(partida)
+
+
+class TabelaService:
+    """Geração automática das partidas de uma rodada (todos contra todos, rei da quadra, mata-mata)"""
+
+    FORMATOS = ('todos_contra_todos', 'rei_da_quadra', 'mata_mata')
+
+    # Cada vaga de um plano é ('time', time_id) ou ('vencedor'|'perdedor', índice da partida no plano)
+
+    @staticmethod
+    def _planejar_todos_contra_todos(time_ids, turnos=1):
+        """Método do círculo: cada time enfrenta todos os outros uma vez por turno"""
+        times = list(time_ids)
+        if len(times) % 2:
+            times.append(None)  # folga
+        n = len(times)
+        plano = []
+        for turno in range(turnos):
+            rotacao = list(times)
+            for _ in range(n - 1):
+                for i in range(n // 2):
+                    casa, fora = rotacao[i], rotacao[n - 1 - i]
+                    if casa is None or fora is None:
+                        continue
+                    if turno % 2:
+                        casa, fora = fora, casa
+                    plano.append((('time', casa), ('time', fora)))
+                rotacao.insert(1, rotacao.pop())
+        return plano
+
+    @staticmethod
+    def _planejar_rei_da_quadra(time_ids, quantidade_partidas):
+        """Vencedor fica (mandante na próxima), perdedor volta para o fim da fila"""
+        fila = [('time', time_id) for time_id in time_ids[2:]]
+        plano = [(('time', time_ids[0]), ('time', time_ids[1]))]
+        while len(plano) < quantidade_partidas:
+            anterior = len(plano) - 1
+            fila.append(('perdedor', anterior))
+            plano.append((('vencedor', anterior), fila.pop(0)))
+        return plano
+
+    @staticmethod
+    def _planejar_mata_mata(time_ids):
+        """Chave eliminatória; se o número de times não for potência de 2, os primeiros recebem folga"""
+        tamanho_chave = 1
+        while tamanho_chave < len(time_ids):
+            tamanho_chave *= 2
+        folgas = tamanho_chave - len(time_ids)
+
+        fase = [('time', time_id) for time_id in time_ids[:folgas]]
+        plano = []
+        restantes = time_ids[folgas:]
+        for i in range(0, len(restantes), 2):
+            plano.append((('time', restantes[i]), ('time', restantes[i + 1])))
+            fase.append(('vencedor', len(plano) - 1))
+
+        while len(fase) > 1:
+            proxima_fase = []
+            for i in range(0, len(fase), 2):
+                plano.append((fase[i], fase[i + 1]))
+                proxima_fase.append(('vencedor', len(plano) - 1))
+            fase = proxima_fase
+        return plano
+
+    @staticmethod
+    def gerar_tabela(rodada_id, formato, time_ids=None, turnos=1, quantidade_partidas=None):
+        """
+        Gerar todas as partidas de uma rodada em uma única transação
+
+        Args:
+            formato: 'todos_contra_todos', 'rei_da_quadra' ou 'mata_mata'
+            time_ids: times participantes, na ordem de mando/chaveamento (padrão: todos da temporada)
+            turnos: repetições do todos contra todos (turno e returno invertem o mando)
+            quantidade_partidas: total de partidas no rei da quadra (padrão: uma por time)
+
+        Partidas cujas vagas dependem de resultados (mata-mata, rei da quadra) são criadas
+        sem times e preenchidas quando a partida de origem é finalizada; empate favorece o mandante.
+        """
+        try:
+            if formato not in TabelaService.FORMATOS:
+                return None, f'Formato inválido. Use: {", ".join(TabelaService.FORMATOS)}'
+
+            # Trava a rodada: duas gerações simultâneas não podem duplicar a tabela
+            rodada = Rodada.query.filter_by(id=int(rodada_id)).with_for_update().first()
+            if not rodada:
+                return None, 'Rodada não encontrada'
+
+            if db.session.query(Partida.id).filter_by(rodada_id=rodada.id).first():
+                return None, 'Rodada já possui partidas'
+
+            if time_ids:
+                time_ids = [int(time_id) for time_id in time_ids]
+                if len(set(time_ids)) != len(time_ids):
+                    return None, 'Times repetidos na lista'
+                encontrados = {
+                    time_id for (time_id,) in
+                    db.session.query(Time.id).filter(
+                        Time.id.in_(time_ids),
+                        Time.temporada_id == rodada.temporada_id
+                    )
+                }
+                if len(encontrados) != len(time_ids):
+                    return None, 'Os times devem pertencer à temporada da rodada'
+            else:
+                time_ids = [
+                    time_id for (time_id,) in
+                    db.session.query(Time.id).filter_by(temporada_id=rodada.temporada_id).order_by(Time.id)
+                ]
+
+            if len(time_ids) < 2:
+                return None, 'São necessários pelo menos 2 times'
+
+            if formato == 'todos_contra_todos':
+                turnos = int(turnos or 1)
+                if turnos < 1:
+                    return None, 'Turnos deve ser maior que zero'
+                plano = TabelaService._planejar_todos_contra_todos(time_ids, turnos)
+            elif formato == 'rei_da_quadra':
+                quantidade_partidas = int(quantidade_partidas or len(time_ids))
+                if quantidade_partidas < 1:
+                    return None, 'Quantidade de partidas deve ser maior que zero'
+                plano = TabelaService._planejar_rei_da_quadra(time_ids, quantidade_partidas)
+            else:
+                plano = TabelaService._planejar_mata_mata(time_ids)
+
+            def time_fixo(vaga):
+                return vaga[1] if vaga[0] == 'time' else None
+
+            db.session.execute(Partida.__table__.insert(), [
+                {
+                    'rodada_id': rodada.id,
+                    'time_casa_id': time_fixo(casa),
+                    'time_fora_id': time_fixo(fora),
+                    'gols_casa': 0,
+                    'gols_fora': 0,
+                    'status': 'agendada'
+                }
+                for casa, fora in plano
+            ])
+
+            # A rodada está travada e não tinha partidas: os ids em ordem correspondem ao plano
+            ids = [
+                partida_id for (partida_id,) in
+                db.session.query(Partida.id).filter_by(rodada_id=rodada.id).order_by(Partida.id)
+            ]
+
+            ligacoes = []
+            for partida_id, (casa, fora) in zip(ids, plano):
+                ligacao = {}
+                if casa[0] != 'time':
+                    ligacao['origem_casa_partida_id'] = ids[casa[1]]
+                    ligacao['origem_casa_resultado'] = casa[0]
+                if fora[0] != 'time':
+                    ligacao['origem_fora_partida_id'] = ids[fora[1]]
+                    ligacao['origem_fora_resultado'] = fora[0]
+                if ligacao:
+                    ligacoes.append({'id': partida_id, **ligacao})
+
+            # Ligações homogêneas por grupo de colunas para que cada grupo vá em um executemany
+            for colunas in (('origem_casa_partida_id', 'origem_casa_resultado'),
+                            ('origem_fora_partida_id', 'origem_fora_resultado')):
+                grupo = [
+                    {'id': ligacao['id'], **{c: ligacao[c] for c in colunas}}
+                    for ligacao in ligacoes if colunas[0] in ligacao
+                ]
+                if grupo:
+                    db.session.execute(update(Partida), grupo)
+
+            db.session.commit()
+            cache.invalidar(('rodada', rodada.id))
+
+            partidas = Partida.query.filter_by(rodada_id=rodada.id).order_by(Partida.id).all()
+            return {
+                'formato': formato,
+                'partidas': [PartidaService._serializar_partida(p) for p in partidas]
+            }, None
+        except (ValueError, TypeError):
+            db.session.rollback()
+            return None, 'Parâmetros inválidos'
+        except Exception as e:
+            db.session.rollback()
+            return None, str(e)
 
-        partida_data = PartidaService._serializar_partida(partida)
-        partida_data['time_casa'] = TimeService._serializar_time(partida.time_casa)
-        partida_data['time_fora'] = TimeService._serializar_time(partida.time_fora)
-        partida_data['gols'] = [GolService._serializar_gol(gol) for gol in gols]
+    @staticmethod
+    def promover_classificados(partida):
+        """Preenche as vagas que dependem do resultado da partida (sem commit)
 
-        return partida_data
+        Só altera partidas ainda agendadas, então uma correção de placar
+        depois do apito final também corrige o classificado.
+        """
+        if partida.status != 'finalizada':
+            return
+
+        if (partida.gols_casa or 0) >= (partida.gols_fora or 0):
+            vencedor, perdedor = partida.time_casa_id, partida.time_fora_id
+        else:
+            vencedor, perdedor = partida.time_fora_id, partida.time_casa_id
+        resultado = {'vencedor': vencedor, 'perdedor': perdedor}
+
+        destinos = Partida.query.filter(
+            or_(Partida.origem_casa_partida_id == partida.id, Partida.origem_fora_partida_id == partida.id),
+            Partida.status == 'agendada'
+        ).all()
+        for destino in destinos:
+            if destino.origem_casa_partida_id == partida.id:
+                destino.time_casa_id = resultado[destino.origem_casa_resultado]
+            if destino.origem_fora_partida_id == partida.id:
+                destino.time_fora_id = resultado[destino.origem_fora_resultado]
 
 
 class GolService:
     """Camada de serviço para lógica de negócios relacionada a gols"""
 
+    # Autor e assistente no mesmo SELECT do gol
+    CARGA = opcoes_carga(Gol, 'gol')
+
     @staticmethod
-    def registrar_gol(partida_id, time_id, jogador_id, minuto=None, gol_contra=False, assistencia_id=None):
-        """Registrar um gol"""
+    def registrar_gol(partida_id, time_id, jogador_id, minuto=None, gol_contra=False, assistencia_id=None,
+                      correcao=False):
+        """Registrar um gol
+
+        Args:
+            correcao: permite lançar o gol em partida já finalizada (correção de súmula)
+        """
         try:
             partida = Partida.query.get(int(partida_id))
             if not partida:
                 return None, 'Partida não encontrada'
 
-            if partida.status != 'em_andamento':
+            if not GolService._aceita_gols(partida, correcao):
                 return None, 'Partida não está em andamento'
 
             time = Time.query.get(int(time_id))
@@ -886,24 +1249,115 @@ class GolService:
             )
             db.session.add(novo_gol)
 
-            # Garantir que valores None sejam tratados como 0
-            if partida.time_casa_id == time_id:
-                if gol_contra:
-                    partida.gols_fora = (partida.gols_fora or 0) + 1
-                else:
-                    partida.gols_casa = (partida.gols_casa or 0) + 1
-            else:
-                if gol_contra:
-                    partida.gols_casa = (partida.gols_casa or 0) + 1
-                else:
-                    partida.gols_fora = (partida.gols_fora or 0) + 1
+            finalizada = partida.status == 'finalizada'
+            if finalizada:
+                ClassificacaoService.garantir_classificacao(partida)
+                ClassificacaoService.aplicar_resultado(partida, sinal=-1)
+
+            GolService._aplicar_placar(partida, time_id, gol_contra, 1)
 
+            if finalizada:
+                ClassificacaoService.aplicar_resultado(partida)
+                TabelaService.promover_classificados(partida)
+
+            tags = PartidaService._tags_cache(partida)
+            db.session.flush()
+            gol_id = novo_gol.id
             db.session.commit()
+            cache.invalidar(*tags)
+            GOLS_REGISTRADOS.inc()
+
+            novo_gol = Gol.query.options(*GolService.CARGA).filter_by(id=gol_id).one()
             return GolService._serializar_gol(novo_gol), None
         except Exception as e:
             db.session.rollback()
             return None, str(e)
 
+    @staticmethod
+    def registrar_gols_em_lote(partida_id, gols, correcao=False):
+        """Registrar vários gols de uma partida em uma única transação
+
+        Times e jogadores (autores e assistentes) são validados com um IN cada,
+        os gols são inseridos com um único executemany e o placar é ajustado uma vez.
+
+        Args:
+            gols: lista de dicts com time_id, jogador_id e, opcionalmente, minuto, gol_contra, assistencia_id
+            correcao: permite lançar os gols em partida já finalizada (correção de súmula)
+        """
+        try:
+            partida = Partida.query.get(int(partida_id))
+            if not partida:
+                return None, 'Partida não encontrada'
+
+            if not GolService._aceita_gols(partida, correcao):
+                return None, 'Partida não está em andamento'
+
+            if not gols or not isinstance(gols, list):
+                return None, 'Lista de gols é obrigatória'
+
+            linhas = []
+            for posicao, dados in enumerate(gols, 1):
+                if not isinstance(dados, dict) or not dados.get('time_id') or not dados.get('jogador_id'):
+                    return None, f'Gol {posicao}: ID do time e do jogador são obrigatórios'
+                try:
+                    linhas.append({
+                        'partida_id': partida.id,
+                        'time_id': int(dados['time_id']),
+                        'jogador_id': int(dados['jogador_id']),
+                        'assistencia_id': int(dados['assistencia_id']) if dados.get('assistencia_id') else None,
+                        'minuto': int(dados['minuto']) if dados.get('minuto') is not None else None,
+                        'gol_contra': bool(dados.get('gol_contra', False))
+                    })
+                except (ValueError, TypeError):
+                    return None, f'Gol {posicao}: dados inválidos'
+
+            time_ids = {linha['time_id'] for linha in linhas}
+            times_encontrados = {
+                time_id for (time_id,) in
+                db.session.query(Time.id).filter(Time.id.in_(time_ids))
+            }
+            if time_ids - times_encontrados:
+                return None, 'Time ou jogador não encontrado'
+
+            jogador_ids = {linha['jogador_id'] for linha in linhas}
+            jogador_ids.update(linha['assistencia_id'] for linha in linhas if linha['assistencia_id'])
+            jogadores_encontrados = {
+                jogador_id for (jogador_id,) in
+                db.session.query(Jogador.id).filter(Jogador.id.in_(jogador_ids))
+            }
+            faltando = jogador_ids - jogadores_encontrados
+            if faltando:
+                if any(linha['jogador_id'] in faltando for linha in linhas):
+                    return None, 'Time ou jogador não encontrado'
+                return None, 'Jogador que deu assistência não encontrado'
+
+            finalizada = partida.status == 'finalizada'
+            if finalizada:
+                ClassificacaoService.garantir_classificacao(partida)
+                ClassificacaoService.aplicar_resultado(partida, sinal=-1)
+
+            # Insert Core direto na tabela: um único executemany, mesmo com colunas nulas
+            db.session.execute(Gol.__table__.insert(), linhas)
+
+            for linha in linhas:
+                GolService._aplicar_placar(partida, linha['time_id'], linha['gol_contra'], 1)
+
+            if finalizada:
+                ClassificacaoService.aplicar_resultado(partida)
+                TabelaService.promover_classificados(partida)
+
+            tags = PartidaService._tags_cache(partida)
+            db.session.commit()
+            cache.invalidar(*tags)
+            GOLS_REGISTRADOS.inc(len(linhas))
+            return {
+                'gols_registrados': len(linhas),
+                'partida': PartidaService._serializar_partida(partida)
+            }, None
+        except Exception as e:
+            db.session.rollback()
+            return None, str(e)
+
     @staticmethod
     def remover_gol(gol_id):
         """Remover um gol"""
@@ -913,74 +1367,255 @@ class GolService:
                 return None, 'Gol não encontrado'
 
             partida = gol.partida
-            if partida.status == 'finalizada':
-                return None, 'Não é possível remover gol de partida finalizada'
-
-            # Garantir que valores None sejam tratados como 0
-            if partida.time_casa_id == gol.time_id:
-                if gol.gol_contra:
-                    partida.gols_fora = max((partida.gols_fora or 0) - 1, 0)
-                else:
-                    partida.gols_casa = max((partida.gols_casa or 0) - 1, 0)
-            else:
-                if gol.gol_contra:
-                    partida.gols_casa = max((partida.gols_casa or 0) - 1, 0)
-                else:
-                    partida.gols_fora = max((partida.gols_fora or 0) - 1, 0)
 
+            # Em partida finalizada, desfaz o resultado antigo e reaplica o novo na classificação
+            finalizada = partida.status == 'finalizada'
+            if finalizada:
+                ClassificacaoService.garantir_classificacao(partida)
+                ClassificacaoService.aplicar_resultado(partida, sinal=-1)
+
+            GolService._aplicar_placar(partida, gol.time_id, gol.gol_contra, -1)
+
+            if finalizada:
+                ClassificacaoService.aplicar_resultado(partida)
+                TabelaService.promover_classificados(partida)
+
+            tags = PartidaService._tags_cache(partida)
             db.session.delete(gol)
             db.session.commit()
+            cache.invalidar(*tags)
             return {'mensagem': 'Gol removido com sucesso'}, None
         except Exception as e:
             db.session.rollback()
             return None, str(e)
 
+    @staticmethod
+    def _aceita_gols(partida, correcao):
+        """Em andamento sempre; finalizada só quando pedida explicitamente a correção de súmula"""
+        return partida.status == 'em_andamento' or (correcao and partida.status == 'finalizada')
+
+    @staticmethod
+    def _aplicar_placar(partida, time_id, gol_contra, delta):
+        """Soma `delta` gols ao placar da partida (gol contra conta para o adversário)"""
+        # Garantir que valores None sejam tratados como 0
+        casa = int(partida.time_casa_id) == int(time_id)
+        if gol_contra:
+            casa = not casa
+        if casa:
+            partida.gols_casa = max((partida.gols_casa or 0) + delta, 0)
+        else:
+            partida.gols_fora = max((partida.gols_fora or 0) + delta, 0)
+
     @staticmethod
     def _serializar_gol(gol):
         """Serializa um gol para dicionário"""
+        return serializar_gol(gol)
+
+
+class ClassificacaoService:
+    """Camada de serviço para a classificação materializada (temporada, time)"""
+
+    CAMPOS = ('pontos', 'jogos', 'vitorias', 'empates', 'derrotas', 'gols_marcados', 'gols_sofridos')
+
+    @staticmethod
+    def _contribuicao(gols_pro, gols_contra):
+        """Contribuição de uma partida finalizada para a linha de um time"""
+        vitoria = 1 if gols_pro > gols_contra else 0
+        empate = 1 if gols_pro == gols_contra else 0
         return {
-            'id': gol.id,
-            'partida_id': gol.partida_id,
-            'time_id': gol.time_id,
-            'jogador': {
-                'id': gol.jogador.id,
-                'nome_completo': gol.jogador.nome_completo,
-                'apelido': gol.jogador.apelido,
-                'foto_url': gol.jogador.foto_url
-            },
-            'assistente': {
-                'id': gol.assistente.id,
-                'nome_completo': gol.assistente.nome_completo,
-                'apelido': gol.assistente.apelido,
-                'foto_url': gol.assistente.foto_url
-            } if gol.assistencia_id else None,
-            'minuto': gol.minuto,
-            'gol_contra': gol.gol_contra,
-            'criado_em': gol.criado_em.isoformat() if gol.criado_em else None
+            'pontos': 3 * vitoria + empate,
+            'jogos': 1,
+            'vitorias': vitoria,
+            'empates': empate,
+            'derrotas': 1 if gols_pro < gols_contra else 0,
+            'gols_marcados': gols_pro,
+            'gols_sofridos': gols_contra
         }
 
+    @staticmethod
+    def garantir_classificacao(partida):
+        """Cria a linha de classificação dos times da partida que ainda não a têm.
+
+        Só os dois times da partida, calculados a partir das partidas finalizadas; a
+        reconstrução da temporada inteira fica com `recalcular_classificacao`. Deve ser
+        chamado antes de alterar a partida, para que a linha reflita o estado anterior
+        e os deltas aplicados em seguida não sejam contados em dobro.
+        """
+        temporada_id = partida.time_casa.temporada_id
+        times = (partida.time_casa_id, partida.time_fora_id)
+        existentes = {
+            time_id for (time_id,) in db.session.query(Classificacao.time_id).filter(
+                Classificacao.temporada_id == temporada_id,
+                Classificacao.time_id.in_(times)
+            )
+        }
+        faltando = [time_id for time_id in times if time_id not in existentes]
+        if not faltando:
+            return
+
+        for registro in ClassificacaoService._agregar(temporada_id, faltando):
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(Classificacao), [registro])
+            except IntegrityError:
+                # Requisição concorrente criou a mesma linha: os deltas seguem sobre a dela
+                continue
+            Time.query.filter_by(id=registro['time_id']).update(
+                {c: registro[c] for c in ClassificacaoService.CAMPOS if c != 'jogos'},
+                synchronize_session=False
+            )
+
+    @staticmethod
+    def aplicar_resultado(partida, sinal=1):
+        """Aplica (sinal=1) ou desfaz (sinal=-1) o resultado de uma partida finalizada.
+
+        Atualiza a classificação e os contadores espelhados em `Time` com
+        `UPDATE ... SET campo = campo + delta`, sem commit (fica na transação do chamador).
+        """
+        temporada_id = partida.time_casa.temporada_id
+        gols_casa = partida.gols_casa or 0
+        gols_fora = partida.gols_fora or 0
+
+        deltas = (
+            (partida.time_casa_id, ClassificacaoService._contribuicao(gols_casa, gols_fora)),
+            (partida.time_fora_id, ClassificacaoService._contribuicao(gols_fora, gols_casa)),
+        )
+        for time_id, delta in deltas:
+            Classificacao.query.filter_by(temporada_id=temporada_id, time_id=time_id).update(
+                {getattr(Classificacao, campo): getattr(Classificacao, campo) + valor * sinal
+                 for campo, valor in delta.items()},
+                synchronize_session=False
+            )
+            Time.query.filter_by(id=time_id).update(
+                {getattr(Time, campo): func.coalesce(getattr(Time, campo), 0) + valor * sinal
+                 for campo, valor in delta.items() if campo != 'jogos'},
+                synchronize_session=False
+            )
+
+    @staticmethod
+    def _agregar(temporada_id, time_ids=None):
+        """Classificação da temporada (ou só de `time_ids`) a partir das partidas finalizadas (somente leitura)"""
+        eh_casa = Partida.time_casa_id == Time.id
+        gols_casa = func.coalesce(Partida.gols_casa, 0)
+        gols_fora = func.coalesce(Partida.gols_fora, 0)
+        gols_pro = case((eh_casa, gols_casa), else_=gols_fora)
+        gols_contra = case((eh_casa, gols_fora), else_=gols_casa)
+        jogou = Partida.id.isnot(None)
+
+        linhas = (
+            db.session.query(
+                Time.id.label('time_id'),
+                func.count(Partida.id).label('jogos'),
+                func.coalesce(func.sum(case((and_(jogou, gols_pro > gols_contra), 1), else_=0)), 0).label('vitorias'),
+                func.coalesce(func.sum(case((and_(jogou, gols_pro == gols_contra), 1), else_=0)), 0).label('empates'),
+                func.coalesce(func.sum(case((and_(jogou, gols_pro < gols_contra), 1), else_=0)), 0).label('derrotas'),
+                func.coalesce(func.sum(gols_pro), 0).label('gols_marcados'),
+                func.coalesce(func.sum(gols_contra), 0).label('gols_sofridos')
+            )
+            .outerjoin(Partida, and_(
+                or_(Partida.time_casa_id == Time.id, Partida.time_fora_id == Time.id),
+                Partida.status == 'finalizada'
+            ))
+            .filter(Time.temporada_id == temporada_id, *([Time.id.in_(time_ids)] if time_ids else []))
+            .group_by(Time.id)
+            .all()
+        )
+
+        registros = []
+        for linha in linhas:
+            registro = {
+                'temporada_id': temporada_id,
+                'time_id': linha.time_id,
+                'jogos': int(linha.jogos),
+                'vitorias': int(linha.vitorias),
+                'empates': int(linha.empates),
+                'derrotas': int(linha.derrotas),
+                'gols_marcados': int(linha.gols_marcados),
+                'gols_sofridos': int(linha.gols_sofridos)
+            }
+            registro['pontos'] = 3 * registro['vitorias'] + registro['empates']
+            registros.append(registro)
+        return registros
+
+    @staticmethod
+    def _reconstruir(temporada_id):
+        """Recalcula a classificação da temporada a partir das partidas finalizadas (sem commit)"""
+        registros = ClassificacaoService._agregar(temporada_id)
+        Classificacao.query.filter_by(temporada_id=temporada_id).delete(synchronize_session=False)
+        if registros:
+            db.session.execute(insert(Classificacao), registros)
+            db.session.execute(update(Time), [
+                {'id': r['time_id'], **{c: r[c] for c in ClassificacaoService.CAMPOS if c != 'jogos'}}
+                for r in registros
+            ])
+        return registros
+
+    @staticmethod
+    def _linhas_ordenadas(temporada_id):
+        """(Classificacao | None, Time) de cada time da temporada, na ordem de classificação"""
+        return (
+            db.session.query(Classificacao, Time)
+            .select_from(Time)
+            .outerjoin(Classificacao, and_(
+                Classificacao.time_id == Time.id,
+                Classificacao.temporada_id == Time.temporada_id
+            ))
+            .filter(Time.temporada_id == temporada_id)
+            .order_by(
+                desc(Classificacao.pontos),
+                desc(Classificacao.vitorias),
+                desc(Classificacao.gols_marcados),
+                Classificacao.gols_sofridos,
+                Time.id
+            )
+            .all()
+        )
+
+    @staticmethod
+    def recalcular_classificacao(temporada_id):
+        """Reconstrói a classificação da temporada com um único GROUP BY sobre as partidas"""
+        try:
+            temporada = Temporada.query.get(int(temporada_id))
+            if not temporada:
+                return None, 'Temporada não encontrada'
+
+            ClassificacaoService._reconstruir(temporada.id)
+            db.session.commit()
+            cache.invalidar(('temporada', temporada.id))
+            return RankingService.ranking_times_temporada(temporada.id)
+        except (ValueError, TypeError):
+            db.session.rollback()
+            return None, 'ID de temporada inválido'
+        except Exception as e:
+            db.session.rollback()
+            return None, str(e)
+
 
 class RankingService:
     """Camada de serviço para rankings e estatísticas"""
 
     @staticmethod
-    def ranking_times_temporada(temporada_id):
+    def ranking_times_temporada(temporada_id, em_fluxo=False):
         """Ranking de times por pontos na temporada"""
         try:
             temporada = Temporada.query.get(int(temporada_id))
             if not temporada:
                 return None, 'Temporada não encontrada'
 
-            # Buscar times da temporada e ordenar por critérios de classificação
-            times = Time.query.filter_by(temporada_id=temporada_id).order_by(
-                desc(Time.pontos),
-                desc(Time.vitorias),
-                desc(Time.gols_marcados),
-                Time.gols_sofridos
-            ).all()
+            # Leitura direta da classificação materializada (índice temporada_id, pontos, ...)
+            linhas = ClassificacaoService._linhas_ordenadas(temporada.id)
+            if any(classificacao is None for classificacao, _ in linhas):
+                # Linhas faltando (a migração e a criação de times as preenchem; só o recalcular grava):
+                # agrega das partidas em memória, sem escrever numa rota de leitura
+                agregado = {r['time_id']: SimpleNamespace(**r) for r in ClassificacaoService._agregar(temporada.id)}
+                linhas = sorted(
+                    ((agregado[time.id], time) for _, time in linhas),
+                    key=lambda par: (-par[0].pontos, -par[0].vitorias, -par[0].gols_marcados,
+                                     par[0].gols_sofridos, par[1].id)
+                )
 
             ranking = []
-            for posicao, time in enumerate(times, 1):
+            for posicao, (classificacao, time) in enumerate(linhas, 1):
                 ranking.append({
                     'posicao': posicao,
                     'time': {
@@ -988,48 +1623,58 @@ class RankingService:
                         'nome': time.nome,
                         'cor': time.cor,
                         'escudo_url': time.escudo_url,
-                        'pontos': time.pontos or 0,
-                        'vitorias': time.vitorias or 0,
-                        'empates': time.empates or 0,
-                        'derrotas': time.derrotas or 0,
-                        'gols_marcados': time.gols_marcados or 0,
-                        'gols_sofridos': time.gols_sofridos or 0,
-                        'saldo_gols': (time.gols_marcados or 0) - (time.gols_sofridos or 0),
-                        'jogos': (time.vitorias or 0) + (time.empates or 0) + (time.derrotas or 0)
+                        'escudo_variantes': variantes(time.escudo_url),
+                        'pontos': classificacao.pontos,
+                        'vitorias': classificacao.vitorias,
+                        'empates': classificacao.empates,
+                        'derrotas': classificacao.derrotas,
+                        'gols_marcados': classificacao.gols_marcados,
+                        'gols_sofridos': classificacao.gols_sofridos,
+                        'saldo_gols': classificacao.gols_marcados - classificacao.gols_sofridos,
+                        'jogos': classificacao.jogos
                     }
                 })
 
-            return ranking, None
+            # Um item por time: a lista já é pequena, o fluxo só adianta o primeiro byte
+            return (iter(ranking) if em_fluxo else ranking), None
         except Exception as e:
+            db.session.rollback()
             return None, str(e)
 
     @staticmethod
-    def ranking_artilheiros_temporada(temporada_id, limit=10):
+    def _gols_da_temporada(query, temporada_id):
+        """Restringe uma consulta sobre `Gol` às partidas da temporada (gols→partidas→rodadas)"""
+        return (
+            query
+            .join(Partida, Gol.partida_id == Partida.id)
+            .join(Rodada, Partida.rodada_id == Rodada.id)
+            .filter(Rodada.temporada_id == temporada_id)
+        )
+
+    @staticmethod
+    def ranking_artilheiros_temporada(temporada_id, limit=10, em_fluxo=False):
         """Ranking de artilheiros na temporada"""
         try:
             temporada = Temporada.query.get(int(temporada_id))
             if not temporada:
                 return None, 'Temporada não encontrada'
 
-            rodadas = Rodada.query.filter_by(temporada_id=temporada_id).all()
-            rodada_ids = [r.id for r in rodadas]
-
-            partidas = Partida.query.filter(Partida.rodada_id.in_(rodada_ids)).all()
-            partida_ids = [p.id for p in partidas]
-
-            artilheiros = db.session.query(
-                Jogador.id,
-                Jogador.nome_completo,
-                Jogador.apelido,
-                func.count(Gol.id).label('total_gols')
-            ).join(Gol, Gol.jogador_id == Jogador.id).filter(
-                Gol.partida_id.in_(partida_ids),
-                Gol.gol_contra == False
-            ).group_by(Jogador.id).order_by(desc('total_gols')).limit(limit).all()
-
-            ranking = []
-            for posicao, artilheiro in enumerate(artilheiros, 1):
-                ranking.append({
+            artilheiros = RankingService._gols_da_temporada(
+                db.session.query(
+                    Jogador.id,
+                    Jogador.nome_completo,
+                    Jogador.apelido,
+                    func.count(Gol.id).label('total_gols')
+                ).join(Gol, Gol.jogador_id == Jogador.id),
+                temporada.id
+            ).filter(
+                Gol.gol_contra == False  # noqa: E712
+            ).group_by(
+                Jogador.id, Jogador.nome_completo, Jogador.apelido
+            ).order_by(desc('total_gols')).limit(limit).yield_per(LOTE_BANCO)
+
+            ranking = (
+                {
                     'posicao': posicao,
                     'jogador': {
                         'id': artilheiro.id,
@@ -1037,39 +1682,36 @@ class RankingService:
                         'apelido': artilheiro.apelido,
                         'total_gols': artilheiro.total_gols
                     }
-                })
+                }
+                for posicao, artilheiro in enumerate(artilheiros, 1)
+            )
 
-            return ranking, None
+            return (ranking if em_fluxo else list(ranking)), None
         except Exception as e:
             return None, str(e)
 
     @staticmethod
-    def ranking_assistencias_temporada(temporada_id, limit=10):
+    def ranking_assistencias_temporada(temporada_id, limit=10, em_fluxo=False):
         """Ranking de assistências na temporada"""
         try:
             temporada = Temporada.query.get(int(temporada_id))
             if not temporada:
                 return None, 'Temporada não encontrada'
 
-            rodadas = Rodada.query.filter_by(temporada_id=temporada_id).all()
-            rodada_ids = [r.id for r in rodadas]
-
-            partidas = Partida.query.filter(Partida.rodada_id.in_(rodada_ids)).all()
-            partida_ids = [p.id for p in partidas]
-
-            assistentes = db.session.query(
-                Jogador.id,
-                Jogador.nome_completo,
-                Jogador.apelido,
-                func.count(Gol.id).label('total_assistencias')
-            ).join(Gol, Gol.assistencia_id == Jogador.id).filter(
-                Gol.partida_id.in_(partida_ids),
-                Gol.assistencia_id.isnot(None)
-            ).group_by(Jogador.id).order_by(desc('total_assistencias')).limit(limit).all()
-
-            ranking = []
-            for posicao, assistente in enumerate(assistentes, 1):
-                ranking.append({
+            assistentes = RankingService._gols_da_temporada(
+                db.session.query(
+                    Jogador.id,
+                    Jogador.nome_completo,
+                    Jogador.apelido,
+                    func.count(Gol.id).label('total_assistencias')
+                ).join(Gol, Gol.assistencia_id == Jogador.id),
+                temporada.id
+            ).group_by(
+                Jogador.id, Jogador.nome_completo, Jogador.apelido
+            ).order_by(desc('total_assistencias')).limit(limit).yield_per(LOTE_BANCO)
+
+            ranking = (
+                {
                     'posicao': posicao,
                     'jogador': {
                         'id': assistente.id,
@@ -1077,12 +1719,272 @@ class RankingService:
                         'apelido': assistente.apelido,
                         'total_assistencias': assistente.total_assistencias
                     }
-                })
+                }
+                for posicao, assistente in enumerate(assistentes, 1)
+            )
 
-            return ranking, None
+            return (ranking if em_fluxo else list(ranking)), None
         except Exception as e:
             return None, str(e)
 
+    @staticmethod
+    def ranking_jogadores_temporada(temporada_id, limit=None, em_fluxo=False):
+        """Gols, assistências e gols contra por jogador na temporada, em uma única agregação"""
+        try:
+            temporada = Temporada.query.get(int(temporada_id))
+            if not temporada:
+                return None, 'Temporada não encontrada'
+
+            # Cada gol casa com o autor e com o assistente; o CASE decide o que contar para cada um
+            autor = Gol.jogador_id == Jogador.id
+            total_gols = func.sum(case((and_(autor, Gol.gol_contra == False), 1), else_=0))  # noqa: E712
+            total_assistencias = func.sum(case((Gol.assistencia_id == Jogador.id, 1), else_=0))
+            total_gols_contra = func.sum(case((and_(autor, Gol.gol_contra == True), 1), else_=0))  # noqa: E712
+
+            query = RankingService._gols_da_temporada(
+                db.session.query(
+                    Jogador.id,
+                    Jogador.nome_completo,
+                    Jogador.apelido,
+                    Jogador.foto_url,
+                    total_gols.label('total_gols'),
+                    total_assistencias.label('total_assistencias'),
+                    total_gols_contra.label('total_gols_contra')
+                ).join(Gol, or_(Gol.jogador_id == Jogador.id, Gol.assistencia_id == Jogador.id)),
+                temporada.id
+            ).group_by(
+                Jogador.id, Jogador.nome_completo, Jogador.apelido, Jogador.foto_url
+            ).order_by(
+                desc('total_gols'), desc('total_assistencias'), Jogador.nome_completo.asc()
+            )
+            if limit:
+                query = query.limit(limit)
+
+            ranking = (
+                {
+                    'posicao': posicao,
+                    'jogador': {
+                        'id': linha.id,
+                        'nome_completo': linha.nome_completo,
+                        'apelido': linha.apelido,
+                        'foto_url': linha.foto_url,
+                        'foto_variantes': variantes(linha.foto_url),
+                        'total_gols': int(linha.total_gols or 0),
+                        'total_assistencias': int(linha.total_assistencias or 0),
+                        'total_gols_contra': int(linha.total_gols_contra or 0)
+                    }
+                }
+                for posicao, linha in enumerate(query.yield_per(LOTE_BANCO), 1)
+            )
+
+            return (ranking if em_fluxo else list(ranking)), None
+        except Exception as e:
+            return None, str(e)
+
+
+class BalanceamentoService:
+    """Sorteio equilibrado de times a partir das estatísticas da temporada"""
+
+    # Peso de cada estatística na força do jogador
+    PESOS = {'gols': 3.0, 'assistencias': 2.0, 'pontos_votos': 1.0}
+    MAX_ITERACOES = 200
+
+    @staticmethod
+    def _forcas(temporada_id, jogador_ids):
+        """Força de cada jogador em uma única consulta (gols, assistências e pontos de votação agregados no banco)"""
+        gols = (
+            RankingService._gols_da_temporada(
+                db.session.query(Gol.jogador_id.label('jogador_id'), func.count(Gol.id).label('total')),
+                temporada_id
+            )
+            .filter(Gol.gol_contra.is_(False), Gol.jogador_id.in_(jogador_ids))
+            .group_by(Gol.jogador_id)
+            .subquery()
+        )
+        assistencias = (
+            RankingService._gols_da_temporada(
+                db.session.query(Gol.assistencia_id.label('jogador_id'), func.count(Gol.id).label('total')),
+                temporada_id
+            )
+            .filter(Gol.assistencia_id.in_(jogador_ids))
+            .group_by(Gol.assistencia_id)
+            .subquery()
+        )
+        votos = (
+            db.session.query(Voto.jogador_votado_id.label('jogador_id'), func.sum(Voto.pontos).label('total'))
+            .join(Votacao, Voto.votacao_id == Votacao.id)
+            .join(Rodada, Votacao.rodada_id == Rodada.id)
+            .filter(Rodada.temporada_id == temporada_id, Voto.jogador_votado_id.in_(jogador_ids))
+            .group_by(Voto.jogador_votado_id)
+            .subquery()
+        )
+
+        pesos = BalanceamentoService.PESOS
+        linhas = (
+            db.session.query(
+                Jogador.id,
+                func.coalesce(gols.c.total, 0),
+                func.coalesce(assistencias.c.total, 0),
+                func.coalesce(votos.c.total, 0)
+            )
+            .outerjoin(gols, gols.c.jogador_id == Jogador.id)
+            .outerjoin(assistencias, assistencias.c.jogador_id == Jogador.id)
+            .outerjoin(votos, votos.c.jogador_id == Jogador.id)
+            .filter(Jogador.id.in_(jogador_ids))
+        )
+        return {
+            jogador_id: (
+                float(total_gols) * pesos['gols']
+                + float(total_assistencias) * pesos['assistencias']
+                + float(total_votos) * pesos['pontos_votos']
+            )
+            for jogador_id, total_gols, total_assistencias, total_votos in linhas
+        }
+
+    @staticmethod
+    def _dividir(forcas, quantidade_times):
+        """
+        Particiona os jogadores em times de tamanhos iguais (±1) com forças próximas
+
+        Guloso (mais forte vai para o time mais fraco com vaga) seguido de busca local
+        por trocas que reduzem a soma dos quadrados dos desvios das forças dos times.
+        """
+        ordenados = sorted(forcas, key=lambda jogador_id: (-forcas[jogador_id], jogador_id))
+        base, sobra = divmod(len(ordenados), quantidade_times)
+        vagas = [base + (1 if i < sobra else 0) for i in range(quantidade_times)]
+
+        times = [[] for _ in range(quantidade_times)]
+        totais = [0.0] * quantidade_times
+        for jogador_id in ordenados:
+            i = min(
+                (i for i in range(quantidade_times) if len(times[i]) < vagas[i]),
+                key=lambda i: (totais[i], len(times[i]), i)
+            )
+            times[i].append(jogador_id)
+            totais[i] += forcas[jogador_id]
+
+        # Trocar a com b entre os times i e j muda (totais[i] - totais[j]) em 2 * (forca_b - forca_a);
+        # a melhor troca do par é a que deixa essa diferença mais perto de zero
+        for _ in range(BalanceamentoService.MAX_ITERACOES):
+            melhor = None
+            for i in range(quantidade_times):
+                for j in range(i + 1, quantidade_times):
+                    diferenca = totais[i] - totais[j]
+                    if not diferenca:
+                        continue
+                    for a in times[i]:
+                        for b in times[j]:
+                            delta = forcas[a] - forcas[b]
+                            ganho = diferenca ** 2 - (diferenca - 2 * delta) ** 2
+                            if ganho > 1e-9 and (melhor is None or ganho > melhor[0]):
+                                melhor = (ganho, i, j, a, b, delta)
+            if melhor is None:
+                break
+            _, i, j, a, b, delta = melhor
+            times[i][times[i].index(a)] = b
+            times[j][times[j].index(b)] = a
+            totais[i] -= delta
+            totais[j] += delta
+
+        return times, totais
+
+    @staticmethod
+    def sortear_times(rodada_id, jogador_ids, time_ids=None, substituir=False):
+        """
+        Distribuir os jogadores presentes entre os times da rodada de forma equilibrada
+
+        Args:
+            jogador_ids: jogadores presentes na rodada
+            time_ids: times que receberão jogadores (padrão: os `quantidade_times` primeiros da temporada)
+            substituir: remove os elencos atuais desses times antes de gravar o sorteio
+
+        Cada time recebe no máximo `jogadores_por_time` jogadores; o mais forte de cada time é o capitão.
+        """
+        try:
+            rodada = Rodada.query.get(int(rodada_id))
+            if not rodada:
+                return None, 'Rodada não encontrada'
+
+            jogador_ids = [int(jogador_id) for jogador_id in jogador_ids or []]
+            if len(set(jogador_ids)) != len(jogador_ids):
+                return None, 'Jogadores repetidos na lista'
+
+            temporada = rodada.temporada
+            encontrados = {
+                jogador_id for (jogador_id,) in
+                db.session.query(Jogador.id).filter(
+                    Jogador.id.in_(jogador_ids),
+                    Jogador.pelada_id == temporada.pelada_id,
+                    Jogador.ativo.is_(True)
+                )
+            }
+            if len(encontrados) != len(jogador_ids):
+                return None, 'Todos os jogadores devem estar ativos e pertencer à pelada'
+
+            if time_ids:
+                time_ids = [int(time_id) for time_id in time_ids]
+                if len(set(time_ids)) != len(time_ids):
+                    return None, 'Times repetidos na lista'
+                times_encontrados = {
+                    time_id for (time_id,) in
+                    db.session.query(Time.id).filter(Time.id.in_(time_ids), Time.temporada_id == temporada.id)
+                }
+                if len(times_encontrados) != len(time_ids):
+                    return None, 'Os times devem pertencer à temporada da rodada'
+            else:
+                time_ids = [
+                    time_id for (time_id,) in
+                    db.session.query(Time.id).filter_by(temporada_id=temporada.id)
+                    .order_by(Time.id).limit(rodada.quantidade_times)
+                ]
+
+            if len(time_ids) < 2:
+                return None, 'São necessários pelo menos 2 times'
+            if len(jogador_ids) < len(time_ids):
+                return None, 'Jogadores insuficientes para a quantidade de times'
+            if len(jogador_ids) > len(time_ids) * rodada.jogadores_por_time:
+                return None, f'No máximo {len(time_ids) * rodada.jogadores_por_time} jogadores para {len(time_ids)} times'
+
+            ocupados = TimeJogador.query.filter(TimeJogador.time_id.in_(time_ids))
+            if substituir:
+                ocupados.delete(synchronize_session=False)
+            elif ocupados.first():
+                return None, 'Times já possuem jogadores. Use substituir para refazer os elencos'
+
+            forcas = BalanceamentoService._forcas(temporada.id, jogador_ids)
+            divisao, totais = BalanceamentoService._dividir(forcas, len(time_ids))
+
+            linhas = []
+            for time_id, elenco in zip(time_ids, divisao):
+                capitao = max(elenco, key=lambda jogador_id: (forcas[jogador_id], -jogador_id))
+                linhas.extend(
+                    {'time_id': time_id, 'jogador_id': jogador_id, 'capitao': jogador_id == capitao, 'posicao': None}
+                    for jogador_id in elenco
+                )
+            db.session.execute(TimeJogador.__table__.insert(), linhas)
+            db.session.commit()
+
+            return {
+                'times': [
+                    {
+                        'time_id': time_id,
+                        'forca': round(total, 2),
+                        'jogadores': [
+                            {'id': jogador_id, 'forca': round(forcas[jogador_id], 2)}
+                            for jogador_id in elenco
+                        ]
+                    }
+                    for time_id, elenco, total in zip(time_ids, divisao, totais)
+                ],
+                'diferenca_maxima': round(max(totais) - min(totais), 2)
+            }, None
+        except (ValueError, TypeError):
+            db.session.rollback()
+            return None, 'Parâmetros inválidos'
+        except Exception as e:
+            db.session.rollback()
+            return None, str(e)
+
 
 class VotacaoService:
     """Camada de serviço para lógica de negócios relacionada a votações"""
@@ -1162,6 +2064,8 @@ class VotacaoService:
 
             db.session.add(nova_votacao)
             db.session.commit()
+            if nova_votacao.status != 'fechada':
+                VotacaoService._agendar_fechamento(nova_votacao)
             return VotacaoService._serializar_votacao(nova_votacao), None
         except Exception as e:
             db.session.rollback()
@@ -1182,12 +2086,14 @@ class VotacaoService:
                 if votacao.status != 'fechada':
                     votacao.status = 'fechada'
                     db.session.commit()
+                    cache.invalidar(('votacao', votacao.id))
                 return None, 'Votação já foi encerrada'
 
             # Dentro da janela de tempo: garantir status "aberta"
             if votacao.status != 'aberta':
                 votacao.status = 'aberta'
                 db.session.commit()
+                cache.invalidar(('votacao', votacao.id))
 
             # Permitir até 3 votos por jogador (ex: 3-2-1), em vez de travar no primeiro voto
             votos_do_votante = Voto.query.filter_by(
@@ -1214,6 +2120,8 @@ class VotacaoService:
             )
             db.session.add(novo_voto)
             db.session.commit()
+            cache.invalidar(('votacao', novo_voto.votacao_id))
+            VOTOS_REGISTRADOS.inc()
             return VotacaoService._serializar_voto(novo_voto), None
         except Exception as e:
             db.session.rollback()
@@ -1271,19 +2179,20 @@ class VotacaoService:
             return None, str(e)
 
     @staticmethod
-    def listar_votacoes_rodada(rodada_id, tipo=None):
+    def listar_votacoes_rodada(rodada_id, tipo=None, selecao=SELECAO_PADRAO):
         """Lista todas as votações da rodada (sem resultados agregados)"""
         try:
             rodada = Rodada.query.get(int(rodada_id))
             if not rodada:
                 return None, 'Rodada não encontrada'
 
-            query = Votacao.query.filter_by(rodada_id=rodada_id)
+            query = Votacao.query.options(*selecao.opcoes(Votacao, 'votacao')).filter_by(rodada_id=rodada_id)
             if tipo:
                 query = query.filter_by(tipo=tipo)
 
             votacoes = query.order_by(Votacao.id.desc()).all()
-            saida = [VotacaoService._serializar_votacao(v) for v in votacoes]
+            serializar = selecao.serializador('votacao')
+            saida = [serializar(v) for v in votacoes]
 
             return {
                 'rodada_id': rodada.id,
@@ -1325,17 +2234,52 @@ class VotacaoService:
             return None, str(e)
 
     @staticmethod
-    def obter_votacao(votacao_id):
+    def obter_votacao(votacao_id, selecao=SELECAO_PADRAO):
         """Obtém uma votação por ID"""
+        try:
+            votacao = Votacao.query.options(*selecao.opcoes(Votacao, 'votacao')).get(int(votacao_id))
+            if not votacao:
+                return None, 'Votação não encontrada'
+
+            return selecao.serializador('votacao')(votacao), None
+        except (ValueError, TypeError):
+            return None, 'ID de votação inválido'
+        except Exception as e:
+            return None, str(e)
+
+    @staticmethod
+    def _agendar_fechamento(votacao):
+        """Job que fecha a votação no horário de `fecha_em` (a chave inclui o horário: mudar a data agenda outro)"""
+        from source.domain.jobs.services import JobService
+
+        try:
+            JobService.enfileirar(
+                'votacao.fechar',
+                {'votacao_id': votacao.id},
+                chave_idempotencia=f'votacao.fechar:{votacao.id}:{votacao.fecha_em:%Y%m%d%H%M%S}',
+                executar_em=votacao.fecha_em
+            )
+        except Exception:
+            # Sem o job, o fechamento continua acontecendo no primeiro voto após `fecha_em`
+            db.session.rollback()
+
+    @staticmethod
+    def fechar_votacao_expirada(votacao_id):
+        """Marca como 'fechada' uma votação cujo `fecha_em` já passou (sem efeito nos demais casos)"""
         try:
             votacao = Votacao.query.get(int(votacao_id))
             if not votacao:
                 return None, 'Votação não encontrada'
 
+            if votacao.status not in ('fechada', 'encerrada') and votacao.fecha_em <= VotacaoService._agora_br_naive():
+                votacao.status = 'fechada'
+                db.session.commit()
+                cache.invalidar(('votacao', votacao.id))
             return VotacaoService._serializar_votacao(votacao), None
         except (ValueError, TypeError):
             return None, 'ID de votação inválido'
         except Exception as e:
+            db.session.rollback()
             return None, str(e)
 
     @staticmethod
@@ -1351,6 +2295,7 @@ class VotacaoService:
             votacao.fecha_em = agora
 
             db.session.commit()
+            cache.invalidar(('votacao', votacao.id))
             return VotacaoService._serializar_votacao(votacao), None
         except (ValueError, TypeError):
             return None, 'ID de votação inválido'
@@ -1361,23 +2306,9 @@ class VotacaoService:
     @staticmethod
     def _serializar_votacao(votacao):
         """Serializa uma votação para dicionário"""
-        return {
-            'id': votacao.id,
-            'rodada_id': votacao.rodada_id,
-            'abre_em': votacao.abre_em.isoformat() if votacao.abre_em else None,
-            'fecha_em': votacao.fecha_em.isoformat() if votacao.fecha_em else None,
-            'tipo': votacao.tipo,
-            'status': votacao.status
-        }
+        return serializar_votacao(votacao)
 
     @staticmethod
     def _serializar_voto(voto):
         """Serializa um voto para dicionário"""
-        return {
-            'id': voto.id,
-            'votacao_id': voto.votacao_id,
-            'jogador_votante_id': voto.jogador_votante_id,
-            'jogador_votado_id': voto.jogador_votado_id,
-            'pontos': voto.pontos,
-            'criado_em': voto.criado_em.isoformat() if voto.criado_em else None
-        }
+        return serializar_voto(voto)
\ No newline at end of file
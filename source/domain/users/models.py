@@ -43,7 +43,7 @@ class User(db.Model):
             'email': self.email,
             'status': self.status,
             'tipo_usuario': self.tipo_usuario,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
@@ -2,7 +2,8 @@
 from source.extensions.extensios import db
 from source.domain.users.models import User
 from source.utils.pagination import paginate
-from flask_jwt_extended import create_access_token, create_refresh_token
+from flask import current_app, g, has_request_context
+from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt, get_jwt_identity
 
 
 class UserService:
@@ -61,7 +62,10 @@ class UserService:
             return None, 'Credenciais inválidas'
 
         # Criar tokens JWT - CORREÇÃO: Converter user.id para string
-        token_acesso = create_access_token(identity=str(usuario.id))
+        token_acesso = create_access_token(
+            identity=str(usuario.id),
+            additional_claims=UserService._claims_adicionais(usuario)
+        )
         token_atualizacao = create_refresh_token(identity=str(usuario.id))
 
         return {
@@ -82,9 +86,7 @@ class UserService:
             tuple: (dicionario_usuario, mensagem_erro)
         """
         try:
-            # Converter para int se for uma string
-            id_usuario = int(id_usuario)
-            usuario = User.query.get(id_usuario)
+            usuario = UserService._carregar_usuario(id_usuario)
 
             if not usuario:
                 return None, 'Usuário não encontrado'
@@ -107,19 +109,85 @@ class UserService:
         """
         try:
             # Verificar se o usuário existe
-            id_usuario = int(id_usuario)
-            usuario = User.query.get(id_usuario)
+            usuario = UserService._carregar_usuario(id_usuario)
 
             if not usuario:
                 return None, 'Usuário não encontrado'
 
-            token_acesso = create_access_token(identity=str(id_usuario))
+            token_acesso = create_access_token(
+                identity=str(usuario.id),
+                additional_claims=UserService._claims_adicionais(usuario)
+            )
             return {'token_acesso': token_acesso}, None
         except (ValueError, TypeError):
             return None, 'ID de usuário inválido'
         
     
         
+    @staticmethod
+    def _carregar_usuario(id_usuario):
+        """
+        Carrega um usuário pelo ID no máximo uma vez por requisição
+
+        O objeto fica em `g` e é compartilhado entre decoradores, handlers e serviços.
+
+        Args:
+            id_usuario: ID do usuário (pode ser string ou int)
+
+        Returns:
+            User ou None
+
+        Raises:
+            ValueError, TypeError: Se o ID for inválido
+        """
+        id_usuario = int(id_usuario)
+        if not has_request_context():
+            return User.query.get(id_usuario)
+
+        usuarios = g.setdefault('_usuarios_carregados', {})
+        if id_usuario not in usuarios:
+            usuarios[id_usuario] = User.query.get(id_usuario)
+        return usuarios[id_usuario]
+
+    @staticmethod
+    def obter_usuario_atual():
+        """
+        Obter o usuário autenticado da requisição (identidade do JWT)
+
+        Returns:
+            User ou None
+        """
+        try:
+            return UserService._carregar_usuario(get_jwt_identity())
+        except (ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def obter_tipo_usuario_atual():
+        """
+        Obter o tipo do usuário autenticado
+
+        Com JWT_TIPO_USUARIO_CLAIM ativo, lê o claim `tipo_usuario` do token de acesso
+        sem consultar o banco (mudanças de tipo só valem no próximo token).
+
+        Returns:
+            str ou None se o usuário não existir
+        """
+        if current_app.config.get('JWT_TIPO_USUARIO_CLAIM'):
+            tipo = get_jwt().get('tipo_usuario')
+            if tipo:
+                return tipo
+
+        usuario = UserService.obter_usuario_atual()
+        return usuario.tipo_usuario if usuario else None
+
+    @staticmethod
+    def _claims_adicionais(usuario):
+        """Claims extras do token de acesso (apenas com JWT_TIPO_USUARIO_CLAIM ativo)"""
+        if current_app.config.get('JWT_TIPO_USUARIO_CLAIM'):
+            return {'tipo_usuario': usuario.tipo_usuario}
+        return {}
+
     @staticmethod
     def _serializar_usuario(usuario):
         """
@@ -137,18 +205,20 @@ class UserService:
             'email': usuario.email,
             'status': usuario.status,
             'tipo_usuario': usuario.tipo_usuario,
-            'created_at': usuario.created_at.isoformat() if usuario.created_at else None,
-            'updated_at': usuario.updated_at.isoformat() if usuario.updated_at else None
+            'created_at': usuario.created_at,
+            'updated_at': usuario.updated_at
         }
 
     @staticmethod
-    def listar_todos_usuarios(page=1, per_page=10):
+    def listar_todos_usuarios(page=1, per_page=10, cursor=None, include_total=True):
         """
         Listar todos os usuários com paginação
 
         Args:
             page: Número da página (padrão: 1)
             per_page: Itens por página (padrão: 10)
+            cursor: paginação por cursor ('' para a primeira página)
+            include_total: False pula a contagem total
 
         Returns:
             tuple: (dicionario_resposta_paginada, mensagem_erro)
@@ -157,7 +227,7 @@ class UserService:
             query = User.query
 
             # Aplicar paginação padronizada
-            resultado_paginado = paginate(query, page, per_page)
+            resultado_paginado = paginate(query, page, per_page, cursor, include_total, contagem='estimada')
 
             # Serializar usuários
             usuarios_serializados = [
@@ -1,7 +1,15 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
+from source.utils.cache import CacheRespostas
+from source.utils.instrumentation import InstrumentacaoSQL
+from source.utils.metrics import Metricas
+from source.utils.storage import ArmazenamentoArquivos
 
 db = SQLAlchemy()
 migrate = Migrate()
 jwt = JWTManager()
+cache = CacheRespostas()
+instrumentacao = InstrumentacaoSQL()
+metricas = Metricas()
+armazenamento = ArmazenamentoArquivos()
@@ -0,0 +1,212 @@
+"""
+Cache de respostas para rotas de leitura com invalidação dirigida por escrita.
+
+Cada resposta é guardada sob uma chave formada por rota + parâmetros + a versão
+atual de cada entidade marcada (ex: ('temporada', 3)). As escritas chamam
+`cache.invalidar(('temporada', 3))`, que troca a versão da entidade: as entradas
+antigas deixam de ser alcançáveis e saem pelo TTL/LRU.
+
+Backends:
+    - 'redis': compartilhado entre processos (requer o pacote `redis`). É o único
+      suportado: as invalidações vêm dos workers da API e do worker.py, e todos
+      precisam enxergar as mesmas versões
+    - 'nenhum': desliga o cache (padrão)
+
+`BackendLRU` continua disponível para caches locais de dados imutáveis (ex.:
+entidade -> pelada nos decoradores de escopo), não para respostas.
+"""
+
+import hashlib
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Optional
+
+from flask import request, make_response
+
+from source.utils.metrics import CACHE_RESPOSTAS
+
+
+class BackendCache:
+    """Interface mínima de um backend de cache (chave -> valor com TTL opcional)"""
+
+    def get(self, chave: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, chave: str, valor: Any, ttl: Optional[int] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, chave: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class BackendLRU(BackendCache):
+    """Cache em memória do processo, limitado a `max_itens` com despejo LRU"""
+
+    def __init__(self, max_itens: int = 2048):
+        self.max_itens = max(1, max_itens)
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            valor, expira_em = item
+            if expira_em is not None and expira_em <= time.monotonic():
+                del self._itens[chave]
+                return None
+            self._itens.move_to_end(chave)
+            return valor
+
+    def set(self, chave, valor, ttl=None):
+        expira_em = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._itens[chave] = (valor, expira_em)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def delete(self, chave):
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def clear(self):
+        with self._lock:
+            self._itens.clear()
+
+
+class BackendRedis(BackendCache):
+    """Cache compartilhado entre processos/servidores via Redis"""
+
+    def __init__(self, url: str, prefixo: str = 'efootbool:'):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND='redis' requer o pacote 'redis' instalado") from e
+        self._cliente = redis.Redis.from_url(url)
+        self._prefixo = prefixo
+
+    def get(self, chave):
+        bruto = self._cliente.get(self._prefixo + chave)
+        return pickle.loads(bruto) if bruto is not None else None
+
+    def set(self, chave, valor, ttl=None):
+        self._cliente.set(self._prefixo + chave, pickle.dumps(valor), ex=ttl or None)
+
+    def delete(self, chave):
+        self._cliente.delete(self._prefixo + chave)
+
+    def clear(self):
+        for chave in self._cliente.scan_iter(self._prefixo + '*'):
+            self._cliente.delete(chave)
+
+
+class CacheRespostas:
+    """Extensão Flask que guarda respostas JSON de rotas GET marcadas com `em_cache`"""
+
+    def __init__(self, app=None):
+        self.backend: Optional[BackendCache] = None
+        self.ttl_padrao = 60
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        tipo = (app.config.get('CACHE_BACKEND') or 'nenhum').lower()
+        self.ttl_padrao = app.config.get('CACHE_TTL_PADRAO', 60)
+
+        if tipo == 'nenhum':
+            self.backend = None
+        elif tipo == 'redis':
+            self.backend = BackendRedis(app.config['CACHE_REDIS_URL'])
+        else:
+            raise RuntimeError(
+                f"CACHE_BACKEND='{tipo}' não suportado: use 'redis' (compartilhado entre processos) ou 'nenhum'"
+            )
+
+        app.extensions['cache_respostas'] = self
+
+    # ==================== VERSÕES DE ENTIDADES ====================
+
+    @staticmethod
+    def _chave_versao(tipo, entidade_id):
+        return f'versao:{tipo}:{entidade_id}'
+
+    def versao(self, tipo, entidade_id):
+        """Versão atual da entidade; se ainda não existir (ou foi despejada), cria uma nova"""
+        chave = self._chave_versao(tipo, entidade_id)
+        atual = self.backend.get(chave)
+        if atual is None:
+            # Nunca reinicia em um valor conhecido: uma versão despejada não reabre entradas antigas
+            atual = uuid.uuid4().hex[:12]
+            self.backend.set(chave, atual)
+        return atual
+
+    def invalidar(self, *tags):
+        """Invalida todas as respostas marcadas com as entidades `(tipo, id)` informadas"""
+        if self.backend is None:
+            return
+        for tipo, entidade_id in tags:
+            if entidade_id is None:
+                continue
+            self.backend.set(self._chave_versao(tipo, entidade_id), uuid.uuid4().hex[:12])
+
+    # ==================== DECORADOR DE ROTAS ====================
+
+    def _chave_resposta(self, tags, kwargs):
+        versoes = ','.join(
+            f'{tipo}={kwargs.get(parametro)}@{self.versao(tipo, kwargs.get(parametro))}'
+            for tipo, parametro in tags
+        )
+        parametros = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+        bruta = f'{request.endpoint}|{request.path}?{parametros}|{versoes}'
+        return 'resp:' + hashlib.sha1(bruta.encode('utf-8')).hexdigest()
+
+    def em_cache(self, *tags, ttl=None):
+        """
+        Decorador para rotas GET: guarda a resposta 200 sob rota + parâmetros + versões.
+
+        Uso:
+            @cache.em_cache(('temporada', 'temporada_id'))
+            def ranking_times(temporada_id):
+                ...
+
+        Cada tag é (tipo_da_entidade, nome_do_parâmetro_da_rota).
+        """
+        def decorador_real(f):
+            @wraps(f)
+            def decorador(*args, **kwargs):
+                if self.backend is None or request.method != 'GET':
+                    return f(*args, **kwargs)
+
+                chave = self._chave_resposta(tags, kwargs)
+                guardada = self.backend.get(chave)
+                if guardada is not None:
+                    corpo, status, mimetype = guardada
+                    resposta = make_response(corpo, status)
+                    resposta.mimetype = mimetype
+                    resposta.headers['X-Cache'] = 'HIT'
+                    CACHE_RESPOSTAS.inc(resultado='hit')
+                    return resposta
+
+                resposta = make_response(f(*args, **kwargs))
+                if resposta.status_code == 200 and not resposta.is_streamed:
+                    self.backend.set(
+                        chave,
+                        (resposta.get_data(), resposta.status_code, resposta.mimetype),
+                        ttl or self.ttl_padrao
+                    )
+                resposta.headers['X-Cache'] = 'MISS'
+                CACHE_RESPOSTAS.inc(resultado='miss')
+                return resposta
+
+            return decorador
+
+        return decorador_real
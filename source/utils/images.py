@@ -0,0 +1,82 @@
+"""
+Variantes redimensionadas das imagens enviadas (logos, fotos de jogador, escudos).
+
+Com Pillow instalado, cada upload é decodificado uma vez, tem a orientação do
+EXIF aplicada e os metadados descartados (localização do celular não vai para
+o servidor) e vira três variantes com o lado maior limitado:
+
+    <digest>_thumb.webp      160 px  (listagens, escalações)
+    <digest>_medio.webp      640 px  (páginas de detalhe)
+    <digest>_original.webp  1920 px  (ampliação)
+
+A URL gravada no banco é a da variante `original`; `variantes(url)` devolve as
+três a partir dela. Pillow está no requirements.txt; se faltar, `create_app`
+avisa no log e o arquivo é guardado como veio (`variantes` devolve None). A gravação fica em `ArquivoService` (source/domain/arquivos).
+
+Configuração: IMAGEM_FORMATO ('webp' ou 'jpeg'), IMAGEM_QUALIDADE.
+"""
+
+import io
+from typing import List, Optional, Tuple
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # dependência opcional
+    Image = ImageOps = None
+
+EXTENSOES_PERMITIDAS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+
+# (nome, maior lado em px), da menor para a maior
+VARIANTES = (('thumb', 160), ('medio', 640), ('original', 1920))
+
+# Imagens acima disso (ex.: 20000x20000) são recusadas antes de decodificar
+MAX_PIXELS = 40_000_000
+
+
+def extensao_permitida(nome_arquivo) -> bool:
+    return '.' in nome_arquivo and nome_arquivo.rsplit('.', 1)[1].lower() in EXTENSOES_PERMITIDAS
+
+
+def variantes(url: Optional[str]) -> Optional[dict]:
+    """URLs {thumb, medio, original} de uma imagem processada; None para URLs externas ou uploads antigos"""
+    if not url or '_original.' not in url:
+        return None
+    base, extensao = url.rsplit('_original.', 1)
+    return {nome: f'{base}_{nome}.{extensao}' for nome, _ in VARIANTES}
+
+
+def gerar_variantes(caminho, formato='webp', qualidade=80) -> Optional[Tuple[str, List[Tuple[str, bytes]]]]:
+    """
+    Decodifica uma vez e codifica as variantes
+
+    Returns:
+        tuple: (extensao, [(nome_variante, bytes), ...]) ou None se não for uma imagem válida
+    """
+    extensao = 'webp' if formato.lower() == 'webp' else 'jpg'
+
+    try:
+        with Image.open(caminho) as original:
+            if original.width * original.height > MAX_PIXELS:
+                return None
+            # JPEG: decodifica já reduzido (DCT) quando o original é muito maior que a maior variante
+            original.draft('RGB', (VARIANTES[-1][1], VARIANTES[-1][1]))
+            imagem = ImageOps.exif_transpose(original)
+            transparente = imagem.mode in ('RGBA', 'LA', 'P') and extensao == 'webp'
+            # convert devolve uma cópia já decodificada: o arquivo pode ser fechado
+            imagem = imagem.convert('RGBA' if transparente else 'RGB')
+    except Exception:
+        return None
+
+    # Da maior para a menor: cada redução parte da anterior, já pequena
+    geradas = []
+    atual = imagem
+    for nome, lado in reversed(VARIANTES):
+        atual = atual.copy()
+        atual.thumbnail((lado, lado), Image.LANCZOS)
+        saida = io.BytesIO()
+        if extensao == 'webp':
+            atual.save(saida, 'WEBP', quality=qualidade, method=4)
+        else:
+            atual.save(saida, 'JPEG', quality=qualidade, optimize=True, progressive=True)
+        geradas.append((nome, saida.getvalue()))
+    return extensao, geradas
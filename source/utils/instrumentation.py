@@ -0,0 +1,181 @@
+"""
+Instrumentação de SQL por requisição.
+
+Escuta os eventos de cursor de todas as engines do SQLAlchemy e, dentro de uma
+requisição Flask, acumula:
+    - número de statements e tempo total no banco
+    - os statements mais lentos (parâmetros redigidos: só o tipo de cada valor)
+    - quantas vezes cada "forma" de statement se repetiu (listas IN colapsadas)
+
+Ao fim da requisição:
+    - cabeçalhos `X-DB-Queries` e `Server-Timing` (db e app, em ms)
+    - uma linha de log estruturada (JSON) no logger deste módulo: INFO sempre,
+      WARNING quando há statement acima de SQL_LENTA_MS ou forma repetida mais
+      de SQL_N_MAIS_UM_LIMITE vezes (padrão N+1)
+
+Respostas transmitidas (`stream_with_context`) só contam o que rodou antes do
+primeiro byte. Fora de requisições (scripts, worker) nada é registrado.
+
+Configuração: INSTRUMENTACAO_SQL, SQL_LENTA_MS, SQL_N_MAIS_UM_LIMITE, SQL_MAIS_LENTAS.
+"""
+
+import heapq
+import logging
+import re
+from collections import Counter
+from time import perf_counter
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# "IN (?, ?, ?)" e "IN (%s, %s)" viram "IN (?)": a forma não depende do tamanho da lista
+_LISTA_PARAMETROS = re.compile(r'\(\s*(?:\?|%s|%\(\w+\)s)(?:\s*,\s*(?:\?|%s|%\(\w+\)s))*\s*\)')
+_ESPACOS = re.compile(r'\s+')
+
+
+def forma_statement(statement: str) -> str:
+    """SQL normalizado para agrupar repetições (N+1)"""
+    return _LISTA_PARAMETROS.sub('(?)', _ESPACOS.sub(' ', statement).strip())
+
+
+def _redigir(parametros, executemany: bool):
+    """Só o tipo de cada parâmetro: valores (senhas, telefones, e-mails) nunca vão para o log"""
+    if executemany:
+        return f'{len(parametros)} linhas'
+    if isinstance(parametros, dict):
+        return {chave: type(valor).__name__ for chave, valor in parametros.items()}
+    if isinstance(parametros, (list, tuple)):
+        return [type(valor).__name__ for valor in parametros]
+    return type(parametros).__name__
+
+
+class EstadoRequisicao:
+    """Acumulado de SQL de uma requisição (guardado em `g`)"""
+
+    __slots__ = ('inicio', 'consultas', 'tempo_db', 'formas', 'mais_lentas', '_sequencia')
+
+    def __init__(self):
+        self.inicio = perf_counter()
+        self.consultas = 0
+        self.tempo_db = 0.0
+        self.formas = Counter()
+        self.mais_lentas = []
+        self._sequencia = 0
+
+    def registrar(self, statement, parametros, executemany, duracao, guardar):
+        self.consultas += 1
+        self.tempo_db += duracao
+        self.formas[forma_statement(statement)] += 1
+
+        # Heap mínimo com as `guardar` mais lentas; a sequência desempata sem comparar dicts
+        self._sequencia += 1
+        item = (duracao, self._sequencia, statement, parametros, executemany)
+        if len(self.mais_lentas) < guardar:
+            heapq.heappush(self.mais_lentas, item)
+        elif duracao > self.mais_lentas[0][0]:
+            heapq.heapreplace(self.mais_lentas, item)
+
+
+class InstrumentacaoSQL:
+    """Extensão Flask que mede o SQL de cada requisição"""
+
+    _CHAVE_G = '_instrumentacao_sql'
+
+    def __init__(self, app=None):
+        self.lenta_ms = 100.0
+        self.limite_repeticoes = 5
+        self.mais_lentas = 3
+        self._eventos_registrados = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['instrumentacao_sql'] = self
+        if not app.config.get('INSTRUMENTACAO_SQL', True):
+            return
+
+        self.lenta_ms = float(app.config.get('SQL_LENTA_MS', 100))
+        self.limite_repeticoes = int(app.config.get('SQL_N_MAIS_UM_LIMITE', 5))
+        self.mais_lentas = int(app.config.get('SQL_MAIS_LENTAS', 3))
+
+        # Eventos na classe Engine: valem para a engine do Flask-SQLAlchemy e para binds criados depois
+        if not self._eventos_registrados:
+            event.listen(Engine, 'before_cursor_execute', self._antes)
+            event.listen(Engine, 'after_cursor_execute', self._depois)
+            self._eventos_registrados = True
+
+        app.before_request(self._iniciar)
+        app.after_request(self._finalizar)
+
+    # ==================== EVENTOS DO SQLALCHEMY ====================
+
+    @staticmethod
+    def _estado():
+        if not has_request_context():
+            return None
+        return g.get(InstrumentacaoSQL._CHAVE_G)
+
+    def _antes(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None and self._estado() is not None:
+            context._instrumentacao_inicio = perf_counter()
+
+    def _depois(self, conn, cursor, statement, parameters, context, executemany):
+        inicio = getattr(context, '_instrumentacao_inicio', None)
+        estado = self._estado()
+        if inicio is None or estado is None:
+            return
+        estado.registrar(statement, parameters, executemany, perf_counter() - inicio, self.mais_lentas)
+
+    # ==================== CICLO DA REQUISIÇÃO ====================
+
+    def _iniciar(self):
+        setattr(g, self._CHAVE_G, EstadoRequisicao())
+
+    def _finalizar(self, response):
+        estado = g.pop(self._CHAVE_G, None)
+        if estado is None:
+            return response
+
+        tempo_total_ms = (perf_counter() - estado.inicio) * 1000
+        tempo_db_ms = estado.tempo_db * 1000
+
+        response.headers['X-DB-Queries'] = str(estado.consultas)
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={tempo_db_ms:.1f};desc="{estado.consultas} queries", app;dur={tempo_total_ms:.1f}'
+        )
+
+        lentas = [
+            {
+                'ms': round(duracao * 1000, 1),
+                'sql': _ESPACOS.sub(' ', statement).strip(),
+                'parametros': _redigir(parametros, executemany)
+            }
+            for duracao, _, statement, parametros, executemany in sorted(estado.mais_lentas, reverse=True)
+        ]
+        repetidas = [
+            {'vezes': vezes, 'sql': forma}
+            for forma, vezes in estado.formas.most_common()
+            if vezes > self.limite_repeticoes
+        ]
+        acima_do_limite = [item for item in lentas if item['ms'] >= self.lenta_ms]
+
+        registro = {
+            'metodo': request.method,
+            'rota': request.url_rule.rule if request.url_rule else request.path,
+            'status': response.status_code,
+            'consultas': estado.consultas,
+            'tempo_db_ms': round(tempo_db_ms, 1),
+            'tempo_total_ms': round(tempo_total_ms, 1)
+        }
+        nivel = logging.INFO
+        if acima_do_limite or repetidas:
+            nivel = logging.WARNING
+            registro['lentas'] = acima_do_limite or lentas
+            registro['n_mais_um'] = repetidas
+
+        logger.log(nivel, 'sql %s', current_app.json.dumps(registro))
+        return response
@@ -0,0 +1,91 @@
+"""
+Provedor JSON do app (`app.json`), usado por `jsonify`, `current_app.json.dumps`
+e pelas respostas transmitidas.
+
+Com `orjson` instalado a serialização é feita em C, direto para bytes; sem ele,
+cai no `json` da biblioteca padrão com as mesmas regras de conversão. Em ambos:
+
+- `datetime`/`date`/`time` saem em ISO 8601 (os serializers não chamam mais
+  `.isoformat()`; o padrão do Flask seria o formato HTTP "Wed, 05 Feb 2025 ...")
+- `Decimal` sai como número (inteiro quando não tem parte fracionária), não como string
+- chaves continuam ordenadas, como no provedor padrão do Flask
+
+Configuração: `JSON_ACELERADO=false` força a biblioteca padrão.
+"""
+
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dependência opcional
+    orjson = None
+
+
+def _converter(o):
+    """Tipos que nenhum dos codificadores serializa sozinho"""
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, decimal.Decimal):
+        return int(o) if o == o.to_integral_value() else float(o)
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+class ProvedorJSON(DefaultJSONProvider):
+    """`DefaultJSONProvider` com ISO 8601 para datas, Decimal numérico e orjson quando disponível"""
+
+    default = staticmethod(_converter)
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.acelerado = orjson is not None and app.config.get('JSON_ACELERADO', True)
+
+    def _opcoes_orjson(self, indent=None):
+        opcoes = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opcoes |= orjson.OPT_SORT_KEYS
+        if indent:
+            opcoes |= orjson.OPT_INDENT_2
+        return opcoes
+
+    def _bytes(self, obj, indent=None):
+        """Serializa com orjson; None se não for possível (ex.: inteiro acima de 64 bits)"""
+        try:
+            return orjson.dumps(obj, default=_converter, option=self._opcoes_orjson(indent))
+        except orjson.JSONEncodeError:
+            return None
+
+    def dumps(self, obj, **kwargs):
+        # Argumentos além de indent/separators (cls, ensure_ascii=True...) são exclusivos do json padrão
+        if self.acelerado and not set(kwargs) - {'indent', 'separators'}:
+            resultado = self._bytes(obj, kwargs.get('indent'))
+            if resultado is not None:
+                return resultado.decode()
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.acelerado and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if not self.acelerado:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if (self.compact is None and self._app.debug) or self.compact is False else None
+        corpo = self._bytes(obj, indent)
+        if corpo is None:
+            return super().response(*args, **kwargs)
+        # Sem passar por str: orjson já entrega UTF-8
+        return self._app.response_class(corpo + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,312 @@
+"""
+Métricas no formato de exposição texto do Prometheus, sem dependências externas.
+
+Registro em processo (contadores, gauges e histogramas com rótulos) exposto em
+`GET /metrics`. Com vários workers (gunicorn), defina METRICAS_DIR: cada
+processo grava seu snapshot em `METRICAS_DIR/metricas_<pid>.json` (no máximo a
+cada METRICAS_INTERVALO segundos e ao sair) e o `/metrics` de qualquer worker
+soma os arquivos de todos. Limpe o diretório ao subir uma nova versão.
+
+Métricas coletadas:
+    - http_requisicao_duracao_segundos{blueprint,endpoint,metodo,status}
+    - db_pool_checkout_espera_segundos, db_pool_conexoes_em_uso
+    - cache_respostas_total{resultado="hit|miss"}
+    - gols_registrados_total, votos_registrados_total, partidas_finalizadas_total
+
+Se METRICAS_TOKEN estiver definido, `/metrics` exige `Authorization: Bearer <token>`.
+
+Configuração: METRICAS, METRICAS_DIR, METRICAS_INTERVALO, METRICAS_TOKEN.
+"""
+
+import atexit
+import glob
+import hmac
+import json
+import os
+import threading
+from time import monotonic, perf_counter
+from typing import Dict, Iterable, Tuple
+
+from flask import Response, g, request
+
+BUCKETS_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _formatar(valor: float) -> str:
+    if valor == float('inf'):
+        return '+Inf'
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class _Metrica:
+    tipo = ''
+
+    def __init__(self, registro, nome: str, ajuda: str, rotulos: Iterable[str] = ()):
+        self._registro = registro
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self.series: Dict[Tuple[str, ...], object] = {}
+
+    def _chave(self, valores: dict) -> Tuple[str, ...]:
+        if set(valores) != set(self.rotulos):
+            raise ValueError(f'{self.nome}: rótulos esperados {self.rotulos}, recebidos {tuple(valores)}')
+        return tuple(str(valores[r]) for r in self.rotulos)
+
+
+class Contador(_Metrica):
+    """Valor que só cresce (eventos)"""
+
+    tipo = 'counter'
+
+    def inc(self, quantidade: float = 1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._registro.trava:
+            self.series[chave] = self.series.get(chave, 0) + quantidade
+
+
+class Gauge(_Metrica):
+    """Valor instantâneo; com `funcao`, é lido na hora da exposição"""
+
+    tipo = 'gauge'
+
+    def __init__(self, registro, nome, ajuda, rotulos=(), funcao=None):
+        super().__init__(registro, nome, ajuda, rotulos)
+        self.funcao = funcao
+
+    def set(self, valor: float, **rotulos):
+        with self._registro.trava:
+            self.series[self._chave(rotulos)] = valor
+
+    def coletar(self):
+        if self.funcao is not None:
+            self.series[()] = float(self.funcao())
+
+
+class Histograma(_Metrica):
+    """Distribuição de observações em buckets cumulativos + soma e contagem"""
+
+    tipo = 'histogram'
+
+    def __init__(self, registro, nome, ajuda, rotulos=(), buckets=BUCKETS_PADRAO):
+        super().__init__(registro, nome, ajuda, rotulos)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observar(self, valor: float, **rotulos):
+        chave = self._chave(rotulos)
+        with self._registro.trava:
+            serie = self.series.get(chave)
+            if serie is None:
+                serie = self.series[chave] = {'buckets': [0] * len(self.buckets), 'soma': 0.0, 'contagem': 0}
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie['buckets'][i] += 1
+                    break
+            serie['soma'] += valor
+            serie['contagem'] += 1
+
+
+class RegistroMetricas:
+    """Conjunto de métricas do processo + agregação entre processos"""
+
+    def __init__(self):
+        self.trava = threading.RLock()
+        self.metricas: Dict[str, _Metrica] = {}
+        self.diretorio = None
+        self.intervalo = 1.0
+        self._ultima_gravacao = 0.0
+
+    def _registrar(self, metrica):
+        with self.trava:
+            return self.metricas.setdefault(metrica.nome, metrica)
+
+    def contador(self, nome, ajuda, rotulos=()) -> Contador:
+        return self._registrar(Contador(self, nome, ajuda, rotulos))
+
+    def gauge(self, nome, ajuda, rotulos=(), funcao=None) -> Gauge:
+        return self._registrar(Gauge(self, nome, ajuda, rotulos, funcao))
+
+    def histograma(self, nome, ajuda, rotulos=(), buckets=BUCKETS_PADRAO) -> Histograma:
+        return self._registrar(Histograma(self, nome, ajuda, rotulos, buckets))
+
+    # ==================== MULTIPROCESSO ====================
+
+    def snapshot(self) -> dict:
+        with self.trava:
+            for metrica in self.metricas.values():
+                if isinstance(metrica, Gauge):
+                    metrica.coletar()
+            return {
+                nome: {json.dumps(list(chave)): serie for chave, serie in metrica.series.items()}
+                for nome, metrica in self.metricas.items()
+            }
+
+    def _arquivo(self, pid=None):
+        return os.path.join(self.diretorio, f'metricas_{pid or os.getpid()}.json')
+
+    def gravar(self, forcar=False):
+        """Grava o snapshot deste processo (atômico: arquivo temporário + rename)"""
+        if not self.diretorio:
+            return
+        agora = monotonic()
+        if not forcar and agora - self._ultima_gravacao < self.intervalo:
+            return
+        self._ultima_gravacao = agora
+        destino = self._arquivo()
+        temporario = f'{destino}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(self.snapshot(), arquivo)
+        os.replace(temporario, destino)
+
+    def _snapshots(self):
+        """Snapshot deste processo (da memória) + o último gravado por cada outro"""
+        yield self.snapshot()
+        if not self.diretorio:
+            return
+        proprio = self._arquivo()
+        for caminho in glob.glob(os.path.join(self.diretorio, 'metricas_*.json')):
+            if caminho == proprio:
+                continue
+            try:
+                with open(caminho, encoding='utf-8') as arquivo:
+                    yield json.load(arquivo)
+            except (OSError, ValueError):
+                continue  # worker gravando ou arquivo corrompido: entra na próxima coleta
+
+    def _agregado(self) -> dict:
+        total: dict = {}
+        for snapshot in self._snapshots():
+            for nome, series in snapshot.items():
+                destino = total.setdefault(nome, {})
+                for chave, serie in series.items():
+                    atual = destino.get(chave)
+                    if isinstance(serie, dict):
+                        if atual is None:
+                            destino[chave] = {'buckets': list(serie['buckets']), 'soma': serie['soma'],
+                                              'contagem': serie['contagem']}
+                        else:
+                            atual['buckets'] = [a + b for a, b in zip(atual['buckets'], serie['buckets'])]
+                            atual['soma'] += serie['soma']
+                            atual['contagem'] += serie['contagem']
+                    else:
+                        destino[chave] = (atual or 0) + serie
+        return total
+
+    # ==================== EXPOSIÇÃO ====================
+
+    def expor(self) -> str:
+        """Texto no formato de exposição do Prometheus (0.0.4)"""
+        agregado = self._agregado()
+        linhas = []
+        for nome, metrica in sorted(self.metricas.items()):
+            linhas.append(f'# HELP {nome} {metrica.ajuda}')
+            linhas.append(f'# TYPE {nome} {metrica.tipo}')
+            for chave, serie in sorted(agregado.get(nome, {}).items()):
+                pares = list(zip(metrica.rotulos, json.loads(chave)))
+                if isinstance(metrica, Histograma):
+                    acumulado = 0
+                    for limite, quantidade in zip(metrica.buckets, serie['buckets']):
+                        acumulado += quantidade
+                        rotulos = ','.join(f'{k}="{_escapar(v)}"' for k, v in pares + [('le', _formatar(limite))])
+                        linhas.append(f'{nome}_bucket{{{rotulos}}} {acumulado}')
+                    sufixo = '{' + ','.join(f'{k}="{_escapar(v)}"' for k, v in pares) + '}' if pares else ''
+                    linhas.append(f'{nome}_sum{sufixo} {_formatar(serie["soma"])}')
+                    linhas.append(f'{nome}_count{sufixo} {serie["contagem"]}')
+                else:
+                    sufixo = '{' + ','.join(f'{k}="{_escapar(v)}"' for k, v in pares) + '}' if pares else ''
+                    linhas.append(f'{nome}{sufixo} {_formatar(serie)}')
+        return '\n'.join(linhas) + '\n'
+
+
+registro = RegistroMetricas()
+
+DURACAO_REQUISICAO = registro.histograma(
+    'http_requisicao_duracao_segundos', 'Latência das requisições por rota',
+    ('blueprint', 'endpoint', 'metodo', 'status')
+)
+ESPERA_CHECKOUT = registro.histograma(
+    'db_pool_checkout_espera_segundos', 'Tempo esperando uma conexão livre no pool do banco',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+# Pools sem limite (SQLite) não têm checkedout(); o gauge fica em 0
+CONEXOES_EM_USO = registro.gauge('db_pool_conexoes_em_uso', 'Conexões do pool emprestadas no momento')
+CACHE_RESPOSTAS = registro.contador(
+    'cache_respostas_total', 'Consultas ao cache de respostas (hit ratio = hit / total)', ('resultado',)
+)
+GOLS_REGISTRADOS = registro.contador('gols_registrados_total', 'Gols registrados')
+VOTOS_REGISTRADOS = registro.contador('votos_registrados_total', 'Votos registrados')
+PARTIDAS_FINALIZADAS = registro.contador('partidas_finalizadas_total', 'Partidas finalizadas')
+
+
+class Metricas:
+    """Extensão Flask: mede as requisições, o pool do banco e serve `/metrics`"""
+
+    def __init__(self, app=None, db=None):
+        self.token = None
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.extensions['metricas'] = self
+        if not app.config.get('METRICAS', True):
+            return
+
+        registro.diretorio = app.config.get('METRICAS_DIR') or None
+        registro.intervalo = float(app.config.get('METRICAS_INTERVALO', 1.0))
+        if registro.diretorio:
+            os.makedirs(registro.diretorio, exist_ok=True)
+            atexit.register(registro.gravar, True)
+        self.token = app.config.get('METRICAS_TOKEN') or None
+        with app.app_context():
+            self._medir_pool(db.engine.pool)
+
+        app.before_request(self._iniciar)
+        app.after_request(self._finalizar)
+        app.add_url_rule('/metrics', 'metricas', self._expor)
+
+    @staticmethod
+    def _medir_pool(pool):
+        """Cronometra `pool.connect()`: inclui a espera na fila quando todas as conexões estão em uso"""
+        if getattr(pool, '_metricas_conectar', None) is not None:
+            return
+        conectar = pool.connect
+
+        def conectar_medindo():
+            inicio = perf_counter()
+            try:
+                return conectar()
+            finally:
+                ESPERA_CHECKOUT.observar(perf_counter() - inicio)
+
+        pool._metricas_conectar = conectar
+        pool.connect = conectar_medindo
+        CONEXOES_EM_USO.funcao = getattr(pool, 'checkedout', lambda: 0)
+
+    @staticmethod
+    def _iniciar():
+        g._metricas_inicio = perf_counter()
+
+    @staticmethod
+    def _finalizar(response):
+        inicio = g.pop('_metricas_inicio', None)
+        if inicio is not None and request.endpoint != 'metricas':
+            DURACAO_REQUISICAO.observar(
+                perf_counter() - inicio,
+                blueprint=request.blueprint or '',
+                endpoint=request.endpoint or 'nao_encontrado',
+                metodo=request.method,
+                status=response.status_code
+            )
+            registro.gravar()
+        return response
+
+    def _expor(self):
+        if self.token:
+            enviado = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+            if not hmac.compare_digest(enviado.encode(), self.token.encode()):
+                return Response('não autorizado\n', status=401, mimetype='text/plain')
+        return Response(registro.expor(), mimetype='text/plain; version=0.0.4; charset=utf-8')
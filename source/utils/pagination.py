@@ -1,13 +1,228 @@
 """
 Utilitário de paginação padronizado para toda a aplicação.
 Padrão: 10 itens por página, resposta com objeto 'meta'
+
+Dois modos:
+    - página (page/per_page): LIMIT/OFFSET, compatível com os clientes atuais
+    - cursor: keyset sobre o order_by da query + chave primária; o cursor é
+      opaco e assinado, e cada página custa o mesmo independente da profundidade
+
+Estratégias de contagem do total (escolhidas por chamada, `contagem=`):
+    - 'exata': COUNT(*) a cada requisição (padrão)
+    - 'cache': COUNT(*) guardado por PAGINACAO_CONTAGEM_TTL segundos, chaveado pelo SQL + parâmetros
+    - 'estimada': estatística da tabela (MySQL information_schema) para queries sem filtro;
+      com filtro, ou em tabelas pequenas, cai para 'cache'
+`meta.total_exato` é True só para um COUNT feito nesta requisição: total estimado ou
+lido do cache (pode ter até PAGINACAO_CONTAGEM_TTL segundos) vem como False
 """
 
+import hashlib
+from datetime import date, datetime
 from math import ceil
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import and_, inspect, or_, text
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+
+def opcoes_paginacao(args):
+    """Lê `cursor` e `include_total` da query string (cursor vazio = primeira página no modo cursor)"""
+    cursor = args.get('cursor')
+    include_total = (args.get('include_total') or 'true').lower() != 'false'
+    return cursor, include_total
+
+
+ESTRATEGIAS_CONTAGEM = ('exata', 'cache', 'estimada')
+
+# Abaixo disso a estimativa do InnoDB é imprecisa e o COUNT exato já é barato
+ESTIMATIVA_MINIMA = 1000
+
+
+def _contagem_em_cache(query) -> Tuple[int, bool]:
+    """(total, exato): exato é False quando o total veio do cache em vez de um COUNT agora"""
+    from source.extensions.extensios import cache
+
+    backend = cache.backend
+    if backend is None:
+        return query.count(), True
+
+    compilada = query.statement.compile(dialect=query.session.get_bind().dialect)
+    assinatura = f'{compilada}|{sorted(compilada.params.items())!r}'
+    chave = 'contagem:' + hashlib.sha1(assinatura.encode('utf-8')).hexdigest()
+
+    total = backend.get(chave)
+    if total is not None:
+        return total, False
+    total = query.count()
+    backend.set(chave, total, current_app.config.get('PAGINACAO_CONTAGEM_TTL', 60))
+    return total, True
+
+
+def _contagem_estimada(query) -> Optional[int]:
+    """Linhas da tabela segundo as estatísticas do banco; None se a query tem filtro ou não há estatística"""
+    if query.whereclause is not None or query._setup_joins or query._group_by_clauses or query._distinct:
+        return None
+
+    bind = query.session.get_bind()
+    if bind.dialect.name != 'mysql':
+        return None
+
+    tabela = query.column_descriptions[0]['entity'].__table__.name
+    estimativa = query.session.execute(
+        text(
+            'SELECT TABLE_ROWS FROM information_schema.TABLES '
+            'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :tabela'
+        ),
+        {'tabela': tabela}
+    ).scalar()
+    if estimativa is None or estimativa < ESTIMATIVA_MINIMA:
+        return None
+    return int(estimativa)
+
+
+def contar(query, estrategia: str = 'exata') -> Tuple[int, bool]:
+    """
+    Total de linhas da query segundo a estratégia.
+
+    Returns:
+        (total, exato) - exato é False quando o total veio das estatísticas da tabela ou do cache
+    """
+    if estrategia not in ESTRATEGIAS_CONTAGEM:
+        raise ValueError(f'Estratégia de contagem inválida: {estrategia}')
+
+    query = query.order_by(None)
+    if estrategia == 'estimada':
+        estimativa = _contagem_estimada(query)
+        if estimativa is not None:
+            return estimativa, False
+        estrategia = 'cache'
+    if estrategia == 'cache':
+        return _contagem_em_cache(query)
+    return query.count(), True
+
+
+def _serializador_cursor():
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='paginacao-cursor')
+
+
+def _chaves_ordenacao(query):
+    """[(coluna, nome_do_atributo, descendente)] do order_by da query, com a PK como desempate"""
+    entidade = query.column_descriptions[0]['entity']
+    chaves = []
+    for clausula in query._order_by_clauses:
+        descendente = False
+        if isinstance(clausula, UnaryExpression) and clausula.modifier in (operators.desc_op, operators.asc_op):
+            descendente = clausula.modifier is operators.desc_op
+            clausula = clausula.element
+        nome = getattr(clausula, 'key', None)
+        if nome is None or not hasattr(entidade, nome):
+            raise ValueError('Paginação por cursor exige ordenação por colunas da entidade')
+        chaves.append((getattr(entidade, nome), nome, descendente))
+
+    for coluna_pk in inspect(entidade).primary_key:
+        if coluna_pk.key not in {nome for _, nome, _ in chaves}:
+            chaves.append((getattr(entidade, coluna_pk.key), coluna_pk.key, False))
+    return chaves
+
+
+def _codificar_valor(valor):
+    if isinstance(valor, datetime):
+        return {'dt': valor.isoformat()}
+    if isinstance(valor, date):
+        return {'d': valor.isoformat()}
+    return valor
+
 
+def _decodificar_valor(valor):
+    if isinstance(valor, dict):
+        if 'dt' in valor:
+            return datetime.fromisoformat(valor['dt'])
+        if 'd' in valor:
+            return date.fromisoformat(valor['d'])
+    return valor
 
-def paginate(query, page: int = 1, per_page: int = 10) -> Dict[str, Any]:
+
+def _depois_de(chaves, valores):
+    """
+    Filtro "linha vem depois de `valores`" na ordem das chaves.
+
+    Expande (a, b, c) > (va, vb, vc) em OR de prefixos iguais, respeitando a direção
+    de cada coluna e a posição dos NULLs do MySQL/SQLite (primeiro no ASC, último no DESC).
+    """
+    def igual(coluna, valor):
+        return coluna.is_(None) if valor is None else coluna == valor
+
+    def maior(coluna, valor, descendente):
+        if valor is None:
+            # NULL abre o ASC (tudo que não é NULL vem depois) e fecha o DESC (nada vem depois)
+            return None if descendente else coluna.isnot(None)
+        if descendente:
+            return or_(coluna < valor, coluna.is_(None))
+        return coluna > valor
+
+    alternativas = []
+    for i, (coluna, _, descendente) in enumerate(chaves):
+        condicao = maior(coluna, valores[i], descendente)
+        if condicao is None:
+            continue
+        prefixo = [igual(c, valores[j]) for j, (c, _, _) in enumerate(chaves[:i])]
+        alternativas.append(and_(*prefixo, condicao))
+    return or_(*alternativas)
+
+
+def _paginar_por_cursor(query, cursor: str, per_page: int, include_total: bool, contagem: str) -> Dict[str, Any]:
+    chaves = _chaves_ordenacao(query)
+    assinatura = [f'{nome}:{"desc" if descendente else "asc"}' for _, nome, descendente in chaves]
+
+    total, total_exato = contar(query, contagem) if include_total else (None, False)
+
+    pagina = query
+    if cursor:
+        try:
+            conteudo = _serializador_cursor().loads(cursor)
+        except BadSignature:
+            raise ValueError('Cursor inválido')
+        if conteudo.get('k') != assinatura:
+            raise ValueError('Cursor não corresponde a esta listagem')
+        valores = [_decodificar_valor(v) for v in conteudo['v']]
+        pagina = pagina.filter(_depois_de(chaves, valores))
+
+    # PK no fim do ORDER BY garante ordem total (e cursores estáveis) mesmo com chaves repetidas
+    pagina = pagina.order_by(None).order_by(*[
+        coluna.desc() if descendente else coluna.asc() for coluna, _, descendente in chaves
+    ])
+    items = pagina.limit(per_page + 1).all()
+    has_next = len(items) > per_page
+    items = items[:per_page]
+
+    next_cursor = None
+    if has_next:
+        ultimo = items[-1]
+        next_cursor = _serializador_cursor().dumps({
+            'k': assinatura,
+            'v': [_codificar_valor(getattr(ultimo, nome)) for _, nome, _ in chaves]
+        })
+
+    return {
+        'data': items,
+        'meta': {
+            'total': total,
+            'page': None,
+            'per_page': per_page,
+            'total_pages': (ceil(total / per_page) if total else 1) if total is not None else None,
+            'has_next_page': has_next,
+            'has_previous_page': bool(cursor),
+            'next_cursor': next_cursor,
+            'total_exato': total_exato
+        }
+    }
+
+
+def paginate(query, page: int = 1, per_page: int = 10, cursor: Optional[str] = None,
+             include_total: bool = True, contagem: str = 'exata') -> Dict[str, Any]:
     """
     Aplica paginação a uma query SQLAlchemy e retorna resposta padronizada.
 
@@ -15,26 +230,45 @@ def paginate(query, page: int = 1, per_page: int = 10) -> Dict[str, Any]:
         query: Query SQLAlchemy a ser paginada
         page: Número da página (padrão: 1)
         per_page: Itens por página (padrão: 10)
+        cursor: ativa o modo cursor; '' para a primeira página, depois o `meta.next_cursor` recebido
+        include_total: False pula o COUNT (meta.total e meta.total_pages ficam None)
+        contagem: estratégia do total - 'exata', 'cache' ou 'estimada'
 
     Returns:
         Dict com 'data' (lista de items) e 'meta' (metadados de paginação)
+
+    Raises:
+        ValueError: cursor inválido/adulterado ou de outra listagem
     """
     # Validar parâmetros
     page = max(1, page)
     per_page = max(1, min(per_page, 100))  # Máximo 100 itens por página
 
+    if cursor is not None:
+        return _paginar_por_cursor(query, cursor, per_page, include_total, contagem)
+
     # Contar total de registros
-    total = query.count()
+    total, total_exato = contar(query, contagem) if include_total else (None, False)
 
-    # Calcular total de páginas
-    total_pages = ceil(total / per_page) if total > 0 else 1
+    offset = (page - 1) * per_page
 
-    # Ajustar página se exceder o total
-    page = min(page, total_pages)
+    if total_exato:
+        # Calcular total de páginas
+        total_pages = ceil(total / per_page) if total > 0 else 1
 
-    # Aplicar paginação
-    offset = (page - 1) * per_page
-    items = query.limit(per_page).offset(offset).all()
+        # Ajustar página se exceder o total
+        page = min(page, total_pages)
+
+        # Aplicar paginação
+        offset = (page - 1) * per_page
+        items = query.limit(per_page).offset(offset).all()
+        has_next_page = page < total_pages
+    else:
+        # Sem total confiável: não ajusta a página e descobre a próxima buscando um item a mais
+        total_pages = (ceil(total / per_page) if total else 1) if total is not None else None
+        items = query.limit(per_page + 1).offset(offset).all()
+        has_next_page = len(items) > per_page
+        items = items[:per_page]
 
     # Montar resposta padronizada
     return {
@@ -44,8 +278,9 @@ def paginate(query, page: int = 1, per_page: int = 10) -> Dict[str, Any]:
             'page': page,
             'per_page': per_page,
             'total_pages': total_pages,
-            'has_next_page': page < total_pages,
-            'has_previous_page': page > 1
+            'has_next_page': has_next_page,
+            'has_previous_page': page > 1,
+            'total_exato': total_exato
         }
     }
 
@@ -88,6 +323,7 @@ def paginate_list(items: List[Any], page: int = 1, per_page: int = 10) -> Dict[s
             'per_page': per_page,
             'total_pages': total_pages,
             'has_next_page': page < total_pages,
-            'has_previous_page': page > 1
+            'has_previous_page': page > 1,
+            'total_exato': True
         }
     }
@@ -0,0 +1,299 @@
+"""
+Serializers declarativos, compilados em funções objeto→dict.
+
+Cada esquema é registrado uma vez (nome + campos) e vira uma função gerada com
+`exec`, equivalente ao dict escrito à mão: um único literal `{...}` com os
+acessos a atributos, sem laço nem getattr dinâmico por campo.
+
+    registrar('time', 'id', 'nome', ...,
+              saldo_gols=Calculado(lambda m, s: (m or 0) - (s or 0), 'gols_marcados', 'gols_sofridos'),
+              jogadores=Lista('time_jogador', 'time_jogadores', padrao=False))
+
+Tipos de campo:
+    - 'atributo' ou chave='rel.atributo': valor lido do objeto
+    - Calculado(funcao, *dependencias): funcao(valores das dependências)
+    - Aninhado(esquema, origem): dict de outro esquema (None se a origem for None)
+    - Lista(esquema, origem): lista de dicts de outro esquema (só para objetos ORM)
+
+`serializador(nome, fields=..., include=...)` devolve (e guarda) a função para
+uma seleção de campos: `fields` restringe as chaves (`jogador.nome` seleciona
+dentro do aninhado) e `include` liga aninhados com `padrao=False`.
+
+A mesma seleção poda o SQL: `opcoes_carga()` gera `load_only` com as colunas que
+a função lê e carrega (em lote) só os relacionamentos pedidos. Nas rotas, a
+seleção vem de `?fields=id,nome&include=jogadores` via `opcoes_selecao()`.
+
+Com `linhas=True` a função lê Rows do SQLAlchemy em vez de objetos: aninhados
+vêm de colunas rotuladas `rel__campo`. `colunas()` monta essa lista de colunas
+para `query.with_entities(...)`, o que dispensa a hidratação de objetos ORM.
+"""
+
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+
+class Calculado:
+    """Campo derivado: `funcao` recebe os valores das dependências, na ordem"""
+
+    def __init__(self, funcao: Callable, *dependencias: str):
+        self.funcao = funcao
+        self.dependencias = dependencias
+
+
+class Aninhado:
+    """
+    Dict de outro esquema.
+
+    Args:
+        esquema: nome do esquema registrado
+        origem: relacionamento lido (padrão: a própria chave)
+        se: atributo do objeto atual que precisa ser verdadeiro (padrão: origem não nula)
+        padrao: incluído sem `include` explícito
+    """
+
+    def __init__(self, esquema: str, origem: Optional[str] = None, se: Optional[str] = None, padrao: bool = True):
+        self.esquema = esquema
+        self.origem = origem
+        self.se = se
+        self.padrao = padrao
+
+
+class Lista:
+    """Lista de dicts de outro esquema a partir de um relacionamento um-para-muitos"""
+
+    def __init__(self, esquema: str, origem: Optional[str] = None, padrao: bool = False):
+        self.esquema = esquema
+        self.origem = origem
+        self.padrao = padrao
+
+
+_ESQUEMAS: Dict[str, List[Tuple[str, object]]] = {}
+
+
+def registrar(nome: str, *campos: str, **especiais) -> Callable:
+    """Registra o esquema `nome` e devolve seu serializador completo, já compilado"""
+    _ESQUEMAS[nome] = [(campo, campo) for campo in campos] + list(especiais.items())
+    _compilar.cache_clear()
+    _opcoes_carga.cache_clear()
+    return serializador(nome)
+
+
+def _arvore(caminhos: Optional[Iterable[str]]) -> Optional[dict]:
+    """('id', 'jogador.nome') -> {'id': {}, 'jogador': {'nome': {}}}; None = sem seleção"""
+    if caminhos is None:
+        return None
+    arvore: dict = {}
+    for caminho in caminhos:
+        no = arvore
+        for parte in caminho.split('.'):
+            no = no.setdefault(parte, {})
+    return arvore
+
+
+def _normalizar(caminhos: Optional[Iterable[str]]) -> Optional[Tuple[str, ...]]:
+    if caminhos is None:
+        return None
+    return tuple(sorted({c.strip() for c in caminhos if c and c.strip()}))
+
+
+def serializador(nome: str, fields: Optional[Iterable[str]] = None, include: Iterable[str] = (),
+                 linhas: bool = False) -> Callable:
+    """
+    Função compilada que serializa um objeto (ou Row, com `linhas=True`) do esquema `nome`.
+
+    Raises:
+        ValueError: campo ou include inexistente no esquema
+    """
+    return _compilar(nome, _normalizar(fields), _normalizar(include) or (), linhas)
+
+
+def colunas(nome: str, entidades: dict, fields: Optional[Iterable[str]] = None, include: Iterable[str] = ()) -> list:
+    """
+    Colunas rotuladas para `query.with_entities(*colunas(...))`, casando com `serializador(..., linhas=True)`.
+
+    Args:
+        entidades: caminho do relacionamento -> modelo ou alias (`''` é a entidade principal),
+            ex: {'': Gol, 'jogador': Jogador, 'assistente': aliased(Jogador)}
+    """
+    funcao = serializador(nome, fields, include, linhas=True)
+    resultado = []
+    for caminho in funcao.caminhos:
+        entidade = entidades['.'.join(caminho[:-1])]
+        resultado.append(getattr(entidade, caminho[-1]).label('__'.join(caminho)))
+    return resultado
+
+
+def opcoes_carga(modelo, nome: str, fields: Optional[Iterable[str]] = None, include: Iterable[str] = ()) -> tuple:
+    """
+    Opções de `query.options(...)` que carregam apenas o que o serializador lê.
+
+    Colunas não lidas ficam fora do SELECT (`load_only`); relacionamentos lidos são
+    carregados de uma vez (`joinedload` para muitos-para-um, `selectinload` para
+    listas) e os demais não são tocados. É o perfil de carga de cada caso de uso:
+    calculado uma vez por seleção e reaproveitado entre requisições.
+    """
+    return _opcoes_carga(modelo, nome, _normalizar(fields), _normalizar(include) or ())
+
+
+@lru_cache(maxsize=512)
+def _opcoes_carga(modelo, nome, fields, include):
+    return tuple(_opcoes(inspect(modelo), serializador(nome, fields, include).caminhos))
+
+
+def _opcoes(mapper, caminhos) -> list:
+    colunas_lidas, relacoes = [], {}
+    for caminho in caminhos:
+        if caminho[0] in mapper.relationships:
+            relacoes.setdefault(caminho[0], [])
+            if len(caminho) > 1:
+                relacoes[caminho[0]].append(caminho[1:])
+        elif caminho[0] not in colunas_lidas:
+            colunas_lidas.append(caminho[0])
+
+    opcoes = []
+    if colunas_lidas:
+        opcoes.append(load_only(*(getattr(mapper.class_, c) for c in colunas_lidas)))
+    for nome_relacao, subcaminhos in relacoes.items():
+        relacao = mapper.relationships[nome_relacao]
+        estrategia = selectinload if relacao.uselist else joinedload
+        opcao = estrategia(getattr(mapper.class_, nome_relacao))
+        internas = _opcoes(relacao.mapper, subcaminhos)
+        opcoes.append(opcao.options(*internas) if internas else opcao)
+    return opcoes
+
+
+class Selecao(NamedTuple):
+    """Campos pedidos pelo cliente; `include=None` mantém os aninhados padrão de cada service"""
+
+    fields: Optional[Tuple[str, ...]] = None
+    include: Optional[Tuple[str, ...]] = None
+
+    def _incluir(self, include_padrao):
+        return include_padrao if self.include is None else self.include
+
+    def serializador(self, nome: str, include_padrao: Iterable[str] = (), linhas: bool = False) -> Callable:
+        return serializador(nome, self.fields, self._incluir(include_padrao), linhas)
+
+    def opcoes(self, modelo, nome: str, include_padrao: Iterable[str] = ()) -> tuple:
+        return opcoes_carga(modelo, nome, self.fields, self._incluir(include_padrao))
+
+    def colunas(self, nome: str, entidades: dict, include_padrao: Iterable[str] = ()) -> list:
+        return colunas(nome, entidades, self.fields, self._incluir(include_padrao))
+
+
+# Sem `fields`/`include`: o documento completo de sempre
+SELECAO_PADRAO = Selecao()
+
+
+def opcoes_selecao(args, nome: str, linhas: bool = False):
+    """
+    Lê `fields` e `include` (listas separadas por vírgula) da query string.
+
+    Valida contra o esquema `nome` (lido de Rows, se `linhas`) para que um campo
+    inexistente vire 400 na rota.
+
+    Returns:
+        tuple: (Selecao, None) ou (None, mensagem de erro)
+    """
+    def lista(parametro):
+        valor = args.get(parametro)
+        return None if valor is None else _normalizar(valor.split(','))
+
+    selecao = Selecao(lista('fields'), lista('include'))
+    try:
+        serializador(nome, selecao.fields, selecao.include or (), linhas)
+    except ValueError as e:
+        return None, str(e)
+    return selecao, None
+
+
+@lru_cache(maxsize=512)
+def _compilar(nome, fields, include, linhas):
+    gerador = _Gerador(linhas)
+    corpo = gerador.dict(nome, [], _arvore(fields), _arvore(include) or {})
+    codigo = f'def serializar_{nome}(o):\n    return {corpo}\n'
+    exec(compile(codigo, f'<serializer {nome}>', 'exec'), gerador.namespace)
+    funcao = gerador.namespace[f'serializar_{nome}']
+    funcao.caminhos = tuple(gerador.caminhos)
+    funcao.codigo = codigo
+    return funcao
+
+
+class _Gerador:
+    """Monta o código-fonte do literal dict; `caminhos` acumula os atributos lidos"""
+
+    def __init__(self, linhas):
+        self.linhas = linhas
+        self.namespace: dict = {}
+        self.caminhos: List[Tuple[str, ...]] = []
+
+    def _registrar(self, caminho):
+        caminho = tuple(caminho)
+        if caminho not in self.caminhos:
+            self.caminhos.append(caminho)
+        return caminho
+
+    def _acesso(self, caminho):
+        caminho = self._registrar(caminho)
+        # Row: colunas achatadas rel__campo; objeto: navegação pelos relacionamentos
+        return 'o.' + ('__' if self.linhas else '.').join(caminho)
+
+    def _nome(self, prefixo, valor):
+        nome = f'_{prefixo}{len(self.namespace)}'
+        self.namespace[nome] = valor
+        return nome
+
+    def dict(self, nome, prefixo, campos, incluir):
+        if nome not in _ESQUEMAS:
+            raise ValueError(f"Esquema de serialização '{nome}' não registrado")
+        itens = _ESQUEMAS[nome]
+        conhecidos = {chave for chave, _ in itens}
+        for chave in list(campos or {}) + list(incluir):
+            if chave not in conhecidos:
+                raise ValueError(f"Campo '{chave}' não existe em {nome}")
+
+        partes = []
+        for chave, campo in itens:
+            pedido = campos is not None and chave in campos
+            if campos is not None and not pedido:
+                continue
+            subcampos = (campos or {}).get(chave) or None
+
+            if isinstance(campo, str):
+                expressao = self._acesso(prefixo + campo.split('.'))
+            elif isinstance(campo, Calculado):
+                argumentos = ', '.join(self._acesso(prefixo + d.split('.')) for d in campo.dependencias)
+                expressao = f'{self._nome("f", campo.funcao)}({argumentos})'
+            elif isinstance(campo, Aninhado):
+                if not (campo.padrao or pedido or chave in incluir):
+                    continue
+                origem = prefixo + (campo.origem or chave).split('.')
+                interno = self.dict(campo.esquema, origem, subcampos, incluir.get(chave, {}))
+                if campo.se:
+                    guarda = self._acesso(prefixo + campo.se.split('.'))
+                else:
+                    # Em Row não há o objeto relacionado: a chave primária nula faz o papel de "sem relacionamento"
+                    guarda = self._acesso(origem + ['id'] if self.linhas else origem) + ' is not None'
+                expressao = f'({interno} if {guarda} else None)'
+            elif isinstance(campo, Lista):
+                if not (campo.padrao or pedido or chave in incluir):
+                    continue
+                if self.linhas:
+                    raise ValueError(f"Campo '{chave}' de {nome} é uma lista e não pode ser lido de Rows")
+                interno = _Gerador(False)
+                corpo = interno.dict(campo.esquema, [], subcampos, incluir.get(chave, {}))
+                codigo = f'def item(o):\n    return {corpo}\n'
+                exec(compile(codigo, f'<serializer {campo.esquema}>', 'exec'), interno.namespace)
+                item = self._nome('l', interno.namespace['item'])
+                caminho_origem = prefixo + (campo.origem or chave).split('.')
+                for caminho in interno.caminhos:
+                    self._registrar(caminho_origem + list(caminho))
+                expressao = f'[{item}(x) for x in {self._acesso(caminho_origem)}]'
+            else:
+                raise TypeError(f'Campo {chave} de {nome}: tipo {type(campo).__name__} não suportado')
+            partes.append(f'{chave!r}: {expressao}')
+
+        return '{' + ', '.join(partes) + '}'
@@ -0,0 +1,109 @@
+"""
+Entrega dos uploads (`/static/uploads/...`).
+
+- ETag e Last-Modified em toda resposta; `If-None-Match`/`If-Modified-Since`
+  devolvem 304 e `Range` devolve 206 (via `send_file(conditional=True)`)
+- Nomes endereçados por conteúdo (`ab/cd/<sha256>_thumb.webp`) nunca mudam de
+  bytes: `Cache-Control: public, max-age=31536000, immutable` e o próprio
+  digest como ETag. Demais arquivos (uploads antigos): UPLOADS_MAX_AGE
+- Variantes pré-comprimidas (`arquivo.br`, `arquivo.gz` ao lado do original)
+  são entregues quando o cliente aceita a codificação
+- UPLOADS_ENTREGA='x-accel' (nginx) ou 'x-sendfile' (Apache/lighttpd): o worker
+  só monta os cabeçalhos e o proxy envia os bytes direto do disco
+
+CORS fica a cargo do Flask-CORS: o bloco `/static/*` em create_app libera
+qualquer origem também em produção (`Access-Control-Allow-Origin: *`).
+
+Exemplo de nginx para 'x-accel' (UPLOADS_X_ACCEL_PREFIXO='/_uploads'):
+
+    location /_uploads/ {
+        internal;
+        alias /caminho/para/uploads/;  # mesmo diretório de ARMAZENAMENTO_DIR
+    }
+"""
+
+import mimetypes
+import os
+import re
+from datetime import datetime, timezone
+
+from flask import Response, abort, current_app, request
+from werkzeug.security import safe_join
+from werkzeug.utils import send_file
+
+UM_ANO = 365 * 24 * 60 * 60
+
+# ab/cd/<sha256>[_variante].ext
+_ENDERECADO = re.compile(r'^([0-9a-f]{2})/([0-9a-f]{2})/(\1\2[0-9a-f]{60}(?:_[a-z]+)?)\.[a-z0-9]+$')
+
+# (codificação aceita, sufixo do arquivo), em ordem de preferência
+_PRE_COMPRIMIDOS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _pre_comprimido(caminho):
+    """(caminho, codificação) da melhor variante comprimida aceita pelo cliente, ou (caminho, None)"""
+    for codificacao, sufixo in _PRE_COMPRIMIDOS:
+        if request.accept_encodings[codificacao] and os.path.isfile(caminho + sufixo):
+            return caminho + sufixo, codificacao
+    return caminho, None
+
+
+def servir_upload(raiz, filename):
+    """Resposta para GET de um arquivo em `raiz`, com cache HTTP forte e entrega opcional pelo proxy"""
+    # Nada de arquivos/pastas ocultos (.tmp com uploads em andamento)
+    if any(parte.startswith('.') for parte in filename.split('/')):
+        abort(404)
+    caminho = safe_join(raiz, filename)
+    if caminho is None or not os.path.isfile(caminho):
+        abort(404)
+
+    enderecado = _ENDERECADO.match(filename)
+    entregue, codificacao = _pre_comprimido(caminho)
+    info = os.stat(entregue)
+
+    if enderecado:
+        etag = enderecado.group(3)
+        max_age = UM_ANO
+    else:
+        etag = f'{info.st_mtime_ns:x}-{info.st_size:x}'
+        max_age = int(current_app.config.get('UPLOADS_MAX_AGE', 3600))
+    if codificacao:
+        etag = f'{etag}-{codificacao}'
+    modificado = datetime.fromtimestamp(info.st_mtime, tz=timezone.utc)
+
+    modo = (current_app.config.get('UPLOADS_ENTREGA') or 'flask').lower()
+    if modo == 'x-accel':
+        response = Response(status=200, mimetype=_mimetype(filename))
+        response.set_etag(etag)
+        response.last_modified = modificado
+        response.make_conditional(request.environ)
+        if response.status_code == 200:
+            prefixo = (current_app.config.get('UPLOADS_X_ACCEL_PREFIXO') or '/_uploads').rstrip('/')
+            sufixo = entregue[len(caminho):]
+            response.headers['X-Accel-Redirect'] = f'{prefixo}/{filename}{sufixo}'
+    else:
+        # 'x-sendfile': o send_file do Werkzeug troca o corpo pelo cabeçalho X-Sendfile
+        response = send_file(
+            entregue,
+            request.environ,
+            mimetype=_mimetype(filename),
+            conditional=True,
+            etag=etag,
+            last_modified=modificado,
+            max_age=max_age,
+            use_x_sendfile=modo == 'x-sendfile',
+            response_class=current_app.response_class
+        )
+
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    if enderecado:
+        response.cache_control.immutable = True
+    if codificacao:
+        response.headers['Content-Encoding'] = codificacao
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def _mimetype(filename):
+    return mimetypes.guess_type(filename)[0] or 'application/octet-stream'
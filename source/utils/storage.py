@@ -0,0 +1,211 @@
+"""
+Armazenamento de arquivos endereçado por conteúdo.
+
+O nome de cada objeto deriva do SHA-256 dos bytes enviados, em diretórios
+fatiados pelo prefixo do hash para nenhuma pasta acumular milhares de
+entradas:
+
+    9f/86/9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08_thumb.webp
+
+O mesmo arquivo enviado duas vezes resolve para o mesmo nome (sem cópia nova)
+e um nome nunca muda de conteúdo, o que permite cache imutável.
+
+`ArmazenamentoArquivos` é a extensão Flask; os bytes ficam num
+`BackendArmazenamento` (hoje só o disco local). Um backend de object storage
+(S3, GCS) só precisa implementar a mesma interface.
+
+Configuração: ARMAZENAMENTO_BACKEND, ARMAZENAMENTO_DIR, ARMAZENAMENTO_URL.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Iterator, Optional
+
+BLOCO = 64 * 1024
+
+
+class BackendArmazenamento:
+    """Interface mínima de um backend de armazenamento (chave -> bytes imutáveis)"""
+
+    def existe(self, chave: str) -> bool:
+        raise NotImplementedError
+
+    def gravar_arquivo(self, chave: str, caminho: str) -> None:
+        """Grava o conteúdo de um arquivo local temporário (que pode ser movido/consumido)"""
+        raise NotImplementedError
+
+    def gravar_bytes(self, chave: str, dados: bytes) -> None:
+        raise NotImplementedError
+
+    def remover(self, chave: str) -> None:
+        raise NotImplementedError
+
+    def tamanho(self, chave: str) -> Optional[int]:
+        raise NotImplementedError
+
+    def caminho_local(self, chave: str) -> Optional[str]:
+        """Caminho no disco, quando existe (backends remotos devolvem None)"""
+        return None
+
+    def chaves(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class BackendLocal(BackendArmazenamento):
+    """Arquivos em um diretório local; gravação atômica via arquivo temporário + rename"""
+
+    def __init__(self, raiz: str):
+        self.raiz = os.path.abspath(raiz)
+        os.makedirs(self.raiz, exist_ok=True)
+
+    def _caminho(self, chave):
+        caminho = os.path.abspath(os.path.join(self.raiz, chave))
+        if not caminho.startswith(self.raiz + os.sep):
+            raise ValueError(f'Chave fora do armazenamento: {chave}')
+        return caminho
+
+    def _temporario(self, destino):
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(destino), prefix='.tmp-')
+        os.close(descritor)
+        return temporario
+
+    def existe(self, chave):
+        return os.path.exists(self._caminho(chave))
+
+    def gravar_arquivo(self, chave, caminho):
+        destino = self._caminho(chave)
+        temporario = self._temporario(destino)
+        # Mesmo sistema de arquivos: rename; senão, cópia. O rename final é atômico
+        # e duas gravações simultâneas da mesma chave gravam o mesmo conteúdo.
+        shutil.move(caminho, temporario)
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, destino)
+
+    def gravar_bytes(self, chave, dados):
+        destino = self._caminho(chave)
+        temporario = self._temporario(destino)
+        with open(temporario, 'wb') as arquivo:
+            arquivo.write(dados)
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, destino)
+
+    def remover(self, chave):
+        caminho = self._caminho(chave)
+        # Variantes pré-comprimidas ao lado do original (ver static_files)
+        for sufixo in ('.br', '.gz'):
+            try:
+                os.remove(caminho + sufixo)
+            except FileNotFoundError:
+                pass
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            return
+        # Remove as pastas de prefixo que ficaram vazias
+        pasta = os.path.dirname(caminho)
+        while pasta != self.raiz:
+            try:
+                os.rmdir(pasta)
+            except OSError:
+                break
+            pasta = os.path.dirname(pasta)
+
+    def tamanho(self, chave):
+        try:
+            return os.path.getsize(self._caminho(chave))
+        except OSError:
+            return None
+
+    def caminho_local(self, chave):
+        return self._caminho(chave)
+
+    def chaves(self):
+        for pasta, _, arquivos in os.walk(self.raiz):
+            for nome in arquivos:
+                if not nome.startswith('.tmp-'):
+                    yield os.path.relpath(os.path.join(pasta, nome), self.raiz).replace(os.sep, '/')
+
+
+def chave_conteudo(digest: str, sufixo: str = '', extensao: str = '') -> str:
+    """`ab/cd/<digest><sufixo>.<extensao>`"""
+    nome = digest + sufixo + (f'.{extensao}' if extensao else '')
+    return f'{digest[:2]}/{digest[2:4]}/{nome}'
+
+
+def receber(stream, diretorio: Optional[str] = None, limite: Optional[int] = None):
+    """
+    Copia um stream para um arquivo temporário calculando o SHA-256 no caminho
+
+    Returns:
+        tuple: (digest_hex, caminho_temporario, tamanho); (None, None, tamanho) se passar de `limite`
+    """
+    sha = hashlib.sha256()
+    tamanho = 0
+    descritor, caminho = tempfile.mkstemp(dir=diretorio, prefix='.tmp-upload-')
+    try:
+        with os.fdopen(descritor, 'wb') as destino:
+            while True:
+                bloco = stream.read(BLOCO)
+                if not bloco:
+                    break
+                tamanho += len(bloco)
+                if limite is not None and tamanho > limite:
+                    os.remove(caminho)
+                    return None, None, tamanho
+                sha.update(bloco)
+                destino.write(bloco)
+    except BaseException:
+        if os.path.exists(caminho):
+            os.remove(caminho)
+        raise
+    return sha.hexdigest(), caminho, tamanho
+
+
+class ArmazenamentoArquivos:
+    """Extensão Flask: backend configurado + conversão chave <-> URL pública"""
+
+    def __init__(self, app=None):
+        self.backend: Optional[BackendArmazenamento] = None
+        self.url_base = '/static/uploads'
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        tipo = (app.config.get('ARMAZENAMENTO_BACKEND') or 'local').lower()
+        self.url_base = (app.config.get('ARMAZENAMENTO_URL') or '/static/uploads').rstrip('/')
+
+        if tipo != 'local':
+            raise RuntimeError(f"ARMAZENAMENTO_BACKEND='{tipo}' não suportado (disponível: 'local')")
+        raiz = app.config.get('ARMAZENAMENTO_DIR') or os.path.join(app.root_path, '..', 'static', 'uploads')
+        self.backend = BackendLocal(raiz)
+
+        app.extensions['armazenamento'] = self
+
+    @property
+    def temporarios(self) -> Optional[str]:
+        """Pasta para uploads em andamento: no mesmo disco do backend local, o rename final não copia bytes"""
+        raiz = getattr(self.backend, 'raiz', None)
+        if raiz is None:
+            return None
+        pasta = os.path.join(raiz, '.tmp')
+        os.makedirs(pasta, exist_ok=True)
+        return pasta
+
+    def url(self, chave: str) -> str:
+        return f'{self.url_base}/{chave}'
+
+    def chave(self, url: Optional[str]) -> Optional[str]:
+        """Inverso de `url`; None para URLs que não são deste armazenamento"""
+        prefixo = self.url_base + '/'
+        if not url or not url.startswith(prefixo):
+            return None
+        return url[len(prefixo):]
+
+    def __getattr__(self, nome):
+        # existe, gravar_arquivo, gravar_bytes, remover, tamanho, caminho_local, chaves
+        if nome == 'backend':
+            raise AttributeError(nome)
+        return getattr(self.backend, nome)
@@ -0,0 +1,58 @@
+"""
+Respostas JSON transmitidas em blocos para listagens grandes.
+
+O service devolve um iterador de dicts (lendo o banco com `yield_per`) e a rota
+responde com `resposta_json_em_fluxo`, que produz exatamente o mesmo documento
+de `jsonify({chave: [...]})` sem montar a lista inteira em memória. O cliente
+recebe o primeiro byte assim que a primeira linha sai do banco.
+
+Ativado por rota com `?stream=true`.
+"""
+
+from flask import Response, current_app, request, stream_with_context
+
+# Linhas buscadas do banco por ida (Query.yield_per)
+LOTE_BANCO = 500
+
+# Bytes acumulados antes de enviar um bloco ao cliente
+TAMANHO_BLOCO = 64 * 1024
+
+
+def fluxo_solicitado() -> bool:
+    """True se o cliente pediu resposta transmitida (`?stream=true`)"""
+    return (request.args.get('stream') or '').lower() in ('1', 'true')
+
+
+def resposta_json_em_fluxo(chave, itens, status=200, **extras):
+    """
+    Response equivalente a `jsonify({**extras, chave: list(itens)})`, gerada incrementalmente.
+
+    Args:
+        chave: nome do array no documento (ex: 'jogadores')
+        itens: iterável de objetos serializáveis; consumido uma única vez
+        extras: campos escalares que precedem o array no documento
+    """
+    dumps = current_app.json.dumps
+
+    def gerar():
+        cabecalho = '{' + ''.join(f'{dumps(k)}:{dumps(v)},' for k, v in extras.items())
+        # Cabeçalho e primeiro item saem juntos e imediatamente: é o que reduz o tempo até o primeiro byte
+        bloco, tamanho = [cabecalho + dumps(chave) + ':['], 0
+        primeiro = True
+        try:
+            for item in itens:
+                parte = dumps(item) if primeiro else ',' + dumps(item)
+                bloco.append(parte)
+                tamanho += len(parte)
+                if primeiro or tamanho >= TAMANHO_BLOCO:
+                    yield ''.join(bloco)
+                    bloco, tamanho = [], 0
+                primeiro = False
+        except Exception:
+            # Status e cabeçalhos já foram enviados: o documento fica truncado (JSON inválido no cliente)
+            current_app.logger.exception('Falha ao transmitir %s', request.path)
+            return
+        bloco.append(']}')
+        yield ''.join(bloco)
+
+    return Response(stream_with_context(gerar()), status=status, mimetype='application/json')
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""ImagemService.processar contra um servidor HTTP local que faz o papel das URLs de imagem e do webhook do n8n"""
+
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from flask import Flask
+
+from source.domain.imagens.services import ConfigImagens, ImagemService
+
+IMAGEM = bytes(range(256)) * 40  # 10 KB
+LIMITE = 64 * 1024
+
+
+class Stub(BaseHTTPRequestHandler):
+    # Os dois downloads de /par/ só terminam se estiverem em andamento ao mesmo tempo
+    barreira = None
+    recebidos = []
+    status_webhook = 200
+
+    def log_message(self, *args):
+        pass
+
+    def _enviar(self, status, corpo, content_type, tamanho=True):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        if tamanho:
+            self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_GET(self):
+        if self.path.startswith('/par/'):
+            try:
+                Stub.barreira.wait()
+            except threading.BrokenBarrierError:
+                return self._enviar(504, b'downloads sequenciais', 'text/plain')
+            return self._enviar(200, IMAGEM, 'image/png')
+        if self.path == '/imagem.png':
+            return self._enviar(200, IMAGEM, 'image/png')
+        if self.path == '/grande-declarada.png':
+            return self._enviar(200, b'\0' * (LIMITE + 1), 'image/png')
+        if self.path == '/grande-sem-tamanho.png':
+            # Sem Content-Length: o limite só aparece durante o streaming
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/png')
+            self.end_headers()
+            try:
+                for _ in range(16):
+                    self.wfile.write(b'\0' * 16 * 1024)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            return None
+        return self._enviar(404, b'', 'text/plain')
+
+    def do_POST(self):
+        corpo = self.rfile.read(int(self.headers['Content-Length']))
+        Stub.recebidos.append(json.loads(corpo))
+        if Stub.status_webhook != 200:
+            return self._enviar(Stub.status_webhook, b'bad gateway', 'text/plain')
+        return self._enviar(200, b'{"ok": true}', 'application/json')
+
+
+@pytest.fixture(scope='module')
+def servidor():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Stub)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def processar(servidor):
+    Stub.barreira = threading.Barrier(2, timeout=5)
+    Stub.recebidos = []
+    Stub.status_webhook = 200
+    app = Flask(__name__)
+    config = ConfigImagens(
+        webhook_url=f'{servidor}/webhook',
+        tamanho_maximo=LIMITE,
+        timeout_download=(2.0, 10.0),
+        timeout_webhook=(2.0, 10.0),
+    )
+
+    def chamar(modal, pessoa):
+        return ImagemService.processar(app, f'{servidor}{modal}', f'{servidor}{pessoa}', config=config)
+    return chamar
+
+
+def test_baixa_as_duas_imagens_em_paralelo_e_envia_ao_webhook(processar):
+    corpo, status = processar('/par/modal.png', '/par/pessoa.png')
+
+    assert status == 200, corpo
+    assert corpo['n8n_response'] == {'ok': True}
+    enviado, = Stub.recebidos
+    assert enviado['modal_url'].endswith('/par/modal.png')
+    assert base64.b64decode(enviado['modal_base64']) == IMAGEM
+    assert base64.b64decode(enviado['pessoa_base64']) == IMAGEM
+
+
+@pytest.mark.parametrize('rota', ['/grande-declarada.png', '/grande-sem-tamanho.png'])
+def test_recusa_imagem_acima_do_limite_sem_chamar_o_webhook(processar, rota):
+    corpo, status = processar('/imagem.png', rota)
+
+    assert status == 400
+    assert 'excede o limite' in corpo['erro']
+    assert Stub.recebidos == []
+
+
+def test_erro_do_webhook_vira_502(processar):
+    Stub.status_webhook = 502
+
+    corpo, status = processar('/imagem.png', '/imagem.png')
+
+    assert status == 502
+    assert corpo['imagens_processadas'] is True
+    assert 'Erro ao enviar para n8n' in corpo['erro']
+    assert len(Stub.recebidos) == 1
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+"""Roda scripts/orcamento_consultas.py num processo próprio e falha se alguma rota estourar o orçamento"""
+
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_rotas_dentro_do_orcamento_de_consultas():
+    resultado = subprocess.run(
+        [sys.executable, os.path.join(RAIZ, 'scripts', 'orcamento_consultas.py'), '--verbose'],
+        cwd=RAIZ, capture_output=True, text=True, timeout=300
+    )
+    assert resultado.returncode == 0, resultado.stdout + resultado.stderr
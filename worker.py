@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Worker da fila de tarefas (tabela `jobs`).
+
+Uso (a partir da raiz do projeto, com as mesmas variáveis de ambiente da API):
+    python worker.py                 # um processo
+    python worker.py --processos 4   # quatro processos disputando a mesma fila
+    python worker.py --uma-vez       # esvazia a fila e sai (cron, testes)
+
+SIGTERM/SIGINT terminam o job em andamento antes de sair.
+"""
+
+import argparse
+import multiprocessing
+import signal
+import sys
+import time
+
+from source import create_app
+
+
+def executar_worker(uma_vez=False):
+    from source.domain.jobs.services import JobService
+
+    app = create_app()
+    parar = []
+    signal.signal(signal.SIGTERM, lambda *_: parar.append(True))
+    signal.signal(signal.SIGINT, lambda *_: parar.append(True))
+
+    with app.app_context():
+        worker_id = JobService.identificador_worker()
+        intervalo = float(app.config.get('JOBS_INTERVALO', 1.0))
+        app.logger.info('worker %s iniciado', worker_id)
+
+        while not parar:
+            try:
+                executou = JobService.executar_proximo(worker_id)
+            except Exception:
+                app.logger.exception('worker %s: erro ao buscar job', worker_id)
+                executou = False
+            if not executou:
+                if uma_vez:
+                    break
+                time.sleep(intervalo)
+
+        app.logger.info('worker %s encerrado', worker_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Executa as tarefas em segundo plano da tabela jobs')
+    parser.add_argument('--processos', type=int, default=1, help='número de processos worker')
+    parser.add_argument('--uma-vez', action='store_true', help='sai quando a fila estiver vazia')
+    args = parser.parse_args()
+
+    if args.processos <= 1:
+        executar_worker(args.uma_vez)
+        return 0
+
+    processos = [
+        multiprocessing.Process(target=executar_worker, args=(args.uma_vez,), name=f'worker-{i}')
+        for i in range(args.processos)
+    ]
+    for processo in processos:
+        processo.start()
+    signal.signal(signal.SIGTERM, lambda *_: [p.terminate() for p in processos])
+    for processo in processos:
+        processo.join()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())